@@ -1,6 +1,7 @@
 import asyncio
 import json
 import os
+import zlib
 from datetime import datetime
 from typing import Dict, List, Optional, Callable
 import httpx
@@ -106,7 +107,7 @@ class SyncEngine:
     async def _start_websocket_connection(self):
         """Start WebSocket connection for real-time updates."""
         try:
-            self.websocket = await websockets.connect(self.websocket_url)
+            self.websocket = await websockets.connect(self.websocket_url, compression=None)
             print(f"WebSocket connected to {self.websocket_url}")
             
             # Start listening for messages
@@ -124,6 +125,9 @@ class SyncEngine:
             while self.websocket:
                 try:
                     message = await self.websocket.recv()
+                    if isinstance(message, bytes):
+                        # Large broadcasts arrive as zlib-compressed binary frames
+                        message = zlib.decompress(message)
                     data = json.loads(message)
                     await self._handle_websocket_message(data)
                 except ConnectionClosed:
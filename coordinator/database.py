@@ -4,10 +4,13 @@ Handles all database operations using SQLite with async support.
 """
 
 import aiosqlite
+import asyncio
 import json
 import logging
-from datetime import datetime
-from typing import List, Dict, Optional, Any, Tuple
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Any, Tuple, AsyncIterator
 from pathlib import Path
 
 from shared.models import (
@@ -16,57 +19,251 @@ from shared.models import (
 )
 
 
+# Timestamps are stored as INTEGER microseconds since the Unix epoch: one int
+# to bind on insert and one int to read back, with no ISO string parsing.
+_NOW_US_SQL = "(CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER))"
+
+# (table, column, written by CURRENT_TIMESTAMP) for pre-epoch databases
+_TIMESTAMP_COLUMNS = [
+    ("nodes", "last_seen", False),
+    ("nodes", "created_at", True),
+    ("nodes", "updated_at", False),
+    ("files", "created_at", False),
+    ("files", "modified_at", False),
+    ("events", "timestamp", False),
+    ("conflicts", "detected_at", False),
+    ("conflicts", "resolved_at", False),
+    ("network_metrics", "timestamp", True),
+]
+
+# Statements shared by the queued writer and the *_sync variants
+_UPDATE_NODE_STATUS_SQL = """
+    UPDATE nodes 
+    SET status = ?, last_seen = ?, updated_at = ?
+    WHERE node_id = ?
+"""
+
+_INSERT_EVENT_SQL = """
+    INSERT INTO events 
+    (event_id, event_type, node_id, file_id, timestamp, vector_clock, data, processed)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _now_us() -> int:
+    """Current time as epoch microseconds."""
+    return time.time_ns() // 1000
+
+
+def _to_epoch_us(value: Optional[datetime]) -> Optional[int]:
+    """Convert a datetime to epoch microseconds for storage."""
+    if value is None:
+        return None
+    return int(value.timestamp() * 1_000_000)
+
+
+def _from_epoch_us(value: Any) -> Optional[datetime]:
+    """Convert a stored epoch-microsecond value back to a local datetime."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        # Row written before the epoch migration
+        return datetime.fromisoformat(value)
+    return datetime.fromtimestamp(value / 1_000_000)
+
+
 class DatabaseManager:
     """
     Database manager for the coordinator.
     Handles all persistent storage operations using SQLite.
     """
     
-    def __init__(self, db_path: str = "./coordinator.db"):
+    def __init__(self, db_path: str = "./coordinator.db", read_pool_size: int = 4,
+                 write_batch_size: int = 500, write_batch_interval: float = 0.01):
         """
         Initialize database manager.
         
         Args:
             db_path: Path to SQLite database file
+            read_pool_size: Number of read-only connections kept open for SELECTs
+            write_batch_size: Maximum queued writes flushed in one transaction
+            write_batch_interval: Seconds the background writer waits to collect a batch
         """
         self.db_path = db_path
+        self.read_pool_size = max(1, read_pool_size)
+        self.write_batch_size = max(1, write_batch_size)
+        self.write_batch_interval = write_batch_interval
         self.db_initialized = False
         
+        # One writer connection plus a pool of readers. aiosqlite runs each
+        # connection on its own thread, so readers are not queued behind writes.
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._readers: List[aiosqlite.Connection] = []
+        self._reader_pool: Optional[asyncio.Queue] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._init_lock: Optional[asyncio.Lock] = None
+        
+        # Fire-and-forget writes (events, status heartbeats) are queued as
+        # (sql, params) and flushed in batches by a background task
+        self._wqueue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        
         # Ensure database directory exists
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
     
     async def initialize(self) -> None:
-        """Initialize database schema if not exists."""
+        """Initialize database schema if not exists and open the connection pool."""
         if self.db_initialized:
             return
         
-        async with aiosqlite.connect(self.db_path) as db:
-            await self._create_tables(db)
-            await self._create_indexes(db)
-            await db.commit()
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+        
+        async with self._init_lock:
+            if self.db_initialized:
+                return
+            
+            # Autocommit: single statements commit on their own, and
+            # multi-statement writes open their own BEGIN IMMEDIATE
+            self._writer = await aiosqlite.connect(self.db_path, isolation_level=None)
+            # WAL lets readers proceed while the writer holds its lock
+            await self._writer.execute("PRAGMA journal_mode=WAL")
+            await self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                await self._create_tables(self._writer)
+                await self._create_indexes(self._writer)
+                await self._migrate_timestamps(self._writer)
+                await self._writer.execute("COMMIT")
+            except BaseException:
+                await self._writer.rollback()
+                raise
+            
+            self._reader_pool = asyncio.Queue()
+            for _ in range(self.read_pool_size):
+                reader = await aiosqlite.connect(self.db_path, isolation_level=None)
+                self._readers.append(reader)
+                self._reader_pool.put_nowait(reader)
+            
+            self._write_lock = asyncio.Lock()
+            self._wqueue = asyncio.Queue()
+            self._writer_task = asyncio.create_task(self._drain_writes())
+            self.db_initialized = True
         
-        self.db_initialized = True
         logging.info("Database initialized successfully")
     
+    async def close(self) -> None:
+        """Close the writer and all pooled reader connections."""
+        if not self.db_initialized:
+            return
+        
+        # Flush whatever is still queued before the writer goes away
+        await self._wqueue.join()
+        self._writer_task.cancel()
+        try:
+            await self._writer_task
+        except asyncio.CancelledError:
+            pass
+        self._writer_task = None
+        self._wqueue = None
+        
+        for reader in self._readers:
+            await reader.close()
+        self._readers = []
+        self._reader_pool = None
+        
+        if self._writer is not None:
+            await self._writer.close()
+            self._writer = None
+        
+        self.db_initialized = False
+        logging.info("Database connections closed")
+    
+    @asynccontextmanager
+    async def _read(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a reader connection from the pool for the duration of a query."""
+        await self.initialize()
+        reader = await self._reader_pool.get()
+        try:
+            yield reader
+        finally:
+            self._reader_pool.put_nowait(reader)
+    
+    @asynccontextmanager
+    async def _write(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Hold the single writer connection so statements and commits don't interleave."""
+        await self.initialize()
+        async with self._write_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                # Don't let a half-applied write ride along with the next commit
+                await self._writer.rollback()
+                raise
+    
+    @asynccontextmanager
+    async def _transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Run several writes atomically on the writer connection."""
+        async with self._write() as db:
+            await db.execute("BEGIN IMMEDIATE")
+            yield db
+            await db.execute("COMMIT")
+    
+    async def _enqueue_write(self, sql: str, params: Tuple) -> None:
+        """Queue a write for the background writer without waiting for it to land."""
+        await self.initialize()
+        self._wqueue.put_nowait((sql, params))
+    
+    async def _drain_writes(self) -> None:
+        """Flush queued writes in batches, one transaction per batch."""
+        while True:
+            batch = [await self._wqueue.get()]
+            # Give concurrent handlers a moment to pile on before committing
+            await asyncio.sleep(self.write_batch_interval)
+            while len(batch) < self.write_batch_size and not self._wqueue.empty():
+                batch.append(self._wqueue.get_nowait())
+            
+            grouped: Dict[str, List[Tuple]] = {}
+            for sql, params in batch:
+                grouped.setdefault(sql, []).append(params)
+            
+            try:
+                async with self._transaction() as db:
+                    for sql, rows in grouped.items():
+                        await db.executemany(sql, rows)
+            
+            except Exception as e:
+                # Retry one by one so a single bad row doesn't drop the batch
+                logging.warning(f"Batched write of {len(batch)} operations failed, retrying individually: {e}")
+                for sql, params in batch:
+                    try:
+                        async with self._write() as db:
+                            await db.execute(sql, params)
+                    except Exception as e:
+                        logging.error(f"Error applying queued write: {e}")
+            
+            finally:
+                for _ in batch:
+                    self._wqueue.task_done()
+    
     async def _create_tables(self, db: aiosqlite.Connection) -> None:
         """Create database tables."""
         
         # Nodes table
-        await db.execute("""
+        await db.execute(f"""
             CREATE TABLE IF NOT EXISTS nodes (
                 node_id TEXT PRIMARY KEY,
                 address TEXT NOT NULL,
                 port INTEGER NOT NULL,
                 status TEXT NOT NULL DEFAULT 'offline',
-                last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_seen INTEGER DEFAULT {_NOW_US_SQL},
                 version TEXT DEFAULT '1.0.0',
                 capabilities TEXT DEFAULT '[]',
                 watch_directories TEXT DEFAULT '[]',
                 file_count INTEGER DEFAULT 0,
                 total_size INTEGER DEFAULT 0,
-                vector_clock TEXT DEFAULT '{}',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                vector_clock TEXT DEFAULT '{{}}',
+                created_at INTEGER DEFAULT {_NOW_US_SQL},
+                updated_at INTEGER DEFAULT {_NOW_US_SQL}
             )
         """)
         
@@ -78,8 +275,8 @@ class DatabaseManager:
                 path TEXT NOT NULL,
                 size INTEGER NOT NULL,
                 hash TEXT NOT NULL,
-                created_at TIMESTAMP NOT NULL,
-                modified_at TIMESTAMP NOT NULL,
+                created_at INTEGER NOT NULL,
+                modified_at INTEGER NOT NULL,
                 owner_node TEXT NOT NULL,
                 version INTEGER DEFAULT 1,
                 vector_clock TEXT NOT NULL,
@@ -91,15 +288,15 @@ class DatabaseManager:
         """)
         
         # Events table
-        await db.execute("""
+        await db.execute(f"""
             CREATE TABLE IF NOT EXISTS events (
                 event_id TEXT PRIMARY KEY,
                 event_type TEXT NOT NULL,
                 node_id TEXT NOT NULL,
                 file_id TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                timestamp INTEGER DEFAULT {_NOW_US_SQL},
                 vector_clock TEXT NOT NULL,
-                data TEXT DEFAULT '{}',
+                data TEXT DEFAULT '{{}}',
                 processed BOOLEAN DEFAULT FALSE,
                 FOREIGN KEY (node_id) REFERENCES nodes (node_id),
                 FOREIGN KEY (file_id) REFERENCES files (file_id)
@@ -107,7 +304,7 @@ class DatabaseManager:
         """)
         
         # Conflicts table
-        await db.execute("""
+        await db.execute(f"""
             CREATE TABLE IF NOT EXISTS conflicts (
                 conflict_id TEXT PRIMARY KEY,
                 file_id TEXT NOT NULL,
@@ -115,8 +312,8 @@ class DatabaseManager:
                 node2 TEXT NOT NULL,
                 node1_version_data TEXT NOT NULL,
                 node2_version_data TEXT NOT NULL,
-                detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                resolved_at TIMESTAMP,
+                detected_at INTEGER DEFAULT {_NOW_US_SQL},
+                resolved_at INTEGER,
                 resolution_strategy TEXT,
                 resolved_version_id TEXT,
                 is_resolved BOOLEAN DEFAULT FALSE,
@@ -127,11 +324,11 @@ class DatabaseManager:
         """)
         
         # Network metrics table
-        await db.execute("""
+        await db.execute(f"""
             CREATE TABLE IF NOT EXISTS network_metrics (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 node_id TEXT NOT NULL,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                timestamp INTEGER DEFAULT {_NOW_US_SQL},
                 bandwidth_used INTEGER DEFAULT 0,
                 bandwidth_saved INTEGER DEFAULT 0,
                 sync_time REAL DEFAULT 0.0,
@@ -150,10 +347,13 @@ class DatabaseManager:
             "CREATE INDEX IF NOT EXISTS idx_files_owner_node ON files (owner_node)",
             "CREATE INDEX IF NOT EXISTS idx_files_hash ON files (hash)",
             "CREATE INDEX IF NOT EXISTS idx_files_modified_at ON files (modified_at)",
+            # Covered a version lookup nothing used; not worth its write cost
+            "DROP INDEX IF EXISTS idx_files_cover",
             "CREATE INDEX IF NOT EXISTS idx_events_node_id ON events (node_id)",
-            "CREATE INDEX IF NOT EXISTS idx_events_file_id ON events (file_id)",
+            "CREATE INDEX IF NOT EXISTS idx_events_file_id_timestamp ON events (file_id, timestamp)",
             "CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events (timestamp)",
             "CREATE INDEX IF NOT EXISTS idx_events_processed ON events (processed)",
+            "CREATE INDEX IF NOT EXISTS idx_events_type_timestamp ON events (event_type, timestamp)",
             "CREATE INDEX IF NOT EXISTS idx_conflicts_file_id ON conflicts (file_id)",
             "CREATE INDEX IF NOT EXISTS idx_conflicts_is_resolved ON conflicts (is_resolved)",
             "CREATE INDEX IF NOT EXISTS idx_metrics_node_id ON network_metrics (node_id)",
@@ -163,32 +363,72 @@ class DatabaseManager:
         for index_sql in indexes:
             await db.execute(index_sql)
     
+    async def _migrate_timestamps(self, db: aiosqlite.Connection) -> None:
+        """Convert ISO-8601 timestamp strings left by older versions to epoch microseconds."""
+        for table, column, is_utc in _TIMESTAMP_COLUMNS:
+            async with db.execute(
+                f"SELECT rowid, {column} FROM {table} WHERE typeof({column}) = 'text'"
+            ) as cursor:
+                rows = await cursor.fetchall()
+            
+            if not rows:
+                continue
+            
+            updates = []
+            for rowid, value in rows:
+                parsed = datetime.fromisoformat(value)
+                if is_utc:
+                    parsed = parsed.replace(tzinfo=timezone.utc)
+                updates.append((_to_epoch_us(parsed), rowid))
+            
+            await db.executemany(
+                f"UPDATE {table} SET {column} = ? WHERE rowid = ?", updates
+            )
+            logging.info(f"Migrated {len(updates)} {table}.{column} values to epoch microseconds")
+    
     # Node operations
     
     async def register_node(self, node_info: NodeInfo) -> bool:
         """Register a new node or update existing one."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._write() as db:
+                # Update in place on re-registration so created_at survives.
+                # created_at is bound rather than left to the column default:
+                # databases upgraded from ISO timestamps keep their old
+                # CURRENT_TIMESTAMP defaults, which write UTC text
+                now_us = _now_us()
                 await db.execute("""
-                    INSERT OR REPLACE INTO nodes 
+                    INSERT INTO nodes 
                     (node_id, address, port, status, last_seen, version, capabilities, 
-                     watch_directories, file_count, total_size, vector_clock, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     watch_directories, file_count, total_size, vector_clock, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (node_id) DO UPDATE SET
+                        address = excluded.address,
+                        port = excluded.port,
+                        status = excluded.status,
+                        last_seen = excluded.last_seen,
+                        version = excluded.version,
+                        capabilities = excluded.capabilities,
+                        watch_directories = excluded.watch_directories,
+                        file_count = excluded.file_count,
+                        total_size = excluded.total_size,
+                        vector_clock = excluded.vector_clock,
+                        updated_at = excluded.updated_at
                 """, (
                     node_info.node_id,
                     node_info.address,
                     node_info.port,
                     node_info.status.value,
-                    node_info.last_seen,
+                    _to_epoch_us(node_info.last_seen),
                     node_info.version,
                     json.dumps(node_info.capabilities),
                     json.dumps(node_info.watch_directories),
                     node_info.file_count,
                     node_info.total_size,
                     json.dumps(node_info.vector_clock.model_dump()),
-                    datetime.now()
+                    now_us,
+                    now_us
                 ))
-                await db.commit()
             
             logging.info(f"Registered node {node_info.node_id}")
             return True
@@ -200,9 +440,9 @@ class DatabaseManager:
     async def get_node(self, node_id: str) -> Optional[NodeInfo]:
         """Get node information by ID."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._read() as db:
                 async with db.execute(
-                    "SELECT * FROM nodes WHERE node_id = ?", (node_id,)
+                    "SELECT * FROM nodes WHERE node_id = ? LIMIT 1", (node_id,)
                 ) as cursor:
                     row = await cursor.fetchone()
                     
@@ -218,7 +458,7 @@ class DatabaseManager:
     async def get_all_nodes(self) -> List[NodeInfo]:
         """Get all registered nodes."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._read() as db:
                 async with db.execute("SELECT * FROM nodes ORDER BY node_id") as cursor:
                     rows = await cursor.fetchall()
                     return [self._row_to_node_info(row) for row in rows]
@@ -228,15 +468,31 @@ class DatabaseManager:
             return []
     
     async def update_node_status(self, node_id: str, status: NodeStatus) -> bool:
-        """Update node status."""
+        """
+        Update node status.
+        
+        The update is queued for the background writer; use
+        ``update_node_status_sync`` when the caller needs it to have landed.
+        """
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute("""
-                    UPDATE nodes 
-                    SET status = ?, last_seen = ?, updated_at = ?
-                    WHERE node_id = ?
-                """, (status.value, datetime.now(), datetime.now(), node_id))
-                await db.commit()
+            now_us = _now_us()
+            await self._enqueue_write(
+                _UPDATE_NODE_STATUS_SQL, (status.value, now_us, now_us, node_id)
+            )
+            return True
+        
+        except Exception as e:
+            logging.error(f"Error queueing node status update for {node_id}: {e}")
+            return False
+    
+    async def update_node_status_sync(self, node_id: str, status: NodeStatus) -> bool:
+        """Update node status and wait for the write to complete."""
+        try:
+            now_us = _now_us()
+            async with self._write() as db:
+                await db.execute(
+                    _UPDATE_NODE_STATUS_SQL, (status.value, now_us, now_us, node_id)
+                )
             
             return True
         
@@ -247,7 +503,7 @@ class DatabaseManager:
     async def get_online_nodes(self) -> List[NodeInfo]:
         """Get all online nodes."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._read() as db:
                 async with db.execute(
                     "SELECT * FROM nodes WHERE status = ? ORDER BY node_id", 
                     (NodeStatus.ONLINE.value,)
@@ -262,7 +518,7 @@ class DatabaseManager:
     async def remove_node(self, node_id: str) -> bool:
         """Remove a node from the database."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._transaction() as db:
                 # Remove node from nodes table
                 await db.execute("DELETE FROM nodes WHERE node_id = ?", (node_id,))
                 
@@ -277,8 +533,6 @@ class DatabaseManager:
                     "DELETE FROM conflicts WHERE node1 = ? OR node2 = ?", 
                     (node_id, node_id)
                 )
-                
-                await db.commit()
             
             logging.info(f"Removed node {node_id} from database")
             return True
@@ -292,20 +546,33 @@ class DatabaseManager:
     async def store_file(self, file_metadata: FileMetadata) -> bool:
         """Store file metadata."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._write() as db:
                 await db.execute("""
-                    INSERT OR REPLACE INTO files 
+                    INSERT INTO files 
                     (file_id, name, path, size, hash, created_at, modified_at, 
                      owner_node, version, vector_clock, is_deleted, content_type, metadata)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (file_id) DO UPDATE SET
+                        name = excluded.name,
+                        path = excluded.path,
+                        size = excluded.size,
+                        hash = excluded.hash,
+                        created_at = excluded.created_at,
+                        modified_at = excluded.modified_at,
+                        owner_node = excluded.owner_node,
+                        version = excluded.version,
+                        vector_clock = excluded.vector_clock,
+                        is_deleted = excluded.is_deleted,
+                        content_type = excluded.content_type,
+                        metadata = excluded.metadata
                 """, (
                     file_metadata.file_id,
                     file_metadata.name,
                     file_metadata.path,
                     file_metadata.size,
                     file_metadata.hash,
-                    file_metadata.created_at,
-                    file_metadata.modified_at,
+                    _to_epoch_us(file_metadata.created_at),
+                    _to_epoch_us(file_metadata.modified_at),
                     file_metadata.owner_node,
                     file_metadata.version,
                     json.dumps(file_metadata.vector_clock.model_dump()),
@@ -313,7 +580,6 @@ class DatabaseManager:
                     file_metadata.content_type,
                     json.dumps({})  # Additional metadata
                 ))
-                await db.commit()
             
             logging.info(f"Stored file {file_metadata.file_id}")
             return True
@@ -325,9 +591,9 @@ class DatabaseManager:
     async def get_file(self, file_id: str) -> Optional[FileMetadata]:
         """Get file metadata by ID."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._read() as db:
                 async with db.execute(
-                    "SELECT * FROM files WHERE file_id = ?", (file_id,)
+                    "SELECT * FROM files WHERE file_id = ? LIMIT 1", (file_id,)
                 ) as cursor:
                     row = await cursor.fetchone()
                     
@@ -343,7 +609,7 @@ class DatabaseManager:
     async def get_files_by_node(self, node_id: str) -> List[FileMetadata]:
         """Get all files owned by a specific node."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._read() as db:
                 async with db.execute(
                     "SELECT * FROM files WHERE owner_node = ? AND is_deleted = FALSE ORDER BY modified_at DESC", 
                     (node_id,)
@@ -358,7 +624,7 @@ class DatabaseManager:
     async def get_all_files(self, include_deleted: bool = False) -> List[FileMetadata]:
         """Get all files."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._read() as db:
                 if include_deleted:
                     query = "SELECT * FROM files ORDER BY modified_at DESC"
                     params = ()
@@ -377,12 +643,11 @@ class DatabaseManager:
     async def delete_file(self, file_id: str) -> bool:
         """Mark file as deleted."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._write() as db:
                 await db.execute(
                     "UPDATE files SET is_deleted = TRUE WHERE file_id = ?", 
                     (file_id,)
                 )
-                await db.commit()
             
             return True
         
@@ -390,27 +655,61 @@ class DatabaseManager:
             logging.error(f"Error deleting file {file_id}: {e}")
             return False
     
+    async def bulk_mark_deleted(self, file_ids: List[str]) -> bool:
+        """Mark many files as deleted in one transaction."""
+        if not file_ids:
+            return True
+        
+        try:
+            async with self._transaction() as db:
+                await db.executemany(
+                    "UPDATE files SET is_deleted = TRUE WHERE file_id = ?",
+                    [(file_id,) for file_id in file_ids]
+                )
+            
+            return True
+        
+        except Exception as e:
+            logging.error(f"Error deleting {len(file_ids)} files: {e}")
+            return False
+    
     # Event operations
     
+    def _event_params(self, event: SyncEvent) -> Tuple:
+        """Bind parameters for ``_INSERT_EVENT_SQL``."""
+        return (
+            event.event_id,
+            event.event_type.value,
+            event.node_id,
+            event.file_id,
+            _to_epoch_us(event.timestamp),
+            # Serialized by pydantic directly, without a dict in between
+            event.vector_clock.model_dump_json(),
+            json.dumps(event.data),
+            event.processed
+        )
+    
     async def record_event(self, event: SyncEvent) -> bool:
-        """Record a synchronization event."""
+        """
+        Record a synchronization event.
+        
+        The insert is queued for the background writer; use
+        ``record_event_sync`` when the caller needs it to have landed.
+        """
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute("""
-                    INSERT INTO events 
-                    (event_id, event_type, node_id, file_id, timestamp, vector_clock, data, processed)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    event.event_id,
-                    event.event_type.value,
-                    event.node_id,
-                    event.file_id,
-                    event.timestamp,
-                    json.dumps(event.vector_clock.model_dump()),
-                    json.dumps(event.data),
-                    event.processed
-                ))
-                await db.commit()
+            await self._enqueue_write(_INSERT_EVENT_SQL, self._event_params(event))
+            logging.debug(f"Queued event {event.event_id}")
+            return True
+        
+        except Exception as e:
+            logging.error(f"Error queueing event {event.event_id}: {e}")
+            return False
+    
+    async def record_event_sync(self, event: SyncEvent) -> bool:
+        """Record a synchronization event and wait for the write to complete."""
+        try:
+            async with self._write() as db:
+                await db.execute(_INSERT_EVENT_SQL, self._event_params(event))
             
             logging.debug(f"Recorded event {event.event_id}")
             return True
@@ -422,7 +721,7 @@ class DatabaseManager:
     async def get_events_by_node(self, node_id: str, limit: int = 100) -> List[SyncEvent]:
         """Get events for a specific node."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._read() as db:
                 async with db.execute("""
                     SELECT * FROM events 
                     WHERE node_id = ? 
@@ -439,7 +738,7 @@ class DatabaseManager:
     async def get_unprocessed_events(self, limit: int = 100) -> List[SyncEvent]:
         """Get unprocessed events."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._read() as db:
                 async with db.execute("""
                     SELECT * FROM events 
                     WHERE processed = FALSE 
@@ -456,7 +755,7 @@ class DatabaseManager:
     async def get_recent_events(self, limit: int = 100) -> List[SyncEvent]:
         """Get recent events (both processed and unprocessed)."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._read() as db:
                 async with db.execute("""
                     SELECT * FROM events 
                     ORDER BY timestamp DESC 
@@ -469,15 +768,48 @@ class DatabaseManager:
             logging.error(f"Error getting recent events: {e}")
             return []
     
+    async def get_recent_events_for_file(self, file_id: str, limit: int = 100) -> List[SyncEvent]:
+        """Get the most recent events for one file."""
+        try:
+            async with self._read() as db:
+                async with db.execute("""
+                    SELECT * FROM events 
+                    WHERE file_id = ? 
+                    ORDER BY timestamp DESC 
+                    LIMIT ?
+                """, (file_id, limit)) as cursor:
+                    rows = await cursor.fetchall()
+                    return [self._row_to_sync_event(row) for row in rows]
+        
+        except Exception as e:
+            logging.error(f"Error getting events for file {file_id}: {e}")
+            return []
+    
+    async def get_recent_events_by_type(self, event_type: SyncEventType, limit: int = 100) -> List[SyncEvent]:
+        """Get the most recent events of one type."""
+        try:
+            async with self._read() as db:
+                async with db.execute("""
+                    SELECT * FROM events 
+                    WHERE event_type = ? 
+                    ORDER BY timestamp DESC 
+                    LIMIT ?
+                """, (event_type.value, limit)) as cursor:
+                    rows = await cursor.fetchall()
+                    return [self._row_to_sync_event(row) for row in rows]
+        
+        except Exception as e:
+            logging.error(f"Error getting recent {event_type.value} events: {e}")
+            return []
+    
     async def mark_event_processed(self, event_id: str) -> bool:
         """Mark an event as processed."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._write() as db:
                 await db.execute(
                     "UPDATE events SET processed = TRUE WHERE event_id = ?", 
                     (event_id,)
                 )
-                await db.commit()
             
             return True
         
@@ -490,7 +822,7 @@ class DatabaseManager:
     async def record_conflict(self, conflict: ConflictInfo) -> bool:
         """Record a file conflict."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._write() as db:
                 await db.execute("""
                     INSERT INTO conflicts 
                     (conflict_id, file_id, node1, node2, node1_version_data, node2_version_data,
@@ -503,13 +835,12 @@ class DatabaseManager:
                     conflict.node2,
                     json.dumps(conflict.node1_version.model_dump()),
                     json.dumps(conflict.node2_version.model_dump()),
-                    conflict.detected_at,
-                    conflict.resolved_at,
+                    _to_epoch_us(conflict.detected_at),
+                    _to_epoch_us(conflict.resolved_at),
                     conflict.resolution_strategy,
                     conflict.resolved_version_id,
                     conflict.is_resolved
                 ))
-                await db.commit()
             
             logging.info(f"Recorded conflict {conflict.conflict_id}")
             return True
@@ -521,7 +852,7 @@ class DatabaseManager:
     async def get_conflict(self, conflict_id: str) -> Optional[ConflictInfo]:
         """Get conflict information by ID."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._read() as db:
                 async with db.execute(
                     "SELECT * FROM conflicts WHERE conflict_id = ?", (conflict_id,)
                 ) as cursor:
@@ -539,7 +870,7 @@ class DatabaseManager:
     async def get_unresolved_conflicts(self) -> List[ConflictInfo]:
         """Get all unresolved conflicts."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._read() as db:
                 async with db.execute("""
                     SELECT * FROM conflicts 
                     WHERE is_resolved = FALSE 
@@ -561,13 +892,12 @@ class DatabaseManager:
                              resolved_version_id: str) -> bool:
         """Mark a conflict as resolved."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._write() as db:
                 await db.execute("""
                     UPDATE conflicts 
                     SET is_resolved = TRUE, resolved_at = ?, resolution_strategy = ?, resolved_version_id = ?
                     WHERE conflict_id = ?
-                """, (datetime.now(), resolution_strategy, resolved_version_id, conflict_id))
-                await db.commit()
+                """, (_now_us(), resolution_strategy, resolved_version_id, conflict_id))
             
             logging.info(f"Resolved conflict {conflict_id}")
             return True
@@ -581,7 +911,7 @@ class DatabaseManager:
     async def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._read() as db:
                 stats = {}
                 
                 # Node statistics
@@ -619,22 +949,40 @@ class DatabaseManager:
             logging.error(f"Error getting statistics: {e}")
             return {}
     
-    async def cleanup_old_events(self, days_to_keep: int = 30) -> int:
-        """Clean up old processed events."""
+    async def cleanup_old_events(self, days_to_keep: int = 30, batch_size: int = 1000) -> int:
+        """
+        Clean up old processed events.
+        
+        Rows are deleted in batches of ``batch_size``, committing and yielding
+        to the event loop between batches so other writers can interleave
+        instead of waiting behind one long DELETE.
+        """
         try:
-            cutoff_date = datetime.now().timestamp() - (days_to_keep * 24 * 60 * 60)
+            cutoff_us = _now_us() - days_to_keep * 24 * 60 * 60 * 1_000_000
+            deleted_count = 0
             
-            async with aiosqlite.connect(self.db_path) as db:
-                async with db.execute("""
-                    DELETE FROM events 
-                    WHERE processed = TRUE AND timestamp < ?
-                """, (datetime.fromtimestamp(cutoff_date),)) as cursor:
-                    deleted_count = cursor.rowcount
+            while True:
+                async with self._write() as db:
+                    # rowid subquery instead of DELETE ... LIMIT, which needs
+                    # SQLITE_ENABLE_UPDATE_DELETE_LIMIT at compile time
+                    async with db.execute("""
+                        DELETE FROM events 
+                        WHERE rowid IN (
+                            SELECT rowid FROM events
+                            WHERE processed = TRUE AND timestamp < ?
+                            LIMIT ?
+                        )
+                    """, (cutoff_us, batch_size)) as cursor:
+                        batch_count = cursor.rowcount
                 
-                await db.commit()
+                deleted_count += batch_count
+                if batch_count < batch_size:
+                    break
                 
-                logging.info(f"Cleaned up {deleted_count} old events")
-                return deleted_count
+                await asyncio.sleep(0)
+            
+            logging.info(f"Cleaned up {deleted_count} old events")
+            return deleted_count
         
         except Exception as e:
             logging.error(f"Error cleaning up old events: {e}")
@@ -649,7 +997,7 @@ class DatabaseManager:
             address=row[1],
             port=row[2],
             status=NodeStatus(row[3]),
-            last_seen=datetime.fromisoformat(row[4]) if row[4] else datetime.now(),
+            last_seen=_from_epoch_us(row[4]) if row[4] else datetime.now(),
             version=row[5],
             capabilities=json.loads(row[6]) if row[6] else [],
             watch_directories=json.loads(row[7]) if row[7] else [],
@@ -666,8 +1014,8 @@ class DatabaseManager:
             path=row[2],
             size=row[3],
             hash=row[4],
-            created_at=datetime.fromisoformat(row[5]),
-            modified_at=datetime.fromisoformat(row[6]),
+            created_at=_from_epoch_us(row[5]),
+            modified_at=_from_epoch_us(row[6]),
             owner_node=row[7],
             version=row[8],
             vector_clock=VectorClockModel(**(json.loads(row[9]))),
@@ -682,7 +1030,7 @@ class DatabaseManager:
             event_type=SyncEventType(row[1]),
             node_id=row[2],
             file_id=row[3],
-            timestamp=datetime.fromisoformat(row[4]),
+            timestamp=_from_epoch_us(row[4]),
             vector_clock=VectorClockModel(**(json.loads(row[5]))),
             data=json.loads(row[6]) if row[6] else {},
             processed=bool(row[7])
@@ -709,8 +1057,8 @@ class DatabaseManager:
                 node2=row[3],
                 node1_version=node1_version,
                 node2_version=node2_version,
-                detected_at=datetime.fromisoformat(row[6]),
-                resolved_at=datetime.fromisoformat(row[7]) if row[7] else None,
+                detected_at=_from_epoch_us(row[6]),
+                resolved_at=_from_epoch_us(row[7]),
                 resolution_strategy=row[8],
                 resolved_version_id=row[9],
                 is_resolved=bool(row[10])
@@ -3,33 +3,123 @@ Delta synchronization engine for efficient file transfers.
 Implements file chunking, rolling hash, and delta generation for bandwidth optimization.
 """
 
+import base64
 import hashlib
+import json
+import mmap
 import os
+import sys
 import logging
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from typing import List, Dict, Optional, Tuple, Set, Any
 from dataclasses import dataclass
 from pathlib import Path
 
 from shared.utils import (
-    calculate_content_hash, 
-    get_content_chunks, 
     rolling_hash,
+    roll_to_weak_candidate,
+    build_weak_filter,
     find_chunk_boundaries,
     format_bytes
 )
 
+try:
+    import blake3
+except ImportError:
+    blake3 = None
 
-@dataclass
+
+@dataclass(slots=True)
 class ChunkSignature:
     """Signature of a file chunk for delta synchronization."""
     index: int
     offset: int
     size: int
     weak_hash: int    # Rolling hash for quick comparison
-    strong_hash: str  # SHA-256 for collision detection
+    strong_hash: bytes  # Raw strong digest for collision detection; .hex() when serializing
+    hash_algo: str = "sha256"  # Algorithm that produced strong_hash
+    
+
+_DIGEST_SIZE = 32
+
+# Strong chunk hash. BLAKE3 vectorizes within a chunk and hashes 4 KiB chunks
+# about twice as fast as SHA-256; SHA-256 is the fallback when the blake3
+# package is missing. Both produce 32-byte digests, and the algorithm is
+# recorded on signature tables and deltas so the two never get compared.
+DEFAULT_HASH_ALGO = "blake3" if blake3 is not None else "sha256"
+
+# Binary delta frame: an int64 op count, then five little-endian int64s per
+# op (code, offset, size, source_offset, data_len; -1 marks "absent"),
+# then every op's data concatenated in order
+_OP_CODES = {"add": 0, "copy": 1, "delete": 2}
+_OP_NAMES = {code: name for name, code in _OP_CODES.items()}
+_FRAME_FIELDS = 5
+
+
+class ChunkSignatureTable:
+    """
+    Chunk signatures stored column-wise: one typed array per field and a
+    single buffer of concatenated digests, instead of an object per chunk.
+    Indexing returns a ``ChunkSignature`` for callers that want one.
+    """
+    
+    __slots__ = ("offsets", "sizes", "weak_hashes", "strong_hashes", "hash_algo")
+    
+    def __init__(self, offsets: List[int] = (), sizes: List[int] = (),
+                 weak_hashes: List[int] = (), strong_hashes: bytes = b"",
+                 hash_algo: str = "sha256"):
+        """
+        Initialize signature table.
+        
+        Args:
+            offsets: Byte offset of each chunk
+            sizes: Length of each chunk
+            weak_hashes: Rolling hash of each chunk
+            strong_hashes: Concatenated 32-byte digests, in chunk order
+            hash_algo: Algorithm that produced strong_hashes
+        """
+        self.offsets = array("q", offsets)
+        self.sizes = array("I", sizes)
+        self.weak_hashes = array("Q", weak_hashes)
+        self.strong_hashes = bytes(strong_hashes)
+        self.hash_algo = hash_algo
+    
+    def __len__(self) -> int:
+        return len(self.offsets)
+    
+    def strong_hash(self, index: int) -> bytes:
+        """Digest of the chunk at ``index``."""
+        start = index * _DIGEST_SIZE
+        return self.strong_hashes[start:start + _DIGEST_SIZE]
     
+    def __getitem__(self, index: int) -> ChunkSignature:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk signature index out of range")
+        return ChunkSignature(
+            index=index,
+            offset=self.offsets[index],
+            size=self.sizes[index],
+            weak_hash=self.weak_hashes[index],
+            strong_hash=self.strong_hash(index),
+            hash_algo=self.hash_algo
+        )
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+    
+    def merkle_root(self) -> bytes:
+        """Merkle root over the strong hashes, in chunk order."""
+        return _merkle_root([self.strong_hash(i) for i in range(len(self))], self.hash_algo)
+
 
-@dataclass
+@dataclass(slots=True)
 class DeltaOperation:
     """Represents a delta operation (add, copy, or delete)."""
     operation: str  # "add", "copy", "delete"
@@ -39,21 +129,176 @@ class DeltaOperation:
     source_offset: Optional[int] = None
 
 
+# hashlib drops the GIL while hashing buffers over 2 KiB (and the numba
+# rolling hash runs nogil), so independent chunks can be hashed side by side
+# on separate cores. Chunks are memoryviews over the caller's buffer, so the
+# lanes share it instead of each copying its slices.
+_HASH_LANES = os.cpu_count() or 1
+_MIN_BATCH = 32
+_MIN_BATCH_BYTES = 1024 * 1024
+_hash_executor: Optional[ThreadPoolExecutor] = None
+
+
+@contextmanager
+def _map_file(file_path: str):
+    """
+    Map a file read-only for the duration of the block.
+    
+    Pages are faulted in on demand instead of copying the whole file onto
+    the Python heap. Empty files yield ``b""`` since mmap rejects them.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        
+        if hasattr(os, "posix_fadvise"):
+            # Signatures and deltas read front to back; widen readahead
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            try:
+                mapped.close()
+            except BufferError:
+                # A view is still referenced (e.g. from a traceback); the
+                # mapping is released when it is collected
+                pass
+
+
+def _hash_constructor(hash_algo: str):
+    """
+    One-shot hasher for a strong hash algorithm.
+    
+    Raises:
+        ValueError: If the algorithm is unknown or its package is missing
+    """
+    if hash_algo == "sha256":
+        return hashlib.sha256
+    if hash_algo == "blake3":
+        if blake3 is None:
+            raise ValueError("blake3 digests require the blake3 package")
+        return blake3.blake3
+    raise ValueError(f"Unknown hash algorithm: {hash_algo}")
+
+
+def _strong_hash_serial(hash_algo: str, chunks: List[bytes]) -> List[bytes]:
+    # Raw digests: no per-chunk hex encoding, and half-size dict keys.
+    # Cloning a pre-built hasher (template.copy(); update()) was measured as
+    # no faster than the one-shot constructor at these chunk sizes, and a
+    # single streaming hasher can't be reused since chunks need independent
+    # digests, so one-shot it is.
+    hasher = _hash_constructor(hash_algo)
+    return [hasher(chunk).digest() for chunk in chunks]
+
+
+def _signatures_serial(window_size: int, hash_algo: str,
+                       chunks: List[bytes]) -> List[Tuple[int, bytes]]:
+    hasher = _hash_constructor(hash_algo)
+    return [(rolling_hash(chunk, window_size), hasher(chunk).digest()) for chunk in chunks]
+
+
+def _run_in_lanes(func, chunks: List[bytes]) -> List[Any]:
+    """
+    Apply a per-run function to a batch of chunks, spread across hash lanes.
+    
+    Args:
+        func: Maps a list of chunks to a list of per-chunk results
+        chunks: Chunk contents
+        
+    Returns:
+        Per-chunk results in the same order as ``chunks``
+    """
+    global _hash_executor
+    
+    # Small batches aren't worth the hand-off to worker threads
+    if (_HASH_LANES < 2 or len(chunks) < _MIN_BATCH or
+            sum(len(chunk) for chunk in chunks) < _MIN_BATCH_BYTES):
+        return func(chunks)
+    
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=_HASH_LANES, thread_name_prefix="chunk-hash"
+        )
+    
+    # One contiguous run per lane; content-defined chunks cluster around
+    # chunk_size, so the lanes get similar amounts of work
+    lane_size = -(-len(chunks) // _HASH_LANES)
+    runs = [chunks[i:i + lane_size] for i in range(0, len(chunks), lane_size)]
+    
+    results = []
+    for run_results in _hash_executor.map(func, runs):
+        results.extend(run_results)
+    return results
+
+
+def _batch_strong_hash(chunks: List[bytes], hash_algo: str) -> List[bytes]:
+    """
+    Hash a batch of independent chunks, spreading them across hash lanes.
+    
+    Args:
+        chunks: Chunk contents to hash
+        hash_algo: Strong hash algorithm ("blake3" or "sha256")
+        
+    Returns:
+        Raw 32-byte digests in the same order as ``chunks``
+    """
+    return _run_in_lanes(partial(_strong_hash_serial, hash_algo), chunks)
+
+
+def _merkle_root(digests: List[bytes], hash_algo: str) -> bytes:
+    """
+    Binary hash tree over chunk digests, used as the file identity hash.
+    
+    Chunk digests are already needed for matching, so the root costs one
+    small hash per internal node instead of another pass over the content.
+    Internal nodes use the same algorithm as the chunk digests. An odd node
+    at the end of a level is promoted unchanged.
+    """
+    hasher = _hash_constructor(hash_algo)
+    if not digests:
+        return hasher(b"").digest()
+    
+    level = digests
+    while len(level) > 1:
+        paired = [hasher(level[i] + level[i + 1]).digest() for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0]
+
+
 class DeltaSync:
     """
     Delta synchronization engine that minimizes bandwidth usage
     by transferring only the differences between file versions.
     """
     
-    def __init__(self, chunk_size: int = 4096):
+    def __init__(self, chunk_size: int = 4096, content_defined: bool = True,
+                 signature_cache_size: int = 1024, hash_algo: Optional[str] = None):
         """
         Initialize delta sync engine.
         
         Args:
             chunk_size: Target size for file chunks in bytes
+            content_defined: Cut chunks at content-defined boundaries; when
+                False chunks are fixed-size and no boundary scan is done
+            signature_cache_size: Old-file signatures kept for
+                ``create_file_delta``; 0 disables the cache
+            hash_algo: Strong chunk hash, "blake3" or "sha256"; defaults to
+                blake3 when it is installed
         """
         self.chunk_size = chunk_size
+        self.hash_algo = hash_algo or DEFAULT_HASH_ALGO
+        _hash_constructor(self.hash_algo)
+        self.content_defined = content_defined
         self.window_size = min(64, chunk_size // 4)
+        # (path, mtime_ns, size) -> signatures, in LRU order. A write
+        # changes mtime or size, so stale entries are never hit.
+        self.signature_cache_size = signature_cache_size
+        self._sig_cache: "OrderedDict[Tuple[str, int, int], ChunkSignatureTable]" = OrderedDict()
         self.stats = {
             "files_processed": 0,
             "total_original_size": 0,
@@ -61,44 +306,52 @@ class DeltaSync:
             "bandwidth_saved": 0
         }
     
-    def create_signature(self, content: bytes) -> List[ChunkSignature]:
+    def create_signature(self, content: bytes,
+                         hash_algo: Optional[str] = None) -> ChunkSignatureTable:
         """
         Create signature for file content using chunks.
         
         Args:
-            content: File content as bytes
+            content: File content (bytes, memoryview or mmap)
+            hash_algo: Strong hash algorithm; defaults to this engine's
             
         Returns:
-            List of chunk signatures
+            Table of chunk signatures
         """
+        hash_algo = hash_algo or self.hash_algo
         if not content:
-            return []
+            return ChunkSignatureTable(hash_algo=hash_algo)
         
-        signatures = []
-        boundaries = find_chunk_boundaries(content, self.chunk_size)
+        chunks = self._split_chunks(content)
+        chunk_data = [data for _, data in chunks]
+        # Weak and strong hashes for each chunk are computed together in the lanes
+        hashes = _run_in_lanes(
+            partial(_signatures_serial, self.window_size, hash_algo), chunk_data
+        )
         
+        return ChunkSignatureTable(
+            offsets=[offset for offset, _ in chunks],
+            sizes=[len(data) for data in chunk_data],
+            weak_hashes=[weak for weak, _ in hashes],
+            strong_hashes=b"".join(strong for _, strong in hashes),
+            hash_algo=hash_algo
+        )
+    
+    def _split_chunks(self, content: bytes) -> List[Tuple[int, memoryview]]:
+        """Slice content at its chunk boundaries into (offset, data) pairs."""
+        chunks = []
         offset = 0
-        for i, boundary in enumerate(boundaries):
-            chunk_data = content[offset:boundary]
+        # Chunks are views into content, not copies
+        view = memoryview(content)
+        for boundary in find_chunk_boundaries(content, self.chunk_size, self.content_defined):
+            chunk_data = view[offset:boundary]
             if not chunk_data:
                 break
-            
-            weak_hash = rolling_hash(chunk_data, self.window_size)
-            strong_hash = hashlib.sha256(chunk_data).hexdigest()
-            
-            signature = ChunkSignature(
-                index=i,
-                offset=offset,
-                size=len(chunk_data),
-                weak_hash=weak_hash,
-                strong_hash=strong_hash
-            )
-            signatures.append(signature)
+            chunks.append((offset, chunk_data))
             offset = boundary
-        
-        return signatures
+        return chunks
     
-    def create_signature_from_file(self, file_path: str) -> List[ChunkSignature]:
+    def create_signature_from_file(self, file_path: str) -> ChunkSignatureTable:
         """
         Create signature for a file.
         
@@ -106,35 +359,69 @@ class DeltaSync:
             file_path: Path to the file
             
         Returns:
-            List of chunk signatures
+            Table of chunk signatures
         """
         try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
-            return self.create_signature(content)
+            with _map_file(file_path) as content:
+                return self.create_signature(content)
         except Exception as e:
             logging.error(f"Error creating signature for {file_path}: {e}")
-            return []
+            return ChunkSignatureTable(hash_algo=self.hash_algo)
     
-    def generate_delta(self, old_content: bytes, new_content: bytes) -> List[DeltaOperation]:
+    def generate_delta(self, old_content: bytes, new_content: bytes,
+                       old_signatures: Optional[ChunkSignatureTable] = None) -> List[DeltaOperation]:
         """
         Generate delta operations to transform old content to new content.
         
         Args:
             old_content: Original file content
             new_content: New file content
+            old_signatures: Precomputed signatures of old_content, if known
             
         Returns:
             List of delta operations
         """
+        operations, _, _ = self._generate_delta(old_content, new_content, old_signatures)
+        return operations
+    
+    def content_root(self, content: bytes, hash_algo: Optional[str] = None) -> str:
+        """
+        File identity hash: hex Merkle root over the content's chunk digests.
+        
+        Only comparable with roots from a DeltaSync using the same chunking
+        and hash algorithm; use shared.utils.calculate_content_hash when comparing with
+        external hashes.
+        
+        Args:
+            content: Content to hash
+            hash_algo: Strong hash algorithm; defaults to this engine's
+        """
+        return self.create_signature(content, hash_algo).merkle_root().hex()
+    
+    def _generate_delta(self, old_content: bytes, new_content: bytes,
+                        old_signatures: Optional[ChunkSignatureTable]
+                        ) -> Tuple[List[DeltaOperation], ChunkSignatureTable, List[bytes]]:
+        """
+        Generate delta operations, keeping the hashes computed on the way.
+        
+        Returns:
+            Tuple of (operations, old signatures, digest of every new chunk)
+        """
+        if old_signatures is None or old_signatures.hash_algo != self.hash_algo:
+            # Digests from another algorithm can't be compared with ours
+            old_signatures = self.create_signature(old_content)
+        
         if not old_content:
             # Entire new file is an addition
+            new_digests = _batch_strong_hash(
+                [chunk for _, chunk in self._split_chunks(new_content)], self.hash_algo
+            )
             return [DeltaOperation(
                 operation="add",
                 offset=0,
                 size=len(new_content),
-                data=new_content
-            )]
+                data=bytes(new_content)
+            )], old_signatures, new_digests
         
         if not new_content:
             # Entire old file is deleted
@@ -142,70 +429,216 @@ class DeltaSync:
                 operation="delete",
                 offset=0,
                 size=len(old_content)
-            )]
+            )], old_signatures, []
         
-        # Create signatures for old content
-        old_signatures = self.create_signature(old_content)
-        old_sig_map = {sig.strong_hash: sig for sig in old_signatures}
+        # Digest -> source offset, read straight from the table's columns
+        old_offset_map: Dict[bytes, int] = {
+            old_signatures.strong_hash(i): old_signatures.offsets[i]
+            for i in range(len(old_signatures))
+        }
         
         # Generate delta operations
         operations = []
-        new_boundaries = find_chunk_boundaries(new_content, self.chunk_size)
+        new_chunks = self._split_chunks(new_content)
+        new_hashes = self._prefiltered_strong_hash(new_chunks, old_signatures)
+        weak_index = None
+        literal_start = None
         
-        new_offset = 0
-        for boundary in new_boundaries:
-            new_chunk = new_content[new_offset:boundary]
-            if not new_chunk:
-                break
-            
-            new_chunk_hash = hashlib.sha256(new_chunk).hexdigest()
+        for (new_offset, new_chunk), new_chunk_hash in zip(new_chunks, new_hashes):
+            if new_chunk_hash not in old_offset_map:
+                if literal_start is None:
+                    literal_start = new_offset
+                continue
             
-            if new_chunk_hash in old_sig_map:
-                # Chunk exists in old content - copy operation
-                old_sig = old_sig_map[new_chunk_hash]
-                operations.append(DeltaOperation(
-                    operation="copy",
-                    offset=new_offset,
-                    size=len(new_chunk),
-                    source_offset=old_sig.offset
-                ))
-            else:
-                # New chunk - add operation
-                operations.append(DeltaOperation(
-                    operation="add",
-                    offset=new_offset,
-                    size=len(new_chunk),
-                    data=new_chunk
+            if literal_start is not None:
+                # Old chunks can still sit inside a run of unmatched new
+                # chunks when boundaries shifted; look for them byte by byte
+                if weak_index is None:
+                    weak_index = self._build_weak_index(old_signatures)
+                operations.extend(self._match_region(
+                    new_content, literal_start, new_offset, old_signatures, weak_index
                 ))
+                literal_start = None
+            
+            # Chunk exists in old content - copy operation
+            operations.append(DeltaOperation(
+                operation="copy",
+                offset=new_offset,
+                size=len(new_chunk),
+                source_offset=old_offset_map[new_chunk_hash]
+            ))
+        
+        if literal_start is not None:
+            if weak_index is None:
+                weak_index = self._build_weak_index(old_signatures)
+            operations.extend(self._match_region(
+                new_content, literal_start, len(new_content), old_signatures, weak_index
+            ))
+        
+        # Fill in the digests the weak prefilter skipped; the new file's
+        # Merkle root needs every chunk
+        skipped = [i for i, digest in enumerate(new_hashes) if digest is None]
+        for i, digest in zip(skipped, _batch_strong_hash([new_chunks[i][1] for i in skipped],
+                                                         self.hash_algo)):
+            new_hashes[i] = digest
+        
+        return operations, old_signatures, new_hashes
+    
+    def _prefiltered_strong_hash(self, chunks: List[Tuple[int, memoryview]],
+                                 old_signatures: ChunkSignatureTable) -> List[Optional[bytes]]:
+        """
+        Strong-hash only the chunks whose weak hash some old chunk shares.
+        
+        A chunk with no weak-hash match can't match by digest either, so on
+        heavily edited files most chunks skip the strong hash entirely.
+        
+        Returns:
+            Digest per chunk, or None where the weak hash ruled it out
+        """
+        old_weak = set(old_signatures.weak_hashes)
+        candidates = [
+            i for i, (_, chunk) in enumerate(chunks)
+            if rolling_hash(chunk, self.window_size) in old_weak
+        ]
+        
+        digests: List[Optional[bytes]] = [None] * len(chunks)
+        for i, digest in zip(candidates, _batch_strong_hash([chunks[i][1] for i in candidates],
+                                                            self.hash_algo)):
+            digests[i] = digest
+        return digests
+    
+    def _build_weak_index(self, signatures: ChunkSignatureTable) -> Tuple[Dict[int, List[int]], Any]:
+        """Index signature rows by weak hash, plus the scan's candidate filter."""
+        weak_map: Dict[int, List[int]] = {}
+        for i in range(len(signatures)):
+            # Shorter chunks were hashed over fewer bytes than the window
+            if signatures.sizes[i] >= self.window_size:
+                weak_map.setdefault(signatures.weak_hashes[i], []).append(i)
+        return weak_map, build_weak_filter(weak_map)
+    
+    def _match_region(self, content: bytes, start: int, end: int,
+                      signatures: ChunkSignatureTable,
+                      weak_index: Tuple[Dict[int, List[int]], Any]) -> List[DeltaOperation]:
+        """
+        Find old chunks inside content[start:end] with an rsync-style scan.
+        
+        A window_size rolling hash slides over the region. Weak hashes are
+        taken over the last window of each chunk, so a weak hit at position p
+        proposes the old chunk ending at p; the strong hash confirms it before a copy
+        is emitted. Bytes between matches become add operations.
+        
+        Args:
+            content: New file content
+            start: First byte of the unmatched region
+            end: End of the unmatched region
+            signatures: Signatures of the old content
+            weak_index: Weak hash -> signature rows and candidate filter,
+                from ``_build_weak_index``
             
-            new_offset = boundary
+        Returns:
+            Delta operations covering content[start:end]
+        """
+        window = self.window_size
+        weak_map, weak_filter = weak_index
+        hasher = _hash_constructor(signatures.hash_algo)
+        operations = []
+        literal = start
+        # Hash candidates through views; only literal data is copied out
+        content = memoryview(content)
+        
+        if weak_map and end - start >= window:
+            pos = start + window
+            h = rolling_hash(content[start:pos], window)
+            
+            while True:
+                matched = False
+                for idx in weak_map.get(h, ()):
+                    size = signatures.sizes[idx]
+                    chunk_start = pos - size
+                    if (chunk_start >= literal and
+                            hasher(content[chunk_start:pos]).digest() == signatures.strong_hash(idx)):
+                        if chunk_start > literal:
+                            operations.append(DeltaOperation(
+                                operation="add",
+                                offset=literal,
+                                size=chunk_start - literal,
+                                data=bytes(content[literal:chunk_start])
+                            ))
+                        operations.append(DeltaOperation(
+                            operation="copy",
+                            offset=chunk_start,
+                            size=size,
+                            source_offset=signatures.offsets[idx]
+                        ))
+                        literal = pos
+                        matched = True
+                        break
+                
+                if matched:
+                    # Restart the window after the copied chunk
+                    if pos + window > end:
+                        break
+                    h = rolling_hash(content[pos:pos + window], window)
+                    pos += window
+                elif pos < end:
+                    # Slide byte by byte (compiled when numba is available)
+                    # to the next position whose hash may be an old chunk's
+                    pos, h = roll_to_weak_candidate(content, pos, end, h, window, weak_filter)
+                else:
+                    break
+        
+        if literal < end:
+            operations.append(DeltaOperation(
+                operation="add",
+                offset=literal,
+                size=end - literal,
+                data=bytes(content[literal:end])
+            ))
         
         return operations
     
-    def apply_delta(self, old_content: bytes, delta_ops: List[DeltaOperation]) -> bytes:
+    def apply_delta(self, old_content: bytes, delta_ops: List[DeltaOperation],
+                    as_memoryview: bool = False) -> bytes:
         """
         Apply delta operations to reconstruct new content.
         
         Args:
             old_content: Original file content
             delta_ops: List of delta operations
+            as_memoryview: Return a memoryview over the result buffer instead
+                of copying it into ``bytes``
             
         Returns:
             Reconstructed file content
         """
-        result = bytearray()
+        # First pass: collect the pieces (copies are zero-copy views into
+        # old_content) so the output can be allocated once at its exact size
+        old_view = memoryview(old_content)
+        pieces = []
+        total = 0
         
         for op in delta_ops:
             if op.operation == "add":
                 if op.data:
-                    result.extend(op.data)
+                    pieces.append(op.data)
+                    total += len(op.data)
             elif op.operation == "copy":
                 if op.source_offset is not None and old_content:
                     end_offset = op.source_offset + op.size
-                    chunk = old_content[op.source_offset:end_offset]
-                    result.extend(chunk)
+                    chunk = old_view[op.source_offset:end_offset]
+                    pieces.append(chunk)
+                    total += len(chunk)
             # Delete operations are implicitly handled by not copying
         
+        result = bytearray(total)
+        write_offset = 0
+        for piece in pieces:
+            next_offset = write_offset + len(piece)
+            result[write_offset:next_offset] = piece
+            write_offset = next_offset
+        
+        if as_memoryview:
+            return memoryview(result)
         return bytes(result)
     
     def calculate_delta_size(self, delta_ops: List[DeltaOperation]) -> int:
@@ -237,32 +670,62 @@ class DeltaSync:
         Returns:
             Optimized list of delta operations
         """
-        if not delta_ops:
-            return []
+        return list(self._merge_adjacent(delta_ops))
+    
+    def _merge_adjacent(self, delta_ops: List[DeltaOperation]):
+        """
+        Yield delta operations with adjacent runs merged, in one pass.
         
-        optimized = []
-        current_op = delta_ops[0]
+        Adjacent adds merge, as do copies of consecutive old ranges into
+        consecutive new ranges (typical after shifted-chunk matching) and
+        delete runs. A run's add data is collected and joined once when
+        the run ends, rather than re-concatenated at every merge.
+        """
+        ops = iter(delta_ops)
+        current_op = next(ops, None)
+        if current_op is None:
+            return
         
-        for next_op in delta_ops[1:]:
-            # Try to merge adjacent add operations
-            if (current_op.operation == "add" and 
-                next_op.operation == "add" and 
-                current_op.offset + current_op.size == next_op.offset):
-                
-                # Merge the operations
-                merged_data = (current_op.data or b"") + (next_op.data or b"")
-                current_op = DeltaOperation(
-                    operation="add",
-                    offset=current_op.offset,
-                    size=current_op.size + next_op.size,
-                    data=merged_data
-                )
-            else:
-                optimized.append(current_op)
-                current_op = next_op
+        size = current_op.size
+        parts = [current_op.data or b""]
+        merged = False
         
-        optimized.append(current_op)
-        return optimized
+        for next_op in ops:
+            if (current_op.operation == next_op.operation and
+                    current_op.offset + size == next_op.offset and
+                    (current_op.operation != "copy" or
+                     (current_op.source_offset is not None and
+                      next_op.source_offset is not None and
+                      current_op.source_offset + size == next_op.source_offset))):
+                size += next_op.size
+                if current_op.operation == "add":
+                    parts.append(next_op.data or b"")
+                merged = True
+                continue
+            
+            yield self._merged_op(current_op, size, parts) if merged else current_op
+            current_op = next_op
+            size = current_op.size
+            parts = [current_op.data or b""]
+            merged = False
+        
+        yield self._merged_op(current_op, size, parts) if merged else current_op
+    
+    def _merged_op(self, first_op: DeltaOperation, size: int, parts: List[bytes]) -> DeltaOperation:
+        """Build the single operation standing in for a merged run."""
+        if first_op.operation == "add":
+            return DeltaOperation(
+                operation="add",
+                offset=first_op.offset,
+                size=size,
+                data=b"".join(parts)
+            )
+        return DeltaOperation(
+            operation=first_op.operation,
+            offset=first_op.offset,
+            size=size,
+            source_offset=first_op.source_offset
+        )
     
     def create_file_delta(self, old_file_path: str, new_file_path: str) -> Dict[str, Any]:
         """
@@ -276,47 +739,97 @@ class DeltaSync:
             Dictionary containing delta information
         """
         try:
-            # Read file contents
-            old_content = b""
-            if os.path.exists(old_file_path):
-                with open(old_file_path, 'rb') as f:
-                    old_content = f.read()
-            
-            with open(new_file_path, 'rb') as f:
-                new_content = f.read()
-            
-            return self.create_content_delta(old_content, new_content)
+            # Map file contents rather than reading them onto the heap
+            with _map_file(new_file_path) as new_content:
+                if not os.path.exists(old_file_path):
+                    return self.create_content_delta(b"", new_content)
+                
+                with _map_file(old_file_path) as old_content:
+                    return self.create_content_delta(
+                        old_content, new_content,
+                        old_signatures=self._cached_signature(old_file_path, old_content)
+                    )
         
         except Exception as e:
             logging.error(f"Error creating file delta: {e}")
             return {
                 "success": False,
                 "error": str(e),
-                "operations": [],
+                "frame": "",
+                "operation_count": 0,
                 "delta_size": 0,
                 "original_size": 0,
                 "bandwidth_saved": 0
             }
     
-    def create_content_delta(self, old_content: bytes, new_content: bytes) -> Dict[str, Any]:
+    def _cached_signature(self, file_path: str, content: bytes) -> ChunkSignatureTable:
+        """
+        Signatures of a file, reused while it is unchanged.
+        
+        Args:
+            file_path: Path the content was read from
+            content: Current content of the file
+            
+        Returns:
+            Chunk signatures of the file
+        """
+        if self.signature_cache_size <= 0:
+            return self.create_signature(content)
+        
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+        cached = self._sig_cache.get(key)
+        if cached is not None:
+            self._sig_cache.move_to_end(key)
+            return cached
+        
+        cached = self.create_signature(content)
+        self._sig_cache[key] = cached
+        if len(self._sig_cache) > self.signature_cache_size:
+            self._sig_cache.popitem(last=False)
+        return cached
+    
+    def invalidate_signature_cache(self, file_path: Optional[str] = None) -> None:
+        """
+        Drop cached signatures for one file, or for every file.
+        
+        Args:
+            file_path: File to forget; None clears the whole cache
+        """
+        if file_path is None:
+            self._sig_cache.clear()
+            return
+        
+        path = os.path.abspath(file_path)
+        for key in [key for key in self._sig_cache if key[0] == path]:
+            del self._sig_cache[key]
+    
+    def create_content_delta(self, old_content: bytes, new_content: bytes,
+                             old_signatures: Optional[ChunkSignatureTable] = None,
+                             raw_frame: bool = False) -> Dict[str, Any]:
         """
         Create delta between two content buffers.
         
         Args:
             old_content: Original content
             new_content: New content
+            old_signatures: Precomputed signatures of old_content, if known
+            raw_frame: Return the frame as bytes for binary transports
+                instead of base64 text for JSON
             
         Returns:
             Dictionary containing delta information
         """
         try:
             # Generate delta operations
-            delta_ops = self.generate_delta(old_content, new_content)
-            optimized_ops = self.optimize_delta(delta_ops)
+            delta_ops, old_signatures, new_digests = self._generate_delta(
+                old_content, new_content, old_signatures
+            )
+            # Merge, size and frame the operations in one pass
+            frame, operation_count, delta_size = self._optimize_and_serialize(delta_ops)
             
-            # Calculate sizes and savings
+            # Calculate savings
             original_size = len(new_content)
-            delta_size = self.calculate_delta_size(optimized_ops)
             bandwidth_saved = max(0, original_size - delta_size)
             
             # Update statistics
@@ -325,29 +838,19 @@ class DeltaSync:
             self.stats["total_delta_size"] += delta_size
             self.stats["bandwidth_saved"] += bandwidth_saved
             
-            # Convert operations to serializable format
-            serializable_ops = []
-            for op in optimized_ops:
-                op_dict = {
-                    "operation": op.operation,
-                    "offset": op.offset,
-                    "size": op.size
-                }
-                if op.data is not None:
-                    op_dict["data"] = op.data.hex()  # Convert to hex string
-                if op.source_offset is not None:
-                    op_dict["source_offset"] = op.source_offset
-                serializable_ops.append(op_dict)
-            
             return {
                 "success": True,
-                "operations": serializable_ops,
+                # One binary frame for all operations, base64-encoded once
+                "frame": frame if raw_frame else base64.b64encode(frame).decode("ascii"),
+                "operation_count": operation_count,
                 "delta_size": delta_size,
                 "original_size": original_size,
                 "bandwidth_saved": bandwidth_saved,
                 "compression_ratio": (bandwidth_saved / original_size * 100) if original_size > 0 else 0,
-                "old_hash": calculate_content_hash(old_content),
-                "new_hash": calculate_content_hash(new_content)
+                # Merkle roots over chunk digests, not whole-file SHA-256
+                "old_root": old_signatures.merkle_root().hex(),
+                "new_root": _merkle_root(new_digests, self.hash_algo).hex(),
+                "hash_algo": self.hash_algo
             }
         
         except Exception as e:
@@ -355,7 +858,8 @@ class DeltaSync:
             return {
                 "success": False,
                 "error": str(e),
-                "operations": [],
+                "frame": "",
+                "operation_count": 0,
                 "delta_size": 0,
                 "original_size": len(new_content),
                 "bandwidth_saved": 0
@@ -376,29 +880,21 @@ class DeltaSync:
             if not delta_info.get("success", False):
                 raise ValueError("Invalid delta information")
             
-            # Convert serialized operations back to DeltaOperation objects
-            operations = []
-            for op_dict in delta_info.get("operations", []):
-                op = DeltaOperation(
-                    operation=op_dict["operation"],
-                    offset=op_dict["offset"],
-                    size=op_dict["size"]
-                )
-                
-                if "data" in op_dict:
-                    op.data = bytes.fromhex(op_dict["data"])
-                if "source_offset" in op_dict:
-                    op.source_offset = op_dict["source_offset"]
-                
-                operations.append(op)
+            # Decode the frame back to DeltaOperation objects; raw frames
+            # are parsed in place with no text decoding at all
+            frame = delta_info.get("frame", b"")
+            if isinstance(frame, str):
+                frame = base64.b64decode(frame)
+            operations = self._parse_frame(frame)
             
             # Apply delta operations
             result = self.apply_delta(old_content, operations)
             
-            # Verify hash if provided
-            if "new_hash" in delta_info:
-                result_hash = calculate_content_hash(result)
-                if result_hash != delta_info["new_hash"]:
+            # Verify hash if provided; deltas from before hash_algo was
+            # recorded always used SHA-256
+            if "new_root" in delta_info:
+                hash_algo = delta_info.get("hash_algo", "sha256")
+                if self.content_root(result, hash_algo) != delta_info["new_root"]:
                     raise ValueError("Hash verification failed after delta reconstruction")
             
             return result
@@ -407,6 +903,83 @@ class DeltaSync:
             logging.error(f"Error reconstructing from delta: {e}")
             raise
     
+    def _optimize_and_serialize(self, delta_ops: List[DeltaOperation]) -> Tuple[bytes, int, int]:
+        """
+        Merge adjacent operations and pack them into a single binary frame.
+        
+        Merging, size accounting (as in ``calculate_delta_size``) and
+        framing share one pass, so no optimized list is materialized.
+        
+        Args:
+            delta_ops: Delta operations from generation
+            
+        Returns:
+            Tuple of (frame, operation count, delta size)
+        """
+        # Op count is patched into the first slot once known
+        headers = array("q", [0])
+        payloads = []
+        count = 0
+        delta_size = 0
+        
+        for op in self._merge_adjacent(delta_ops):
+            count += 1
+            delta_size += 32  # Overhead for operation metadata
+            headers.extend((
+                _OP_CODES[op.operation],
+                op.offset,
+                op.size,
+                -1 if op.source_offset is None else op.source_offset,
+                -1 if op.data is None else len(op.data)
+            ))
+            if op.data:
+                payloads.append(op.data)
+                if op.operation == "add":
+                    delta_size += len(op.data)
+        
+        headers[0] = count
+        if sys.byteorder == "big":
+            headers.byteswap()
+        return headers.tobytes() + b"".join(payloads), count, delta_size
+    
+    def _parse_frame(self, frame: bytes) -> List[DeltaOperation]:
+        """
+        Unpack a binary frame into delta operations.
+        
+        Op data is returned as memoryview slices of ``frame``, not copies.
+        """
+        if not frame:
+            return []
+        
+        view = memoryview(frame)
+        count = array("q")
+        count.frombytes(view[:8])
+        if sys.byteorder == "big":
+            count.byteswap()
+        
+        header_end = 8 * (1 + count[0] * _FRAME_FIELDS)
+        headers = array("q")
+        headers.frombytes(view[8:header_end])
+        if sys.byteorder == "big":
+            headers.byteswap()
+        
+        operations = []
+        data_offset = header_end
+        for i in range(0, len(headers), _FRAME_FIELDS):
+            code, offset, size, source_offset, data_len = headers[i:i + _FRAME_FIELDS]
+            op = DeltaOperation(
+                operation=_OP_NAMES[code],
+                offset=offset,
+                size=size,
+                source_offset=None if source_offset < 0 else source_offset
+            )
+            if data_len >= 0:
+                op.data = view[data_offset:data_offset + data_len]
+                data_offset += data_len
+            operations.append(op)
+        
+        return operations
+    
     def get_statistics(self) -> Dict[str, Any]:
         """
         Get delta sync statistics.
@@ -443,8 +1016,21 @@ class ChunkStore:
     """
     Store for managing file chunks and their metadata.
     Used for efficient chunk-based synchronization.
+    
+    Chunks are appended to a single pack file and located through an index of
+    hash -> (offset, size), so storing a chunk is one write rather than a new
+    file. Space held by deleted chunks is reclaimed by ``cleanup_unreferenced``.
+    
+    The index names the pack its offsets refer to. Compaction writes a new
+    generation (``pack-<n>.bin``), switches the index to it atomically and
+    only then deletes the old pack, so a crash at any point leaves the
+    persisted index consistent with the pack it names.
     """
     
+    PACK_FILE = "pack.bin"  # Pack of indexes written before generations
+    PACK_PATTERN = "pack-{generation}.bin"
+    INDEX_FILE = "index.json"
+    
     def __init__(self, storage_path: str = "./chunks"):
         """
         Initialize chunk store.
@@ -454,7 +1040,68 @@ class ChunkStore:
         """
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.storage_path / self.INDEX_FILE
         self.chunk_index: Dict[str, Dict] = {}  # hash -> chunk info
+        self.dead_chunks = 0  # deleted chunks still occupying pack space
+        self.generation = 0  # compactions so far; names the current pack
+        self.pack_name = self.PACK_PATTERN.format(generation=0)
+        
+        self._load_index()
+        self.pack_path = self.storage_path / self.pack_name
+        self._remove_stale_packs()
+        # Unbuffered so every write is visible to pread immediately
+        self.pack = open(self.pack_path, "ab+", buffering=0)
+    
+    def _load_index(self) -> None:
+        """Load the persisted chunk index, if any."""
+        if not self.index_path.exists():
+            return
+        
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+            self.chunk_index = data.get("chunks", {})
+            self.dead_chunks = data.get("dead_chunks", 0)
+            self.generation = data.get("generation", 0)
+            self.pack_name = data.get("pack", self.PACK_FILE)
+        except Exception as e:
+            logging.error(f"Error loading chunk index {self.index_path}: {e}")
+    
+    def _remove_stale_packs(self) -> None:
+        """Delete packs the index doesn't name, left by an interrupted compaction."""
+        for path in self.storage_path.glob("pack*.bin"):
+            if path.name != self.pack_name:
+                path.unlink(missing_ok=True)
+    
+    def save_index(self) -> bool:
+        """
+        Persist the chunk index atomically.
+        
+        Returns:
+            True if saved successfully
+        """
+        try:
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    "pack": self.pack_name,
+                    "generation": self.generation,
+                    "chunks": self.chunk_index,
+                    "dead_chunks": self.dead_chunks
+                }, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.index_path)
+            return True
+        
+        except Exception as e:
+            logging.error(f"Error saving chunk index {self.index_path}: {e}")
+            return False
+    
+    def close(self) -> None:
+        """Save the index and close the pack file."""
+        self.save_index()
+        self.pack.close()
     
     def store_chunk(self, chunk_hash: str, chunk_data: bytes, metadata: Dict = None) -> bool:
         """
@@ -469,16 +1116,20 @@ class ChunkStore:
             True if stored successfully
         """
         try:
-            chunk_path = self.storage_path / f"{chunk_hash}.chunk"
-            
-            # Store chunk data
-            with open(chunk_path, 'wb') as f:
-                f.write(chunk_data)
+            existing = self.chunk_index.get(chunk_hash)
+            if existing is not None and existing["size"] == len(chunk_data):
+                # Same hash, same bytes: reuse the packed copy
+                offset = existing["offset"]
+            else:
+                if existing is not None:
+                    self.dead_chunks += 1
+                offset = self.pack.seek(0, os.SEEK_END)
+                self.pack.write(chunk_data)
             
             # Update index
             self.chunk_index[chunk_hash] = {
+                "offset": offset,
                 "size": len(chunk_data),
-                "path": str(chunk_path),
                 "metadata": metadata or {},
                 "ref_count": 1
             }
@@ -500,12 +1151,12 @@ class ChunkStore:
             Chunk data or None if not found
         """
         try:
-            if chunk_hash not in self.chunk_index:
+            chunk_info = self.chunk_index.get(chunk_hash)
+            if chunk_info is None:
                 return None
             
-            chunk_path = self.chunk_index[chunk_hash]["path"]
-            with open(chunk_path, 'rb') as f:
-                return f.read()
+            # Positional read: no shared file offset to seek or lock
+            return os.pread(self.pack.fileno(), chunk_info["size"], chunk_info["offset"])
         
         except Exception as e:
             logging.error(f"Error retrieving chunk {chunk_hash}: {e}")
@@ -519,6 +1170,9 @@ class ChunkStore:
         """
         Delete a chunk from the store.
         
+        The chunk leaves the index once unreferenced; its bytes stay in the
+        pack until ``cleanup_unreferenced`` rewrites it.
+        
         Args:
             chunk_hash: Hash of the chunk
             
@@ -530,16 +1184,14 @@ class ChunkStore:
                 return False
             
             chunk_info = self.chunk_index[chunk_hash]
-            chunk_path = chunk_info["path"]
             
             # Decrease reference count
             chunk_info["ref_count"] -= 1
             
-            # Delete if no more references
+            # Drop from the index if no more references
             if chunk_info["ref_count"] <= 0:
-                if os.path.exists(chunk_path):
-                    os.remove(chunk_path)
                 del self.chunk_index[chunk_hash]
+                self.dead_chunks += 1
             
             return True
         
@@ -550,11 +1202,14 @@ class ChunkStore:
     def get_store_stats(self) -> Dict[str, Any]:
         """Get chunk store statistics."""
         total_size = sum(info["size"] for info in self.chunk_index.values())
+        pack_size = self.pack_path.stat().st_size if self.pack_path.exists() else 0
         
         return {
             "total_chunks": len(self.chunk_index),
             "total_size": total_size,
             "total_size_formatted": format_bytes(total_size),
+            "pack_size": pack_size,
+            "reclaimable_size": max(0, pack_size - total_size),
             "storage_path": str(self.storage_path)
         }
     
@@ -562,18 +1217,64 @@ class ChunkStore:
         """
         Clean up chunks with zero references.
         
+        Rewrites the pack with only the live chunks and persists the new
+        index, reclaiming the space of every chunk deleted since the last run.
+        
         Returns:
             Number of chunks cleaned up
         """
-        cleanup_count = 0
-        chunks_to_remove = []
+        # Entries loaded from an older index may still carry ref_count <= 0
+        for chunk_hash in [h for h, info in self.chunk_index.items() if info["ref_count"] <= 0]:
+            del self.chunk_index[chunk_hash]
+            self.dead_chunks += 1
+        
+        cleanup_count = self.dead_chunks
+        if cleanup_count == 0:
+            return 0
         
-        for chunk_hash, info in self.chunk_index.items():
-            if info["ref_count"] <= 0:
-                chunks_to_remove.append(chunk_hash)
+        generation = self.generation + 1
+        pack_name = self.PACK_PATTERN.format(generation=generation)
+        new_path = self.storage_path / pack_name
+        old_state = (self.pack_name, self.generation, self.dead_chunks,
+                     {chunk_hash: info["offset"] for chunk_hash, info in self.chunk_index.items()})
         
-        for chunk_hash in chunks_to_remove:
-            if self.delete_chunk(chunk_hash):
-                cleanup_count += 1
+        try:
+            # 1. Write the live chunks to the next generation's pack
+            fd = self.pack.fileno()
+            new_offsets = {}
+            with open(new_path, 'wb') as out:
+                for chunk_hash, info in sorted(self.chunk_index.items(), key=lambda item: item[1]["offset"]):
+                    new_offsets[chunk_hash] = out.tell()
+                    out.write(os.pread(fd, info["size"], info["offset"]))
+                out.flush()
+                os.fsync(out.fileno())
+            new_pack = open(new_path, "ab+", buffering=0)
+            
+            # 2. Point the persisted index at it; until this rename lands the
+            # old index and old pack are still a consistent pair
+            for chunk_hash, offset in new_offsets.items():
+                self.chunk_index[chunk_hash]["offset"] = offset
+            self.pack_name, self.generation, self.dead_chunks = pack_name, generation, 0
+            if not self.save_index():
+                new_pack.close()
+                raise OSError(f"could not save chunk index {self.index_path}")
+        
+        except Exception as e:
+            logging.error(f"Error compacting chunk pack {self.pack_path}: {e}")
+            self.pack_name, self.generation, self.dead_chunks, old_offsets = old_state
+            for chunk_hash, offset in old_offsets.items():
+                self.chunk_index[chunk_hash]["offset"] = offset
+            new_path.unlink(missing_ok=True)
+            return 0
+        
+        # 3. Only now is the old pack unreferenced
+        old_pack, old_path = self.pack, self.pack_path
+        self.pack, self.pack_path = new_pack, new_path
+        old_pack.close()
+        try:
+            old_path.unlink()
+        except OSError as e:
+            # Removed on the next start as a pack the index doesn't name
+            logging.warning(f"Could not remove old chunk pack {old_path}: {e}")
         
-        return cleanup_count 
\ No newline at end of file
+        return cleanup_count
\ No newline at end of file
@@ -3,19 +3,217 @@ File version manager for the distributed file synchronization system.
 Handles file versioning, history tracking, and conflict resolution.
 """
 
+import asyncio
+import functools
+import hashlib
 import json
+import mmap
 import os
 import shutil
+import sqlite3
+import tempfile
+import threading
+import time
 import logging
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Tuple, BinaryIO, Iterator, Union
+from dataclasses import dataclass, replace
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from shared.models import FileVersion, FileMetadata, VectorClockModel
 from shared.utils import calculate_content_hash, calculate_file_hash, ensure_directory, format_bytes, generate_unique_id
 
 
+# One row per version; replaces the metadata/<version_id>.json files.
+# created_at is INTEGER epoch microseconds, so loading a row parses no strings;
+# hash is the raw 32-byte digest, half the size of its hex form in both the
+# rows and the hash index.
+_SCHEMA_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS versions (
+        version_id TEXT PRIMARY KEY,
+        file_id TEXT NOT NULL,
+        version_number INTEGER NOT NULL,
+        hash BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        created_at INTEGER NOT NULL,
+        created_by TEXT NOT NULL,
+        vector_clock TEXT NOT NULL,
+        metadata TEXT NOT NULL,
+        is_current INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_versions_file_number ON versions (file_id, version_number)",
+    "CREATE INDEX IF NOT EXISTS idx_versions_file_current ON versions (file_id, is_current)",
+    "CREATE INDEX IF NOT EXISTS idx_versions_hash ON versions (hash)",
+]
+
+_VERSION_COLUMNS = (
+    "version_id, file_id, version_number, hash, size, created_at, "
+    "created_by, vector_clock, metadata, is_current"
+)
+
+_UPSERT_VERSION_SQL = f"""
+    INSERT OR REPLACE INTO versions ({_VERSION_COLUMNS})
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Read size for streamed version content
+_STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Threads reading legacy metadata files; file reads release the GIL, so
+# they overlap disk latency even though parsing does not
+_LEGACY_IMPORT_WORKERS = 16
+
+
+def _datetime_to_us(value: datetime) -> int:
+    """Epoch microseconds for a created_at value."""
+    return round(value.timestamp() * 1_000_000)
+
+
+def _us_to_datetime(value: int) -> datetime:
+    """Local datetime for stored epoch microseconds."""
+    return datetime.fromtimestamp(value / 1_000_000)
+
+
+def _hash_to_db(content_hash: str) -> Any:
+    """Raw digest bytes for a hex content hash; other strings are kept as is."""
+    try:
+        return bytes.fromhex(content_hash)
+    except ValueError:
+        return content_hash
+
+
+def _hash_from_db(value: Any) -> str:
+    """Hex content hash for a stored hash column value."""
+    return value.hex() if isinstance(value, bytes) else value
+
+
+def _clocks_from_db(data: Any) -> Dict[str, int]:
+    """Node -> counter mapping from a stored clock, with or without the model wrapper."""
+    clocks = _json_loads(data)
+    if isinstance(clocks.get("clocks"), dict):
+        # Written as VectorClockModel.dict()
+        clocks = clocks["clocks"]
+    return clocks
+
+
+def _synchronized(method):
+    """Run a FileVersionManager method under the manager's lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _json_dumps(value: Any) -> bytes:
+    """Compact JSON for index columns, via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def _json_loads(data: Any) -> Any:
+    """Decode JSON written by _json_dumps or by the old text format."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _write_all(f, content: bytes) -> None:
+    """
+    Write content to an unbuffered file.
+    
+    One-shot writes skip the 8 KiB userspace buffer, which would only add
+    a copy; the loop covers short writes (e.g. the ~2 GiB cap per write).
+    """
+    view = memoryview(content)
+    while view:
+        view = view[f.write(view):]
+
+
+class _LRUCache(OrderedDict):
+    """Dict that evicts its least recently used entry beyond ``maxsize``."""
+    
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+    
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+    
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+    
+    def peek(self, key, default=None):
+        """Look up a key without marking it recently used."""
+        return super().get(key, default)
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+class _ContentCache:
+    """
+    Byte-budgeted LRU of blob contents with a time-to-use.
+    
+    Contents larger than ``max_item_bytes`` are never admitted, so reading
+    one big old version can't flush the small hot ones; an entry unused for
+    ``ttl`` seconds is dropped on its next lookup.
+    """
+    
+    def __init__(self, max_bytes: int, max_item_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = min(max_item_bytes, max_bytes)
+        self.ttl = ttl
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        now = time.monotonic()
+        if now >= entry[0]:
+            self.pop(key)
+            return None
+        
+        self._entries[key] = (now + self.ttl, entry[1])
+        self._entries.move_to_end(key)
+        return entry[1]
+    
+    def put(self, key: str, content: bytes) -> None:
+        if len(content) > self.max_item_bytes or key in self._entries:
+            return
+        
+        self._entries[key] = (time.monotonic() + self.ttl, content)
+        self.size += len(content)
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+    
+    def pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+
 @dataclass
 class VersionStats:
     """Statistics for file versions."""
@@ -32,14 +230,27 @@ class FileVersionManager:
     Provides version control functionality for the distributed file sync system.
     """
     
-    def __init__(self, storage_path: str = "./versions"):
+    def __init__(self, storage_path: str = "./versions", durability: bool = False,
+                 max_cached_versions: int = 10_000,
+                 content_cache_bytes: int = 64 * 1024 * 1024,
+                 content_cache_max_item: int = 4 * 1024 * 1024,
+                 content_cache_ttl: float = 300.0):
         """
         Initialize file version manager.
         
         Args:
             storage_path: Directory to store file versions
+            durability: fsync version data before it is referenced, so a
+                crash can't leave an index row pointing at a torn blob
+            max_cached_versions: FileVersion objects kept in memory; the
+                rest are loaded from the index on demand
+            content_cache_bytes: Memory budget for cached version content;
+                0 disables the content cache
+            content_cache_max_item: Largest content admitted to the cache
+            content_cache_ttl: Seconds a cached content may go unused
         """
         self.storage_path = Path(storage_path)
+        self.durability = durability
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
         # Subdirectories for organization
@@ -49,9 +260,34 @@ class FileVersionManager:
         self.versions_dir.mkdir(exist_ok=True)
         self.metadata_dir.mkdir(exist_ok=True)
         
-        # In-memory cache for quick access
-        self.version_cache: Dict[str, FileVersion] = {}
-        self.file_metadata_cache: Dict[str, FileMetadata] = {}
+        # Version metadata index: an indexed lookup per query instead of
+        # opening and parsing a JSON file per version
+        self.db = sqlite3.connect(
+            self.storage_path / "index.db", isolation_level=None, check_same_thread=False
+        )
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+        
+        # In-memory caches for quick access, bounded with LRU eviction
+        self.version_cache: Dict[str, FileVersion] = _LRUCache(max_cached_versions)
+        self.file_metadata_cache: Dict[str, FileMetadata] = _LRUCache(max_cached_versions)
+        # file_id -> (version_number, version_id) of each of its versions,
+        # sorted; FileVersion objects are materialized on demand
+        self.by_file: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+        # Hot version content by content hash; blobs never change in place,
+        # so entries only go when the blob is deleted or evicted
+        self.content_cache = _ContentCache(
+            content_cache_bytes, content_cache_max_item, content_cache_ttl
+        )
+        
+        # Aggregates kept up to date on create/delete instead of rescanned
+        # per call; per-file entries are computed on first request
+        self.file_stats: Dict[str, VersionStats] = {}
+        self.global_stats = {"total_versions": 0, "total_size": 0, "stored_size": 0}
+        
+        # Guards the index and the in-memory state; the async methods run
+        # in worker threads, content I/O mostly outside the lock
+        self._lock = threading.RLock()
         
         # Load existing metadata
         self._load_metadata_cache()
@@ -72,47 +308,168 @@ class FileVersionManager:
             Created FileVersion object
         """
         try:
-            # Generate version ID and calculate hash
-            version_id = generate_unique_id(f"v_{file_id}")
             content_hash = calculate_content_hash(content)
             
-            # Determine version number
-            existing_versions = self.get_file_versions(file_id)
-            version_number = len(existing_versions) + 1
-            
-            # Create version object
-            version = FileVersion(
-                version_id=version_id,
-                file_id=file_id,
-                version_number=version_number,
-                hash=content_hash,
-                size=len(content),
-                created_at=datetime.now(),
-                created_by=created_by,
-                vector_clock=vector_clock,
-                metadata=metadata or {},
-                is_current=True  # Will be set to False for previous versions
-            )
-            
-            # Mark previous versions as not current
-            for existing_version in existing_versions:
-                existing_version.is_current = False
-                self._save_version_metadata(existing_version)
+            # Store version data and register its metadata under one lock
+            # hold, so a concurrent delete can't release an identical blob
+            # in between; large content should use create_version_from_stream,
+            # which writes outside the lock
+            with self._lock:
+                self._store_version_data(content_hash, content)
+                return self._register_version(
+                    file_id, content_hash, len(content), created_by, vector_clock, metadata
+                )
+        
+        except Exception as e:
+            logging.error(f"Error creating version for file {file_id}: {e}")
+            raise
+    
+    def create_version_from_stream(self, file_id: str, stream: BinaryIO, created_by: str,
+                                   vector_clock: VectorClockModel,
+                                   metadata: Dict[str, Any] = None) -> FileVersion:
+        """
+        Create a new version of a file from a binary stream.
+        
+        The stream is read in 1 MiB chunks that are hashed and written to
+        disk as they arrive, so the content is never held in memory whole.
+        
+        Args:
+            file_id: Unique file identifier
+            stream: Readable binary file object positioned at the content
+            created_by: Node ID that created this version
+            vector_clock: Vector clock for this version
+            metadata: Optional additional metadata
             
-            # Store version data and metadata
-            self._store_version_data(version_id, content)
-            self._save_version_metadata(version)
+        Returns:
+            Created FileVersion object
+        """
+        try:
+            # Same digest as calculate_content_hash, computed incrementally
+            hasher = hashlib.sha256()
+            size = 0
             
-            # Update cache
-            self.version_cache[version_id] = version
+            fd, tmp_name = tempfile.mkstemp(dir=self.versions_dir, suffix=".tmp")
+            try:
+                with open(fd, 'wb', buffering=0) as f:
+                    while True:
+                        chunk = stream.read(_STREAM_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        hasher.update(chunk)
+                        _write_all(f, chunk)
+                        size += len(chunk)
+                    
+                    if self.durability:
+                        os.fsync(f.fileno())
+                
+                content_hash = hasher.hexdigest()
+                with self._lock:
+                    # Publish and register together so a concurrent delete
+                    # can't release the blob in between
+                    self._publish_blob(Path(tmp_name), content_hash)
+                    return self._register_version(
+                        file_id, content_hash, size, created_by, vector_clock, metadata
+                    )
             
-            logging.info(f"Created version {version_id} for file {file_id}")
-            return version
+            except BaseException:
+                if os.path.exists(tmp_name):
+                    os.remove(tmp_name)
+                raise
         
         except Exception as e:
-            logging.error(f"Error creating version for file {file_id}: {e}")
+            logging.error(f"Error creating version for file {file_id} from stream: {e}")
             raise
     
+    def _create_version_from_existing(self, file_id: str, source_version: FileVersion,
+                                      vector_clock: VectorClockModel, created_by: str,
+                                      metadata: Optional[Dict[str, Any]]) -> Optional[FileVersion]:
+        """
+        Create a new version whose content is an existing version's.
+        
+        The content is already stored under the source's hash, so nothing
+        is read, hashed or written; only a new index row is added.
+        
+        Returns:
+            Created FileVersion, or None if the source content is missing
+        """
+        if not self._blob_path(source_version.hash).exists():
+            source_path = self._version_data_path(source_version.version_id)
+            if source_path is None:
+                return None
+            
+            # Data written before content addressing; give it a blob once
+            fd, tmp_name = tempfile.mkstemp(dir=self.versions_dir, suffix=".tmp")
+            os.close(fd)
+            try:
+                shutil.copyfile(source_path, tmp_name)
+                self._publish_blob(Path(tmp_name), source_version.hash)
+            except BaseException:
+                if os.path.exists(tmp_name):
+                    os.remove(tmp_name)
+                raise
+        
+        return self._register_version(
+            file_id, source_version.hash, source_version.size, created_by, vector_clock, metadata
+        )
+    
+    @_synchronized
+    def _register_version(self, file_id: str, content_hash: str, size: int, created_by: str,
+                          vector_clock: VectorClockModel, metadata: Optional[Dict[str, Any]]) -> FileVersion:
+        """Record a new current version whose content is already stored."""
+        version_id = generate_unique_id(f"v_{file_id}")
+        
+        # Determine version number; one past the latest, so the
+        # per-file list stays sorted when the new version is appended
+        file_entries = self.by_file[file_id]
+        version_number = file_entries[-1][0] + 1 if file_entries else 1
+        
+        # Create version object
+        version = FileVersion(
+            version_id=version_id,
+            file_id=file_id,
+            version_number=version_number,
+            hash=content_hash,
+            size=size,
+            created_at=datetime.now(),
+            created_by=created_by,
+            vector_clock=vector_clock,
+            metadata=metadata or {},
+            is_current=True  # Will be set to False for previous versions
+        )
+        
+        # Demote the previous current version and insert the new one
+        # atomically; one UPDATE instead of rewriting every earlier row
+        with self._transaction():
+            self.db.execute(
+                "UPDATE versions SET is_current = 0 WHERE file_id = ? AND is_current = 1",
+                (file_id,)
+            )
+            self._save_version_metadata(version)
+        
+        for _, existing_id in file_entries:
+            existing_version = self.version_cache.peek(existing_id)
+            if existing_version is not None:
+                existing_version.is_current = False
+        
+        # Update cache
+        self.version_cache[version_id] = version
+        file_entries.append((version_number, version_id))
+        
+        # Update statistics
+        self.global_stats["total_versions"] += 1
+        self.global_stats["total_size"] += size
+        stats = self.file_stats.get(file_id)
+        if stats is not None:
+            stats.total_versions += 1
+            stats.total_size += size
+            stats.newest_version = version.created_at
+            stats.oldest_version = stats.oldest_version or version.created_at
+            stats.current_version = version_id
+        
+        logging.info(f"Created version {version_id} for file {file_id}")
+        return version
+    
+    @_synchronized
     def get_version(self, version_id: str) -> Optional[FileVersion]:
         """
         Get a specific file version.
@@ -127,35 +484,25 @@ class FileVersionManager:
         if version_id in self.version_cache:
             return self.version_cache[version_id]
         
-        # Load from disk
-        metadata_path = self.metadata_dir / f"{version_id}.json"
-        if metadata_path.exists():
-            try:
-                with open(metadata_path, 'r') as f:
-                    data = json.load(f)
-                
-                version = FileVersion(
-                    version_id=data["version_id"],
-                    file_id=data["file_id"],
-                    version_number=data["version_number"],
-                    hash=data["hash"],
-                    size=data["size"],
-                    created_at=datetime.fromisoformat(data["created_at"]),
-                    created_by=data["created_by"],
-                    vector_clock=VectorClockModel(**data["vector_clock"]),
-                    metadata=data.get("metadata", {}),
-                    is_current=data.get("is_current", False)
-                )
+        # Load from the index
+        try:
+            row = self.db.execute(
+                f"SELECT {_VERSION_COLUMNS} FROM versions WHERE version_id = ?",
+                (version_id,)
+            ).fetchone()
+            if row:
+                version = self._row_to_version(row)
                 
                 # Cache for future access
                 self.version_cache[version_id] = version
                 return version
-            
-            except Exception as e:
-                logging.error(f"Error loading version {version_id}: {e}")
+        
+        except Exception as e:
+            logging.error(f"Error loading version {version_id}: {e}")
         
         return None
     
+    @_synchronized
     def get_version_content(self, version_id: str) -> Optional[bytes]:
         """
         Get the content of a specific version.
@@ -166,16 +513,76 @@ class FileVersionManager:
         Returns:
             File content as bytes or None if not found
         """
-        version_path = self.versions_dir / f"{version_id}.data"
-        if version_path.exists():
+        version = self.get_version(version_id)
+        if version is not None:
+            content = self.content_cache.get(version.hash)
+            if content is not None:
+                return content
+        
+        version_path = self._version_data_path(version_id)
+        if version_path is not None:
             try:
                 with open(version_path, 'rb') as f:
-                    return f.read()
+                    content = f.read()
+                
+                if version is not None:
+                    self.content_cache.put(version.hash, content)
+                return content
             except Exception as e:
                 logging.error(f"Error reading version content {version_id}: {e}")
         
         return None
     
+    def get_version_content_mmap(self, version_id: str) -> Optional[Union[mmap.mmap, bytes]]:
+        """
+        Map the content of a specific version read-only.
+        
+        Pages come from the page cache on demand instead of being copied
+        onto the heap. The caller closes the mapping when done.
+        
+        Args:
+            version_id: Version identifier
+            
+        Returns:
+            Read-only mmap, b"" for empty content (which can't be mapped),
+            or None if not found
+        """
+        version_path = self._version_data_path(version_id)
+        if version_path is None:
+            return None
+        
+        with open(version_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def get_version_content_stream(self, version_id: str,
+                                   chunk_size: int = _STREAM_CHUNK_SIZE) -> Optional[Iterator[bytes]]:
+        """
+        Get the content of a specific version as a stream of chunks.
+        
+        Args:
+            version_id: Version identifier
+            chunk_size: Bytes per yielded chunk
+            
+        Returns:
+            Iterator over the content, or None if not found
+        """
+        version_path = self._version_data_path(version_id)
+        if version_path is None:
+            return None
+        
+        def read_chunks() -> Iterator[bytes]:
+            with open(version_path, 'rb', buffering=0) as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+        
+        return read_chunks()
+    
+    @_synchronized
     def get_file_versions(self, file_id: str) -> List[FileVersion]:
         """
         Get all versions of a specific file.
@@ -186,35 +593,27 @@ class FileVersionManager:
         Returns:
             List of FileVersion objects sorted by version number
         """
-        versions = []
+        entries = self.by_file.get(file_id)
+        if not entries:
+            return []
         
-        # Search through metadata files
-        for metadata_file in self.metadata_dir.glob("*.json"):
-            try:
-                with open(metadata_file, 'r') as f:
-                    data = json.load(f)
-                
-                if data.get("file_id") == file_id:
-                    version = FileVersion(
-                        version_id=data["version_id"],
-                        file_id=data["file_id"],
-                        version_number=data["version_number"],
-                        hash=data["hash"],
-                        size=data["size"],
-                        created_at=datetime.fromisoformat(data["created_at"]),
-                        created_by=data["created_by"],
-                        vector_clock=VectorClockModel(**data["vector_clock"]),
-                        metadata=data.get("metadata", {}),
-                        is_current=data.get("is_current", False)
-                    )
-                    versions.append(version)
-            
-            except Exception as e:
-                logging.error(f"Error reading metadata file {metadata_file}: {e}")
+        versions = [self.version_cache.get(version_id) for _, version_id in entries]
+        if None in versions:
+            # Materialize every evicted version with one indexed query
+            rows = {
+                row[0]: row for row in self.db.execute(
+                    f"SELECT {_VERSION_COLUMNS} FROM versions WHERE file_id = ?", (file_id,)
+                )
+            }
+            for i, (_, version_id) in enumerate(entries):
+                if versions[i] is None and version_id in rows:
+                    versions[i] = self._row_to_version(rows[version_id])
+                    self.version_cache[version_id] = versions[i]
+            versions = [version for version in versions if version is not None]
         
-        # Sort by version number
-        return sorted(versions, key=lambda v: v.version_number)
+        return versions
     
+    @_synchronized
     def get_current_version(self, file_id: str) -> Optional[FileVersion]:
         """
         Get the current (latest) version of a file.
@@ -225,16 +624,23 @@ class FileVersionManager:
         Returns:
             Current FileVersion or None if file doesn't exist
         """
-        versions = self.get_file_versions(file_id)
-        current_versions = [v for v in versions if v.is_current]
+        entries = self.by_file.get(file_id)
+        if not entries:
+            return None
         
-        if current_versions:
-            return current_versions[0]
-        elif versions:
-            # Fallback to latest version if none marked as current
-            return versions[-1]
+        # The current version is almost always the newest, so this usually
+        # materializes a single version
+        latest = None
+        for _, version_id in reversed(entries):
+            version = self.get_version(version_id)
+            if version is None:
+                continue
+            if version.is_current:
+                return version
+            latest = latest or version
         
-        return None
+        # Fallback to latest version if none marked as current
+        return latest
     
     def restore_version(self, version_id: str, target_path: str) -> bool:
         """
@@ -248,17 +654,17 @@ class FileVersionManager:
             True if successful, False otherwise
         """
         try:
-            content = self.get_version_content(version_id)
-            if content is None:
+            version_path = self._version_data_path(version_id)
+            if version_path is None:
                 logging.error(f"Version {version_id} content not found")
                 return False
             
             # Ensure target directory exists
             ensure_directory(os.path.dirname(target_path))
             
-            # Write content to target file
-            with open(target_path, 'wb') as f:
-                f.write(content)
+            # File to file copy; on Linux shutil uses sendfile, so the
+            # content is never read into Python
+            shutil.copyfile(version_path, target_path)
             
             logging.info(f"Restored version {version_id} to {target_path}")
             return True
@@ -267,6 +673,7 @@ class FileVersionManager:
             logging.error(f"Error restoring version {version_id}: {e}")
             return False
     
+    @_synchronized
     def delete_version(self, version_id: str) -> bool:
         """
         Delete a specific version.
@@ -284,31 +691,11 @@ class FileVersionManager:
                 return False
             
             # Don't allow deleting the current version if it's the only one
-            file_versions = self.get_file_versions(version.file_id)
-            if len(file_versions) == 1 and version.is_current:
+            if len(self.by_file.get(version.file_id, ())) == 1 and version.is_current:
                 logging.warning(f"Cannot delete the only version {version_id}")
                 return False
             
-            # Delete data and metadata files
-            data_path = self.versions_dir / f"{version_id}.data"
-            metadata_path = self.metadata_dir / f"{version_id}.json"
-            
-            if data_path.exists():
-                os.remove(data_path)
-            if metadata_path.exists():
-                os.remove(metadata_path)
-            
-            # Remove from cache
-            if version_id in self.version_cache:
-                del self.version_cache[version_id]
-            
-            # If this was the current version, mark the latest remaining version as current
-            if version.is_current:
-                remaining_versions = [v for v in file_versions if v.version_id != version_id]
-                if remaining_versions:
-                    latest_version = max(remaining_versions, key=lambda v: v.version_number)
-                    latest_version.is_current = True
-                    self._save_version_metadata(latest_version)
+            self._delete_versions_batch([version], version.file_id)
             
             logging.info(f"Deleted version {version_id}")
             return True
@@ -317,6 +704,7 @@ class FileVersionManager:
             logging.error(f"Error deleting version {version_id}: {e}")
             return False
     
+    @_synchronized
     def merge_versions(self, version1_id: str, version2_id: str, merge_strategy: str = "latest") -> Optional[FileVersion]:
         """
         Merge two versions using the specified strategy.
@@ -350,28 +738,25 @@ class FileVersionManager:
                 # For manual merging, default to version1
                 winner = version1
             
-            # Get winner's content
-            content = self.get_version_content(winner.version_id)
-            if content is None:
-                logging.error(f"Cannot retrieve content for winning version {winner.version_id}")
-                return None
-            
             # Create merged vector clock (take max of each component)
             merged_clock = version1.vector_clock.copy()
             merged_clock.update(version2.vector_clock)
             
-            # Create new merged version
-            merged_version = self.create_version(
+            # Create new merged version over the winner's stored content
+            merged_version = self._create_version_from_existing(
                 file_id=version1.file_id,
-                content=content,
-                created_by=f"merge_{version1.created_by}_{version2.created_by}",
+                source_version=winner,
                 vector_clock=merged_clock,
+                created_by=f"merge_{version1.created_by}_{version2.created_by}",
                 metadata={
                     "merged_from": [version1_id, version2_id],
                     "merge_strategy": merge_strategy,
                     "merge_timestamp": datetime.now().isoformat()
                 }
             )
+            if merged_version is None:
+                logging.error(f"Cannot retrieve content for winning version {winner.version_id}")
+                return None
             
             logging.info(f"Merged versions {version1_id} and {version2_id} into {merged_version.version_id}")
             return merged_version
@@ -380,13 +765,17 @@ class FileVersionManager:
             logging.error(f"Error merging versions {version1_id} and {version2_id}: {e}")
             return None
     
-    def get_version_diff(self, version1_id: str, version2_id: str) -> Dict[str, Any]:
+    @_synchronized
+    def get_version_diff(self, version1_id: str, version2_id: str,
+                         load_content: bool = False) -> Dict[str, Any]:
         """
         Get differences between two versions.
         
         Args:
             version1_id: First version ID
             version2_id: Second version ID
+            load_content: Compare the stored bytes as well; by default the
+                content hashes decide whether the versions are identical
             
         Returns:
             Dictionary with diff information
@@ -398,11 +787,28 @@ class FileVersionManager:
             if not version1 or not version2:
                 return {"error": "One or both versions not found"}
             
-            content1 = self.get_version_content(version1_id)
-            content2 = self.get_version_content(version2_id)
+            hash_changed = version1.hash != version2.hash
             
-            if content1 is None or content2 is None:
-                return {"error": "Cannot retrieve version content"}
+            if not load_content:
+                # SHA-256 equality settles it; only check the content exists
+                if (self._version_data_path(version1_id) is None or
+                        self._version_data_path(version2_id) is None):
+                    return {"error": "Cannot retrieve version content"}
+                content_identical = not hash_changed
+            else:
+                # Compare mapped content rather than two heap copies
+                content1 = self.get_version_content_mmap(version1_id)
+                content2 = self.get_version_content_mmap(version2_id)
+                try:
+                    if content1 is None or content2 is None:
+                        return {"error": "Cannot retrieve version content"}
+                    
+                    with memoryview(content1) as view1, memoryview(content2) as view2:
+                        content_identical = view1 == view2
+                finally:
+                    for content in (content1, content2):
+                        if isinstance(content, mmap.mmap):
+                            content.close()
             
             # Basic diff information
             diff_info = {
@@ -419,8 +825,8 @@ class FileVersionManager:
                     "created_at": version2.created_at.isoformat()
                 },
                 "size_difference": version2.size - version1.size,
-                "hash_changed": version1.hash != version2.hash,
-                "content_identical": content1 == content2
+                "hash_changed": hash_changed,
+                "content_identical": content_identical
             }
             
             # Vector clock comparison
@@ -433,6 +839,7 @@ class FileVersionManager:
             logging.error(f"Error getting diff between {version1_id} and {version2_id}: {e}")
             return {"error": str(e)}
     
+    @_synchronized
     def get_file_statistics(self, file_id: str) -> VersionStats:
         """
         Get statistics for all versions of a file.
@@ -443,6 +850,17 @@ class FileVersionManager:
         Returns:
             VersionStats object
         """
+        stats = self.file_stats.get(file_id)
+        if stats is None:
+            stats = self._compute_file_statistics(file_id)
+            if stats.total_versions:
+                self.file_stats[file_id] = stats
+        
+        # A copy, so callers can't skew the running totals
+        return replace(stats)
+    
+    def _compute_file_statistics(self, file_id: str) -> VersionStats:
+        """Aggregate statistics over all versions of a file."""
         versions = self.get_file_versions(file_id)
         
         if not versions:
@@ -466,6 +884,7 @@ class FileVersionManager:
             current_version=current_version
         )
     
+    @_synchronized
     def cleanup_old_versions(self, file_id: str, keep_versions: int = 10) -> int:
         """
         Clean up old versions, keeping only the specified number.
@@ -483,14 +902,9 @@ class FileVersionManager:
             if len(versions) <= keep_versions:
                 return 0
             
-            # Sort by version number and keep the latest ones
-            versions_to_delete = versions[:-keep_versions]
-            deleted_count = 0
-            
-            for version in versions_to_delete:
-                # Don't delete the current version
-                if not version.is_current and self.delete_version(version.version_id):
-                    deleted_count += 1
+            # Sort by version number and keep the latest ones; never the current version
+            versions_to_delete = [v for v in versions[:-keep_versions] if not v.is_current]
+            deleted_count = self._delete_versions_batch(versions_to_delete, file_id)
             
             logging.info(f"Cleaned up {deleted_count} old versions for file {file_id}")
             return deleted_count
@@ -499,6 +913,7 @@ class FileVersionManager:
             logging.error(f"Error cleaning up versions for file {file_id}: {e}")
             return 0
     
+    @_synchronized
     def get_storage_statistics(self) -> Dict[str, Any]:
         """
         Get overall storage statistics.
@@ -507,27 +922,17 @@ class FileVersionManager:
             Dictionary with storage statistics
         """
         try:
-            total_versions = 0
-            total_size = 0
-            files_tracked = set()
-            
-            for metadata_file in self.metadata_dir.glob("*.json"):
-                try:
-                    with open(metadata_file, 'r') as f:
-                        data = json.load(f)
-                    
-                    total_versions += 1
-                    total_size += data.get("size", 0)
-                    files_tracked.add(data.get("file_id"))
-                
-                except Exception:
-                    continue
+            total_versions = self.global_stats["total_versions"]
+            total_size = self.global_stats["total_size"]
+            stored_size = self.global_stats["stored_size"]
             
             return {
                 "total_versions": total_versions,
-                "total_files": len(files_tracked),
+                "total_files": len(self.by_file),
                 "total_size": total_size,
                 "total_size_formatted": format_bytes(total_size),
+                "stored_size": stored_size,
+                "stored_size_formatted": format_bytes(stored_size),
                 "storage_path": str(self.storage_path),
                 "average_file_size": total_size // total_versions if total_versions > 0 else 0
             }
@@ -536,55 +941,392 @@ class FileVersionManager:
             logging.error(f"Error getting storage statistics: {e}")
             return {}
     
-    def _store_version_data(self, version_id: str, content: bytes) -> None:
-        """Store version data to disk."""
-        data_path = self.versions_dir / f"{version_id}.data"
-        with open(data_path, 'wb') as f:
-            f.write(content)
+    def _delete_versions_batch(self, versions: List[FileVersion], file_id: str) -> int:
+        """
+        Delete versions of one file with a single index transaction.
+        
+        If a deleted version was current, the latest remaining version is
+        made current in the same transaction. Data files are unlinked after
+        the commit, once no remaining version references them.
+        
+        Args:
+            versions: Versions to delete, all belonging to file_id
+            file_id: File identifier
+            
+        Returns:
+            Number of versions deleted
+        """
+        if not versions:
+            return 0
+        
+        doomed = {version.version_id for version in versions}
+        promoted = None
+        if any(version.is_current for version in versions):
+            remaining = [v for v in self.get_file_versions(file_id) if v.version_id not in doomed]
+            if remaining:
+                promoted = remaining[-1]
+        
+        with self._transaction():
+            self.db.executemany(
+                "DELETE FROM versions WHERE version_id = ?",
+                [(version_id,) for version_id in doomed]
+            )
+            if promoted is not None:
+                self.db.execute(
+                    "UPDATE versions SET is_current = 1 WHERE version_id = ?",
+                    (promoted.version_id,)
+                )
+        
+        if promoted is not None:
+            promoted.is_current = True
+        
+        # Update statistics; a file whose oldest, newest or current version
+        # went is recomputed on its next request
+        self.global_stats["total_versions"] -= len(versions)
+        self.global_stats["total_size"] -= sum(version.size for version in versions)
+        stats = self.file_stats.get(file_id)
+        if stats is not None:
+            if promoted is not None or any(
+                    version.created_at in (stats.oldest_version, stats.newest_version)
+                    for version in versions):
+                del self.file_stats[file_id]
+            else:
+                stats.total_versions -= len(versions)
+                stats.total_size -= sum(version.size for version in versions)
+        
+        for version in versions:
+            # Remove from cache and the file's version list
+            self.version_cache.pop(version.version_id, None)
+            self._unlink_from_file_index(version)
+            self._release_version_data(version)
+        
+        return len(doomed)
+    
+    @contextmanager
+    def _transaction(self):
+        """Run the enclosed index writes as one transaction."""
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+    
+    def _blob_path(self, content_hash: str) -> Path:
+        """Location of the content-addressed blob for a hash."""
+        return self.versions_dir / content_hash[:2] / content_hash
+    
+    @_synchronized
+    def _version_data_path(self, version_id: str) -> Optional[Path]:
+        """Resolve a version to the file holding its content."""
+        version = self.get_version(version_id)
+        if version is not None:
+            blob_path = self._blob_path(version.hash)
+            if blob_path.exists():
+                return blob_path
+        
+        # Versions written before content addressing
+        legacy_path = self.versions_dir / f"{version_id}.data"
+        return legacy_path if legacy_path.exists() else None
+    
+    def _store_version_data(self, content_hash: str, content: bytes) -> None:
+        """
+        Store version data to disk, once per distinct content.
+        
+        Identical content (e.g. the winner of a merge) is already on disk
+        under its hash, so nothing is written.
+        """
+        data_path = self._blob_path(content_hash)
+        if data_path.exists():
+            return
+        
+        # Write under a temporary name so a partial blob is never mistaken
+        # for a complete one
+        fd, tmp_name = tempfile.mkstemp(dir=self.versions_dir, suffix=".tmp")
+        try:
+            with open(fd, 'wb', buffering=0) as f:
+                _write_all(f, content)
+                if self.durability:
+                    os.fsync(f.fileno())
+            self._publish_blob(Path(tmp_name), content_hash)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
+    
+    @_synchronized
+    def _publish_blob(self, tmp_path: Path, content_hash: str) -> None:
+        """Move a fully written temporary file to its blob path."""
+        data_path = self._blob_path(content_hash)
+        if data_path.exists():
+            # Identical content landed meanwhile
+            os.remove(tmp_path)
+            return
+        
+        data_path.parent.mkdir(exist_ok=True)
+        stored = os.stat(tmp_path).st_size
+        os.replace(tmp_path, data_path)
+        self.global_stats["stored_size"] += stored
+        
+        if self.durability:
+            # Persist the rename itself
+            dir_fd = os.open(data_path.parent, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+    
+    def _release_version_data(self, version: FileVersion) -> None:
+        """Remove a deleted version's data once no version references it."""
+        legacy_path = self.versions_dir / f"{version.version_id}.data"
+        if legacy_path.exists():
+            self.global_stats["stored_size"] -= legacy_path.stat().st_size
+            os.remove(legacy_path)
+        
+        # The hash index doubles as the blob's reference count
+        if self.db.execute(
+                "SELECT 1 FROM versions WHERE hash = ? LIMIT 1", (_hash_to_db(version.hash),)
+        ).fetchone():
+            return
+        
+        self.content_cache.pop(version.hash)
+        blob_path = self._blob_path(version.hash)
+        if blob_path.exists():
+            self.global_stats["stored_size"] -= blob_path.stat().st_size
+            os.remove(blob_path)
     
     def _save_version_metadata(self, version: FileVersion) -> None:
-        """Save version metadata to disk."""
-        metadata_path = self.metadata_dir / f"{version.version_id}.json"
-        
-        metadata = {
-            "version_id": version.version_id,
-            "file_id": version.file_id,
-            "version_number": version.version_number,
-            "hash": version.hash,
-            "size": version.size,
-            "created_at": version.created_at.isoformat(),
-            "created_by": version.created_by,
-            "vector_clock": version.vector_clock.dict(),
-            "metadata": version.metadata,
-            "is_current": version.is_current
-        }
-        
-        with open(metadata_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        """Save version metadata to the index."""
+        self.db.execute(_UPSERT_VERSION_SQL, self._version_to_row(version))
+    
+    def _version_to_row(self, version: FileVersion) -> Tuple:
+        """Flatten a FileVersion into a versions row."""
+        return (
+            version.version_id,
+            version.file_id,
+            version.version_number,
+            _hash_to_db(version.hash),
+            version.size,
+            _datetime_to_us(version.created_at),
+            version.created_by,
+            # Just the node -> counter mapping, without the model wrapper
+            _json_dumps(version.vector_clock.clocks),
+            _json_dumps(version.metadata),
+            int(version.is_current)
+        )
+    
+    def _row_to_version(self, row: Tuple) -> FileVersion:
+        """Build a FileVersion from a versions row."""
+        # One validation pass builds the nested VectorClockModel as well
+        return FileVersion.model_validate({
+            "version_id": row[0],
+            "file_id": row[1],
+            "version_number": row[2],
+            "hash": _hash_from_db(row[3]),
+            "size": row[4],
+            "created_at": _us_to_datetime(row[5]),
+            "created_by": row[6],
+            "vector_clock": {"clocks": _clocks_from_db(row[7])},
+            "metadata": _json_loads(row[8]),
+            "is_current": bool(row[9])
+        })
+    
+    def _unlink_from_file_index(self, version: FileVersion) -> None:
+        """Remove a version from its file's sorted version list."""
+        entries = self.by_file.get(version.file_id)
+        if not entries:
+            return
+        
+        entry = (version.version_number, version.version_id)
+        i = bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
+        
+        if not entries:
+            del self.by_file[version.file_id]
+    
+    def _create_schema(self) -> None:
+        """Create the versions table, upgrading rows written by older layouts."""
+        with self._transaction():
+            for statement in _SCHEMA_STATEMENTS:
+                self.db.execute(statement)
+            
+            self._migrate_created_at()
+            self._migrate_hashes()
+    
+    def _migrate_created_at(self) -> None:
+        """Rebuild a versions table whose created_at column holds ISO-8601 text."""
+        column = self.db.execute(
+            "SELECT type FROM pragma_table_info('versions') WHERE name = 'created_at'"
+        ).fetchone()
+        if column[0].upper() != "TEXT":
+            return
+        
+        # A TEXT column would coerce integers back to strings, so the
+        # table is rebuilt with the INTEGER declaration
+        rows = self.db.execute(f"SELECT {_VERSION_COLUMNS} FROM versions").fetchall()
+        self.db.execute("DROP TABLE versions")
+        for statement in _SCHEMA_STATEMENTS:
+            self.db.execute(statement)
+        self.db.executemany(_UPSERT_VERSION_SQL, [
+            row[:5] + (_datetime_to_us(datetime.fromisoformat(row[5])),) + row[6:]
+            for row in rows
+        ])
+        logging.info(f"Migrated {len(rows)} versions to epoch-microsecond timestamps")
+    
+    def _migrate_hashes(self) -> None:
+        """Convert hex content hashes to raw digests, so hash lookups match every row."""
+        rows = self.db.execute(
+            "SELECT version_id, hash FROM versions WHERE typeof(hash) = 'text'"
+        ).fetchall()
+        updates = [
+            (_hash_to_db(content_hash), version_id)
+            for version_id, content_hash in rows
+            if isinstance(_hash_to_db(content_hash), bytes)
+        ]
+        if updates:
+            self.db.executemany("UPDATE versions SET hash = ? WHERE version_id = ?", updates)
+            logging.info(f"Migrated {len(updates)} version hashes to raw digests")
+    
+    def _import_legacy_metadata(self) -> None:
+        """Move versions from per-version JSON files into an empty index."""
+        if self.db.execute("SELECT 1 FROM versions LIMIT 1").fetchone():
+            return
+        
+        with os.scandir(self.metadata_dir) as entries:
+            metadata_files = [
+                Path(entry.path) for entry in entries
+                if entry.name.endswith(".json") and entry.is_file()
+            ]
+        if not metadata_files:
+            return
+        
+        with ThreadPoolExecutor(max_workers=_LEGACY_IMPORT_WORKERS) as executor:
+            rows = [row for row in executor.map(self._read_legacy_metadata, metadata_files) if row]
+        
+        if rows:
+            with self._transaction():
+                self.db.executemany(_UPSERT_VERSION_SQL, rows)
+            logging.info(f"Imported {len(rows)} versions from {self.metadata_dir} into the index")
+    
+    def _read_legacy_metadata(self, metadata_file: Path) -> Optional[Tuple]:
+        """Read one legacy metadata file as a versions row."""
+        try:
+            with open(metadata_file, 'rb') as f:
+                data = _json_loads(f.read())
+            
+            return (
+                data["version_id"],
+                data["file_id"],
+                data["version_number"],
+                _hash_to_db(data["hash"]),
+                data["size"],
+                _datetime_to_us(datetime.fromisoformat(data["created_at"])),
+                data["created_by"],
+                _json_dumps(data["vector_clock"].get("clocks", {})),
+                _json_dumps(data.get("metadata", {})),
+                int(data.get("is_current", False))
+            )
+        
+        except Exception as e:
+            logging.error(f"Error reading metadata file {metadata_file}: {e}")
+            return None
     
     def _load_metadata_cache(self) -> None:
-        """Load metadata into cache on startup."""
+        """
+        Index version ids per file on startup.
+        
+        Only (file_id, version_number, version_id, size) is read; FileVersion
+        objects are built lazily, so startup memory stays proportional to
+        the version count rather than to full metadata.
+        """
         try:
-            for metadata_file in self.metadata_dir.glob("*.json"):
-                with open(metadata_file, 'r') as f:
-                    data = json.load(f)
-                
-                version = FileVersion(
-                    version_id=data["version_id"],
-                    file_id=data["file_id"],
-                    version_number=data["version_number"],
-                    hash=data["hash"],
-                    size=data["size"],
-                    created_at=datetime.fromisoformat(data["created_at"]),
-                    created_by=data["created_by"],
-                    vector_clock=VectorClockModel(**data["vector_clock"]),
-                    metadata=data.get("metadata", {}),
-                    is_current=data.get("is_current", False)
-                )
-                
-                self.version_cache[version.version_id] = version
+            self._import_legacy_metadata()
+            
+            rows = self.db.execute(
+                "SELECT file_id, version_number, version_id, size FROM versions "
+                "ORDER BY file_id, version_number, version_id"
+            )
+            indexed = 0
+            total_size = 0
+            for file_id, version_number, version_id, size in rows:
+                self.by_file[file_id].append((version_number, version_id))
+                indexed += 1
+                total_size += size
             
-            logging.info(f"Loaded {len(self.version_cache)} versions into cache")
+            self.global_stats = {
+                "total_versions": indexed,
+                "total_size": total_size,
+                "stored_size": self._scan_stored_size()
+            }
+            logging.info(f"Indexed {indexed} versions of {len(self.by_file)} files")
         
         except Exception as e:
-            logging.error(f"Error loading metadata cache: {e}") 
\ No newline at end of file
+            logging.error(f"Error loading metadata cache: {e}")
+    
+    def _scan_stored_size(self) -> int:
+        """
+        Sum the on-disk size of blobs and legacy data files.
+        
+        Sizes come from directory entries; no data file is opened.
+        
+        Returns:
+            Total bytes of version data on disk
+        """
+        stored = 0
+        with os.scandir(self.versions_dir) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    with os.scandir(entry.path) as blobs:
+                        for blob in blobs:
+                            if blob.is_file(follow_symlinks=False) and not blob.name.endswith(".tmp"):
+                                stored += blob.stat(follow_symlinks=False).st_size
+                elif entry.name.endswith(".data") and entry.is_file(follow_symlinks=False):
+                    stored += entry.stat(follow_symlinks=False).st_size
+        return stored
+    
+    # Async variants for callers on an event loop: each runs its blocking
+    # counterpart in a worker thread via asyncio.to_thread
+    
+    async def acreate_version(self, file_id: str, content: bytes, created_by: str,
+                              vector_clock: VectorClockModel,
+                              metadata: Dict[str, Any] = None) -> FileVersion:
+        """Async variant of create_version."""
+        return await asyncio.to_thread(
+            self.create_version, file_id, content, created_by, vector_clock, metadata
+        )
+    
+    async def aget_version(self, version_id: str) -> Optional[FileVersion]:
+        """Async variant of get_version."""
+        return await asyncio.to_thread(self.get_version, version_id)
+    
+    async def aget_version_content(self, version_id: str) -> Optional[bytes]:
+        """Async variant of get_version_content."""
+        return await asyncio.to_thread(self.get_version_content, version_id)
+    
+    async def aget_file_versions(self, file_id: str) -> List[FileVersion]:
+        """Async variant of get_file_versions."""
+        return await asyncio.to_thread(self.get_file_versions, file_id)
+    
+    async def arestore_version(self, version_id: str, target_path: str) -> bool:
+        """Async variant of restore_version; the copy itself runs unlocked."""
+        return await asyncio.to_thread(self.restore_version, version_id, target_path)
+    
+    async def adelete_version(self, version_id: str) -> bool:
+        """Async variant of delete_version."""
+        return await asyncio.to_thread(self.delete_version, version_id)
+    
+    async def amerge_versions(self, version1_id: str, version2_id: str,
+                              merge_strategy: str = "latest") -> Optional[FileVersion]:
+        """Async variant of merge_versions."""
+        return await asyncio.to_thread(self.merge_versions, version1_id, version2_id, merge_strategy)
+    
+    async def acleanup_old_versions(self, file_id: str, keep_versions: int = 10) -> int:
+        """Async variant of cleanup_old_versions."""
+        return await asyncio.to_thread(self.cleanup_old_versions, file_id, keep_versions)
+    
+    @_synchronized
+    def close(self) -> None:
+        """Close the metadata index."""
+        self.db.close()
\ No newline at end of file
@@ -1,14 +1,59 @@
 import asyncio
+import functools
+import hashlib
 import json
+import logging
+import logging.handlers
+import math
+import mmap
+import os
+import queue
+import shutil
+import tempfile
+import time
 import uuid
+import zlib
+from collections import Counter, defaultdict
 from datetime import datetime
-from typing import List, Dict, Set, Optional, Any
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, UploadFile, File, Request
+from pathlib import Path
+from typing import List, Dict, Set, Optional, Any, Iterable, Iterator, Tuple, Union
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, UploadFile, File, Form, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
-from starlette.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from starlette.responses import FileResponse, JSONResponse
 import random
 
+try:
+    import uvloop
+except ImportError:  # e.g. Windows; the coordinator runs on the asyncio loop
+    uvloop = None
+
+try:
+    import httptools
+except ImportError:  # uvicorn parses HTTP with the pure-Python h11
+    httptools = None
+
+try:
+    import numpy as np
+except ImportError:  # Clock comparisons fall back to pairwise compare()
+    np = None
+
+try:
+    from numba import njit
+except ImportError:  # Clock matrices are compared with numpy broadcasting
+    njit = None
+
+try:
+    import orjson
+except ImportError:  # Responses and messages fall back to the json module
+    orjson = None
+
+try:
+    from uuid_utils import uuid7
+except ImportError:  # Event ids are built by new_event_id() itself
+    uuid7 = None
+
 from shared.models import (
     RegisterNodeRequest, FileUploadRequest, DeltaSyncRequest, RestoreVersionRequest,
     NodeInfo, FileMetadata, SyncEvent, ConflictInfo, NetworkMetrics, NodeStatus,
@@ -16,7 +61,84 @@ from shared.models import (
     FileChunk
 )
 from coordinator.database import DatabaseManager
-from shared.utils import generate_file_id, calculate_file_hash, calculate_file_hash_from_data
+from shared.utils import (
+    generate_file_id, calculate_file_hash, calculate_file_hash_from_data,
+    adler32_chunks, find_chunk_boundaries
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Most replicas stored at once; each holds a database write and a version file
+REPLICA_CONCURRENCY = 16
+
+# Payloads at least this large are hashed in a worker thread; hashlib
+# releases the GIL, so the event loop keeps serving other clients
+HASH_OFFLOAD_MIN = 1024 * 1024
+
+# Broadcasts at least this large reach sync nodes as one zlib-compressed
+# binary frame, compressed once instead of per connection by permessage-deflate
+BROADCAST_COMPRESS_MIN = 1024
+
+# Most events /api/causal-order will load and sort per request
+CAUSAL_ORDER_MAX_EVENTS = 1000
+
+# Dashboards connecting within this many seconds of each other share one
+# serialized initial_data snapshot; any broadcast event invalidates it
+SNAPSHOT_TTL = 2.0
+
+
+@functools.lru_cache(maxsize=32)
+def circle_layout(count: int, center_x: float = 300, center_y: float = 300,
+                  radius: float = 200) -> Tuple[Tuple[float, float], ...]:
+    """Positions of count nodes evenly spaced on a circle; cached per layout."""
+    return tuple(
+        (center_x + radius * math.cos(i * 2 * math.pi / count),
+         center_y + radius * math.sin(i * 2 * math.pi / count))
+        for i in range(count)
+    )
+
+
+if njit is not None:
+    @njit(cache=True, boundscheck=False, nogil=True)
+    def _clock_le_nb(matrix):
+        """[i, j] is True when row i <= row j in every column.
+        
+        One fused loop that stops at the first larger component, instead
+        of broadcasting an (E, E, N) temporary.
+        """
+        count, width = matrix.shape
+        le = np.empty((count, count), dtype=np.bool_)
+        for i in range(count):
+            for j in range(count):
+                ok = True
+                for k in range(width):
+                    if matrix[i, k] > matrix[j, k]:
+                        ok = False
+                        break
+                le[i, j] = ok
+        return le
+
+
+def new_event_id() -> str:
+    """Time-ordered UUIDv7 string for a new event.
+    
+    Ids sort by creation time, so event inserts append to the primary key
+    index instead of landing at random pages.
+    """
+    if uuid7 is not None:
+        return str(uuid7())
+    # 48-bit Unix ms timestamp, version 7, variant 10, 74 random bits; the
+    # random module avoids an os.urandom syscall per id
+    rand = random.getrandbits(74)
+    value = (
+        (time.time_ns() // 1_000_000) << 80
+        | 0x7 << 76
+        | (rand >> 62) << 64
+        | 0b10 << 62
+        | rand & ((1 << 62) - 1)
+    )
+    return str(uuid.UUID(int=value))
 
 
 def json_serializer(obj):
@@ -26,31 +148,48 @@ def json_serializer(obj):
     raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
 
 
+def serialize_message_bytes(message: Any) -> bytes:
+    """Serialize a WebSocket message to UTF-8 JSON, via orjson when it is installed."""
+    if orjson is not None:
+        # Handles datetimes and enums natively, in the isoformat() form
+        return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(message, default=json_serializer).encode()
+
+
+def serialize_message(message: Any) -> str:
+    """Serialize a WebSocket message for a text frame."""
+    if orjson is not None:
+        return serialize_message_bytes(message).decode()
+    return json.dumps(message, default=json_serializer)
+
+
 class EnhancedVectorClockManager:
     """Enhanced vector clock manager for causal ordering."""
     
     def __init__(self):
         self.node_clocks = {}  # Track each node's vector clock
         self.global_nodes = set()  # All known nodes in the system
+        self.node_index = {}  # node_id -> column in stacked clock matrices
     
     def register_node(self, node_id: str) -> VectorClockModel:
         """Register a new node and initialize its vector clock."""
         # Add to global nodes
         self.global_nodes.add(node_id)
+        self.node_index.setdefault(node_id, len(self.node_index))
         
         # Initialize vector clock for this node
         initial_clock = VectorClockModel()
         for known_node in self.global_nodes:
-            initial_clock.clocks[known_node] = 0
+            initial_clock.set_time(known_node, 0)
         
         # Set this node's own clock to 1
-        initial_clock.clocks[node_id] = 1
+        initial_clock.set_time(node_id, 1)
         self.node_clocks[node_id] = initial_clock.copy()
         
         # Update all existing nodes to include this new node
         for existing_node_id in self.node_clocks:
             if existing_node_id != node_id:
-                self.node_clocks[existing_node_id].clocks[node_id] = 0
+                self.node_clocks[existing_node_id].set_time(node_id, 0)
         
         return initial_clock
     
@@ -76,41 +215,75 @@ class EnhancedVectorClockManager:
         """Detect concurrent operations that may cause conflicts."""
         conflicts = []
         
-        # Group events by file
-        file_events = [e for e in events if e.file_id == file_id]
-        
-        # Check for concurrent modifications
-        for i, event1 in enumerate(file_events):
-            for event2 in file_events[i+1:]:
-                if (event1.event_type == SyncEventType.FILE_MODIFIED and 
-                    event2.event_type == SyncEventType.FILE_MODIFIED and
-                    event1.vector_clock.is_concurrent_with(event2.vector_clock)):
-                    
-                    conflicts.append({
-                        'file_id': file_id,
-                        'event1': event1.model_dump(),
-                        'event2': event2.model_dump(),
-                        'type': 'concurrent_modification',
-                        'nodes': [event1.node_id, event2.node_id],
-                        'detected_at': datetime.now().isoformat()
-                    })
+        # Group events by file; only modifications can conflict
+        file_events = [
+            e for e in events
+            if e.file_id == file_id and e.event_type == SyncEventType.FILE_MODIFIED
+        ]
+        
+        # Check for concurrent modifications; an event can be in many
+        # pairs, so each is dumped once
+        dumps = {}
+        detected_at = datetime.now().isoformat()
+        for event1, event2 in self._concurrent_pairs(file_events):
+            for event in (event1, event2):
+                if id(event) not in dumps:
+                    dumps[id(event)] = event.model_dump()
+            
+            conflicts.append({
+                'file_id': file_id,
+                'event1': dumps[id(event1)],
+                'event2': dumps[id(event2)],
+                'type': 'concurrent_modification',
+                'nodes': [event1.node_id, event2.node_id],
+                'detected_at': detected_at
+            })
         
         return conflicts
     
+    def _clock_matrix(self, clocks: List[VectorClockModel]):
+        """Stack clocks into an (E, N) array with one column per node ordinal."""
+        rows, columns, values = [], [], []
+        for row, clock in enumerate(clocks):
+            for node_id, value in clock.clocks.items():
+                rows.append(row)
+                columns.append(self.node_index.setdefault(node_id, len(self.node_index)))
+                values.append(value)
+        
+        matrix = np.zeros((len(clocks), len(self.node_index)), dtype=np.int64)
+        matrix[rows, columns] = values
+        return matrix
+    
+    def _clock_le_matrix(self, clocks: List[VectorClockModel]):
+        """(E, E) mask where [i, j] means clock i <= clock j for every node."""
+        matrix = self._clock_matrix(clocks)
+        if njit is not None:
+            return _clock_le_nb(matrix)
+        return (matrix[:, None, :] <= matrix[None, :, :]).all(axis=-1)
+    
+    def _concurrent_pairs(self, events: List[SyncEvent]) -> List[tuple]:
+        """Pairs (i < j, in list order) of events with concurrent clocks."""
+        if np is None or len(events) < 2:
+            return [
+                (event1, event2)
+                for i, event1 in enumerate(events) for event2 in events[i+1:]
+                if event1.vector_clock.is_concurrent_with(event2.vector_clock)
+            ]
+        
+        # Neither clock <= the other: all pairs in one broadcast comparison
+        le = self._clock_le_matrix([e.vector_clock for e in events])
+        first, second = np.nonzero(np.triu(~le & ~le.T, k=1))
+        return [(events[i], events[j]) for i, j in zip(first.tolist(), second.tolist())]
+    
     def get_causal_order(self, events: List[SyncEvent]) -> List[SyncEvent]:
-        """Sort events in causal order using vector clocks."""
-        def compare_events(e1: SyncEvent, e2: SyncEvent) -> int:
-            relation = e1.vector_clock.compare(e2.vector_clock)
-            if relation == "before":
-                return -1
-            elif relation == "after":
-                return 1
-            else:
-                # For concurrent events, use timestamp as tiebreaker
-                return -1 if e1.timestamp < e2.timestamp else 1
-        
-        from functools import cmp_to_key
-        return sorted(events, key=cmp_to_key(compare_events))
+        """Sort events in causal order using vector clocks.
+        
+        Same ordering as VectorClockManager.get_causal_order: if one event
+        happened before another, its clock sum is strictly smaller, so
+        sorting on (clock sum, timestamp) respects causality in O(n log n)
+        without comparing clocks pairwise.
+        """
+        return sorted(events, key=lambda e: (sum(e.vector_clock.clocks.values()), e.timestamp))
     
     def get_node_clock(self, node_id: str) -> VectorClockModel:
         """Get current vector clock for a node."""
@@ -124,22 +297,80 @@ class EnhancedVectorClockManager:
 
 
 class SimpleFileManager:
-    """Simplified file version manager."""
+    """Simplified file version manager.
     
-    def __init__(self):
+    Version content is content-addressed: each distinct content is one blob
+    file under storage_path, named by its SHA-256, however many versions
+    (e.g. one replica per node) share it. Blobs are memory-mapped on read,
+    so only the versions being served are resident.
+    
+    The version index is in-memory only. Without a storage_path, blobs go
+    to a private temporary directory that close() removes; an explicit
+    storage_path is never wiped, so it must not be shared between running
+    coordinators.
+    """
+    
+    def __init__(self, storage_path: Optional[str] = None):
         self.file_versions = {}
-        self.file_content = {}
+        self.version_blobs: Dict[str, str] = {}  # version_id -> content hash
+        self.blob_refs: Dict[str, int] = {}  # content hash -> versions using it
+        self._owns_storage = storage_path is None
+        if self._owns_storage:
+            storage_path = tempfile.mkdtemp(prefix="coordinator_versions_")
+        self.storage_path = Path(storage_path)
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+    
+    def close(self):
+        """Remove the private storage directory, if this manager created it."""
+        if self._owns_storage:
+            shutil.rmtree(self.storage_path, ignore_errors=True)
+    
+    def _blob_path(self, content_hash: str) -> Path:
+        return self.storage_path / f"{content_hash}.blob"
+    
+    def _write_blob(self, content_hash: str, content: bytes):
+        """Write a blob under a temporary name, then rename it into place.
+        
+        A crash or a concurrent reader never sees a truncated file under
+        the content-hash name, which later versions would trust as complete.
+        """
+        fd, tmp_name = tempfile.mkstemp(dir=self.storage_path, suffix=".tmp")
+        try:
+            with open(fd, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_name, self._blob_path(content_hash))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+    
+    def get_version_path(self, version_id: str) -> Optional[Path]:
+        """Path of the blob holding a version's content, None for unknown versions."""
+        content_hash = self.version_blobs.get(version_id)
+        return self._blob_path(content_hash) if content_hash is not None else None
     
     def create_version(self, file_id: str, content: bytes, owner_node: str, 
-                      vector_clock: VectorClockModel, metadata: dict):
-        """Create a new file version."""
+                      vector_clock: VectorClockModel, metadata: dict,
+                      content_hash: Optional[str] = None):
+        """Create a new file version.
+        
+        content_hash is the SHA-256 hex of content when the caller already
+        has it; content already stored is neither hashed nor written again.
+        """
+        if content_hash is None:
+            content_hash = calculate_file_hash_from_data(content)
+        if content_hash not in self.blob_refs:
+            self._write_blob(content_hash, content)
+            self.blob_refs[content_hash] = 0
+        self.blob_refs[content_hash] += 1
+        
         version_id = str(uuid.uuid4())
-        self.file_content[version_id] = content
+        self.version_blobs[version_id] = content_hash
         if file_id not in self.file_versions:
             self.file_versions[file_id] = []
         self.file_versions[file_id].append({
             'version_id': version_id,
             'content_size': len(content),
+            'content_hash': content_hash,
             'created_by': owner_node,
             'metadata': metadata
         })
@@ -152,53 +383,78 @@ class SimpleFileManager:
         return None
     
     def get_version_content(self, version_id: str):
-        """Get content of a specific version."""
-        return self.file_content.get(version_id)
+        """Get content of a specific version as a read-only mmap (b'' when empty)."""
+        path = self.get_version_path(version_id)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                # The mapping stays valid after the file is closed
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            # Empty files can't be mapped
+            return b''
+    
+    def delete_file_versions(self, file_id: str):
+        """Forget a file; blobs no other version uses are removed."""
+        for version in self.file_versions.pop(file_id, []):
+            content_hash = self.version_blobs.pop(version['version_id'], None)
+            if content_hash is None:
+                continue
+            self.blob_refs[content_hash] -= 1
+            if not self.blob_refs[content_hash]:
+                del self.blob_refs[content_hash]
+                self._blob_path(content_hash).unlink(missing_ok=True)
 
 
 class AdvancedDeltaSync:
     """Advanced delta synchronization with rolling hash optimization."""
     
-    CHUNK_SIZE = 4096  # 4KB chunks
+    # Average chunk size; chunks are content-defined (FastCDC-style Gear
+    # hash), so an insert only shifts the boundaries next to it
+    CHUNK_SIZE = 4096
+    # Bound once; called for every chunk
+    _sha256 = staticmethod(hashlib.sha256)
     
     def __init__(self):
         self.chunk_cache = {}  # Cache of chunk signatures by file_id
-        self.global_chunk_store = {}  # Global store: chunk_hash -> (file_id, chunk_data)
+        self.global_chunk_store = {}  # Global store: chunk digest -> (file_id, chunk_data)
+        self.version_signatures = {}  # file_id -> (version_id, signatures of that version)
     
     def calculate_rolling_hash(self, data: bytes, start: int = 0, length: int = None) -> int:
-        """Calculate rolling hash (simplified Adler-32 style)."""
+        """Calculate rolling hash (Adler-32, computed by zlib)."""
+        view = memoryview(data)
         if length is None:
-            length = len(data) - start
-        
-        a, b = 1, 0
-        for i in range(start, min(start + length, len(data))):
-            a = (a + data[i]) % 65521
-            b = (b + a) % 65521
-        
-        return (b << 16) | a
+            return zlib.adler32(view[start:])
+        return zlib.adler32(view[start:start + length])
     
-    def calculate_strong_hash(self, data: bytes) -> str:
-        """Calculate SHA-256 hash for chunk."""
-        import hashlib
-        return hashlib.sha256(data).hexdigest()
+    def calculate_strong_hash(self, data: bytes) -> bytes:
+        """Calculate chunk digest (SHA-256 truncated to 16 raw bytes)."""
+        return self._sha256(data).digest()[:16]
     
     def create_signature(self, data: bytes, file_id: str = None) -> List[ChunkSignature]:
         """Create signature for delta sync (list of chunk signatures)."""
         signatures = []
-        
-        for i in range(0, len(data), self.CHUNK_SIZE):
-            chunk_data = data[i:i + self.CHUNK_SIZE]
-            if not chunk_data:
-                break
+        view = memoryview(data)
+        
+        # Weak hashes for every chunk in one call; chunks are hashed through
+        # memoryview slices rather than copied out of data
+        boundaries = find_chunk_boundaries(data, self.CHUNK_SIZE)
+        offset = 0
+        for index, (end, weak_hash) in enumerate(zip(boundaries, adler32_chunks(data, boundaries))):
+            chunk_data = view[offset:end]
             
             signature = ChunkSignature(
-                index=len(signatures),
-                offset=i,
-                size=len(chunk_data),
-                weak_hash=self.calculate_rolling_hash(chunk_data),
-                strong_hash=self.calculate_strong_hash(chunk_data)
+                index=index,
+                offset=offset,
+                size=end - offset,
+                weak_hash=weak_hash,
+                strong_hash=self.calculate_strong_hash(chunk_data).hex()
             )
             signatures.append(signature)
+            offset = end
             
             # Cache signature for this file
             if file_id:
@@ -207,59 +463,101 @@ class AdvancedDeltaSync:
         
         return signatures
     
-    def create_content_delta(self, old_content: bytes, new_content: bytes, 
-                           file_id: str = None) -> FileDelta:
-        """Create delta between two content versions with proper chunk tracking."""
-        import time
-        start_time = time.time()
+    def create_content_delta(self, old_content: bytes, new_content: Union[bytes, Iterable[bytes]], 
+                           file_id: str = None, old_version_id: str = None) -> FileDelta:
+        """Create delta between two content versions with proper chunk tracking.
+        
+        When old_version_id names the version old_content came from, its
+        signatures and hash are computed once and reused by later deltas
+        against it. Re-uploads of unchanged content skip chunking entirely.
+        new_content may also be an iterable of pieces, which is chunked as
+        it is consumed instead of being joined first.
+        """
+        start_ns = time.perf_counter_ns()
+        
+        streamed = not isinstance(new_content, (bytes, bytearray, memoryview, mmap.mmap))
+        old_hash = self.get_version_hash(file_id, old_version_id, old_content) if old_content else None
+        if streamed:
+            new_hasher = hashlib.sha256()
+            new_hash = None
+            new_chunk_iter = self._stream_chunks(new_content, new_hasher)
+        else:
+            new_hash = calculate_file_hash_from_data(new_content)
+            new_chunk_iter = self._buffer_chunks(new_content)
+        
+        if old_hash is not None and old_hash == new_hash:
+            # Same length and content (client retries, periodic rescans):
+            # every chunk is unchanged. Identical content has identical
+            # content-defined boundaries, so the old version's signatures
+            # give the chunk count when they are cached
+            old_signatures = self.get_version_signatures(file_id, old_version_id)
+            if old_signatures is not None:
+                total_chunks = len(old_signatures)
+            else:
+                total_chunks = len(find_chunk_boundaries(new_content, self.CHUNK_SIZE))
+            
+            return FileDelta(
+                file_id=file_id or "unknown",
+                old_hash=old_hash,
+                new_hash=new_hash,
+                old_size=len(old_content),
+                new_size=len(new_content),
+                chunks_to_add=[],
+                chunks_to_remove=[],
+                chunks_unchanged=list(range(total_chunks)),
+                total_chunks=total_chunks,
+                bandwidth_saved=len(new_content),
+                compression_ratio=100.0
+            )
         
-        # Create signatures for old content and store them
-        old_signatures = []
-        old_sig_map = {}
+        # Create signatures for old content and store them. Chunks are only
+        # ever matched whole, so the strong digest alone decides a match;
+        # a weak hash would add no matches
+        old_digests = set()
         
         if old_content:
-            old_signatures = self.create_signature(old_content, f"{file_id}_old")
-            old_sig_map = {sig.strong_hash: sig for sig in old_signatures}
+            old_signatures = self.get_version_signatures(file_id, old_version_id)
+            signatures_cached = old_signatures is not None
+            if not signatures_cached:
+                old_signatures = self.create_signature(old_content, f"{file_id}_old")
+                if old_version_id:
+                    # Only the latest version per file is kept; it is the
+                    # predecessor of the next upload
+                    self.version_signatures[file_id] = (old_version_id, old_signatures)
             
-            # Store old chunks in global cache
-            for i, sig in enumerate(old_signatures):
-                chunk_start = sig.offset
-                chunk_end = min(chunk_start + self.CHUNK_SIZE, len(old_content))
-                chunk_data = old_content[chunk_start:chunk_end]
-                self.global_chunk_store[sig.strong_hash] = (file_id, chunk_data)
+            for sig in old_signatures:
+                digest = bytes.fromhex(sig.strong_hash)
+                old_digests.add(digest)
+                
+                # Store old chunk in global cache (already done when the
+                # signatures were first computed)
+                if not signatures_cached:
+                    chunk_data = old_content[sig.offset:sig.offset + sig.size]
+                    self.global_chunk_store[digest] = (file_id, chunk_data)
         
         # Also check cache for this specific file
         file_cache_key = f"{file_id}_chunks"
         if file_cache_key in self.chunk_cache:
             for cached_hash in self.chunk_cache[file_cache_key]:
-                if cached_hash not in old_sig_map and cached_hash in self.global_chunk_store:
-                    # Add cached chunks to old signatures
-                    cached_data = self.global_chunk_store[cached_hash][1]
-                    old_sig_map[cached_hash] = ChunkSignature(
-                        index=len(old_signatures),
-                        offset=0,  # Offset not relevant for cached chunks
-                        size=len(cached_data),
-                        weak_hash=self.calculate_rolling_hash(cached_data),
-                        strong_hash=cached_hash
-                    )
+                if cached_hash in self.global_chunk_store:
+                    # Add cached chunks to the old chunks
+                    old_digests.add(cached_hash)
         
         # Analyze new content chunks
         new_chunks = []
         unchanged_chunks = []
         chunks_to_add = []
         bandwidth_saved = 0
+        new_chunk_hashes = []
+        new_size = 0
         
-        for i in range(0, len(new_content), self.CHUNK_SIZE):
-            chunk_data = new_content[i:i + self.CHUNK_SIZE]
-            if not chunk_data:
-                break
-            
+        for i, chunk_data in new_chunk_iter:
             chunk_index = len(new_chunks)
-            weak_hash = self.calculate_rolling_hash(chunk_data)
             strong_hash = self.calculate_strong_hash(chunk_data)
+            new_chunk_hashes.append(strong_hash)
             
             # Check if this chunk exists in old content or global cache
-            if strong_hash in old_sig_map:
+            if strong_hash in old_digests:
                 # Chunk unchanged - can reuse
                 unchanged_chunks.append(chunk_index)
                 bandwidth_saved += len(chunk_data)
@@ -273,8 +571,7 @@ class AdvancedDeltaSync:
                     index=chunk_index,
                     offset=i,
                     size=len(chunk_data),
-                    hash=strong_hash,
-                    weak_hash=weak_hash,
+                    hash=strong_hash.hex(),
                     data=chunk_data,
                     is_new=True
                 )
@@ -284,21 +581,23 @@ class AdvancedDeltaSync:
                 self.global_chunk_store[strong_hash] = (file_id, chunk_data)
             
             new_chunks.append(chunk_index)
+            new_size += len(chunk_data)
+        
+        if streamed:
+            new_hash = new_hasher.hexdigest()
         
         # Update file-specific chunk cache
-        new_chunk_hashes = [self.calculate_strong_hash(new_content[i:i+self.CHUNK_SIZE]) 
-                           for i in range(0, len(new_content), self.CHUNK_SIZE)]
         self.chunk_cache[file_cache_key] = new_chunk_hashes
         
-        sync_time = time.time() - start_time
-        compression_ratio = (bandwidth_saved / len(new_content) * 100) if new_content else 0
+        sync_time = (time.perf_counter_ns() - start_ns) / 1e9
+        compression_ratio = (bandwidth_saved / new_size * 100) if new_size else 0
         
         delta = FileDelta(
             file_id=file_id or "unknown",
-            old_hash=self.calculate_strong_hash(old_content) if old_content else None,
-            new_hash=self.calculate_strong_hash(new_content),
+            old_hash=old_hash,
+            new_hash=new_hash,
             old_size=len(old_content) if old_content else 0,
-            new_size=len(new_content),
+            new_size=new_size,
             chunks_to_add=chunks_to_add,
             chunks_to_remove=[],  # Not used in this implementation
             chunks_unchanged=unchanged_chunks,
@@ -309,22 +608,126 @@ class AdvancedDeltaSync:
         
         return delta
     
+    def _buffer_chunks(self, content: bytes) -> Iterator[Tuple[int, bytes]]:
+        """Yield (offset, data) for each content-defined chunk of content."""
+        start = 0
+        for end in find_chunk_boundaries(content, self.CHUNK_SIZE):
+            yield start, content[start:end]
+            start = end
+    
+    def _stream_chunks(self, pieces: Iterable[bytes], hasher) -> Iterator[Tuple[int, bytes]]:
+        """Yield (offset, data) chunks of content arriving in pieces, hashing it as it goes.
+        
+        A cut depends only on the bytes since the previous cut, so chunking
+        each piece together with the unfinished tail of the last one gives
+        the same chunks as chunking the joined content. Only the tail (at
+        most one chunk) is ever copied forward.
+        """
+        offset = 0
+        pending = b''
+        for piece in pieces:
+            hasher.update(piece)
+            buf = pending + piece if pending else piece
+            start = 0
+            # The last cut is just the end of what has arrived so far
+            for end in find_chunk_boundaries(buf, self.CHUNK_SIZE)[:-1]:
+                yield offset, bytes(buf[start:end])
+                offset += end - start
+                start = end
+            pending = bytes(buf[start:])
+        if pending:
+            yield offset, pending
+    
+    def reconcile_fingerprints(self, file_id: str, version_id: str, content: bytes,
+                               chunks: List[FileChunk]) -> Dict[str, Any]:
+        """Reconcile a node's chunk fingerprints against a stored version.
+        
+        Each chunk's hash is the hex chunk digest (as in create_signature)
+        and no data is sent. Only the set differences are returned: the
+        node's chunks the coordinator lacks and the version's chunks the
+        node no longer has.
+        """
+        signatures = self.get_version_signatures(file_id, version_id)
+        if signatures is None:
+            signatures = self.create_signature(content, f"{file_id}_old")
+            if version_id:
+                self.version_signatures[file_id] = (version_id, signatures)
+        
+        known = {sig.strong_hash for sig in signatures}
+        node_hashes = set()
+        chunks_needed = []
+        chunks_unchanged = []
+        bandwidth_saved = 0
+        new_size = 0
+        
+        for chunk in chunks:
+            node_hashes.add(chunk.hash)
+            new_size += chunk.size
+            if chunk.hash in known or self._in_chunk_store(chunk.hash):
+                chunks_unchanged.append(chunk.index)
+                bandwidth_saved += chunk.size
+            else:
+                chunks_needed.append(chunk.index)
+        
+        return {
+            "chunks_needed": chunks_needed,
+            "chunks_unchanged": chunks_unchanged,
+            "chunks_to_remove": [sig.index for sig in signatures if sig.strong_hash not in node_hashes],
+            "total_chunks": len(chunks),
+            "bandwidth_saved": bandwidth_saved,
+            "compression_ratio": (bandwidth_saved / new_size * 100) if new_size else 0
+        }
+    
+    def _in_chunk_store(self, chunk_hash: str) -> bool:
+        """Whether a hex chunk digest is in the global chunk store."""
+        try:
+            return bytes.fromhex(chunk_hash) in self.global_chunk_store
+        except ValueError:
+            return False
+    
+    def get_version_signatures(self, file_id: str, version_id: str) -> Optional[List[ChunkSignature]]:
+        """Get cached signatures of a file version, if they are cached."""
+        cached = self.version_signatures.get(file_id)
+        if version_id and cached and cached[0] == version_id:
+            return cached[1]
+        return None
+    
+    def get_version_hash(self, file_id: str, version_id: str, content: bytes) -> str:
+        """SHA-256 of a file version's content, cached for the latest version per file."""
+        cache_key = f"{file_id}_hash"
+        cached = self.chunk_cache.get(cache_key)
+        if version_id and cached and cached[0] == version_id:
+            return cached[1]
+        
+        content_hash = calculate_file_hash_from_data(content)
+        if version_id:
+            self.chunk_cache[cache_key] = (version_id, content_hash)
+        return content_hash
+    
+    def forget_file(self, file_id: str) -> None:
+        """Drop cached signatures and hashes of a deleted file."""
+        self.version_signatures.pop(file_id, None)
+        self.chunk_cache.pop(f"{file_id}_hash", None)
+    
     def apply_delta(self, old_content: bytes, delta: FileDelta) -> bytes:
         """Apply delta to reconstruct new content."""
         # Simple implementation: just use the new chunks
         # In a real implementation, this would reconstruct from unchanged + new chunks
-        new_content = b''
+        # Collected and joined once; += on bytes copies the whole prefix
+        # for every chunk
+        parts = []
         
         for chunk in delta.chunks_to_add:
-            if isinstance(chunk.data, bytes):
-                new_content += chunk.data
-            elif isinstance(chunk.data, str):
+            data = chunk.data
+            if isinstance(data, bytes):
+                parts.append(data)
+            elif isinstance(data, str):
                 try:
-                    new_content += bytes.fromhex(chunk.data)
+                    parts.append(bytes.fromhex(data))
                 except:
-                    new_content += chunk.data.encode('utf-8')
+                    parts.append(data.encode('utf-8'))
         
-        return new_content
+        return b''.join(parts)
     
     def get_delta_metrics(self, delta: FileDelta, sync_time: float) -> DeltaSyncMetrics:
         """Generate comprehensive delta sync metrics."""
@@ -352,7 +755,10 @@ class CoordinatorServer:
     """
     
     def __init__(self):
-        self.app = FastAPI(title="Distributed File Sync Coordinator", version="1.0.0")
+        self.app = FastAPI(
+            title="Distributed File Sync Coordinator", version="1.0.0",
+            default_response_class=ORJSONResponse if orjson else JSONResponse
+        )
         self.db = DatabaseManager()
         self.vector_clock_manager = EnhancedVectorClockManager()
         self.file_manager = SimpleFileManager()
@@ -361,6 +767,10 @@ class CoordinatorServer:
         # WebSocket connection management
         self.active_connections: Set[WebSocket] = set()
         self.node_connections: Dict[str, WebSocket] = {}
+        # Dashboards that sent a "subscribe" message only receive events on
+        # their channels ("events", "file:<file_id>"); the rest receive all
+        self.channel_subs: Dict[str, Set[WebSocket]] = defaultdict(set)
+        self.dashboard_channels: Dict[WebSocket, Set[str]] = {}
         
         # Performance metrics
         self.metrics = {
@@ -369,6 +779,15 @@ class CoordinatorServer:
             'total_conflicts_resolved': 0,
             'average_sync_latency': 0.0
         }
+        # Bytes per second of the last replication, for progress estimates
+        self.replication_throughput: Optional[float] = None
+        self._replica_semaphore = asyncio.Semaphore(REPLICA_CONCURRENCY)
+        
+        # Cached initial_data message as (built_at, text), the build in
+        # flight, and a counter bumped whenever state changes under it
+        self._snapshot: Optional[Tuple[float, str]] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._snapshot_generation = 0
         
         # Setup CORS
         self.app.add_middleware(
@@ -384,6 +803,11 @@ class CoordinatorServer:
         async def startup_event():
             await self.db.initialize()
         
+        @self.app.on_event("shutdown")
+        async def shutdown_event():
+            await self.db.close()
+            self.file_manager.close()
+        
         self.setup_routes()
     
     def setup_routes(self):
@@ -412,7 +836,7 @@ class CoordinatorServer:
                 if await self.db.register_node(node_info):
                     # Broadcast node registration event
                     await self.broadcast_event(SyncEvent(
-                        event_id=str(uuid.uuid4()),
+                        event_id=new_event_id(),
                         event_type=SyncEventType.NODE_STATUS_CHANGE,
                         node_id=request.node_id,
                         timestamp=datetime.now(),
@@ -489,104 +913,43 @@ class CoordinatorServer:
         async def upload_file(request: FileUploadRequest):
             """Upload file with delta sync support."""
             try:
-                start_time = datetime.now()
-                
-                # Get current vector clock and update it
-                current_clock = self.vector_clock_manager.increment_clock(request.file_metadata.owner_node)
+                start_ns = time.perf_counter_ns()
                 
                 # Reconstruct file data from chunks
                 file_data = b''.join(chunk.data for chunk in request.chunks if chunk.data)
+                if len(file_data) >= HASH_OFFLOAD_MIN:
+                    actual_hash = await asyncio.to_thread(calculate_file_hash_from_data, file_data)
+                else:
+                    actual_hash = calculate_file_hash_from_data(file_data)
                 
-                # Verify file hash
-                actual_hash = calculate_file_hash_from_data(file_data)
-                if actual_hash != request.file_metadata.hash:
-                    # Allow empty hash for now, calculate it
-                    request.file_metadata.hash = actual_hash
-                
-                # Check if this is a delta sync operation
-                old_content = b''
-                if request.use_delta_sync:
-                    # Get previous version for delta sync
-                    current_version = self.file_manager.get_current_version(request.file_metadata.file_id)
-                    if current_version:
-                        old_content = self.file_manager.get_version_content(current_version['version_id']) or b''
-                
-                # Create delta for analysis
-                delta = self.delta_sync.create_content_delta(
-                    old_content, 
-                    file_data, 
-                    request.file_metadata.file_id
+                return await self._store_upload(
+                    request.file_metadata, file_data, actual_hash, request.use_delta_sync, start_ns
                 )
                 
-                # Update file metadata with current vector clock
-                request.file_metadata.vector_clock = current_clock
-                
-                # Create version
-                version = self.file_manager.create_version(
-                    request.file_metadata.file_id,
-                    file_data,
-                    request.file_metadata.owner_node,
-                    current_clock,
-                    {
-                        "uploaded_via": "api",
-                        "delta_sync_used": request.use_delta_sync,
-                        "bandwidth_saved": delta.bandwidth_saved,
-                        "compression_ratio": delta.compression_ratio
-                    }
-                )
-                
-                # Store file metadata
-                await self.db.store_file(request.file_metadata)
-                
-                # Calculate metrics
-                sync_latency = (datetime.now() - start_time).total_seconds()
-                delta_metrics = self.delta_sync.get_delta_metrics(delta, sync_latency)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Upload error: {str(e)}")
+        
+        @self.app.post("/api/files/upload_stream")
+        async def upload_file_stream(file: UploadFile = File(...), metadata: str = Form(...),
+                                     use_delta_sync: bool = Form(True)):
+            """Upload raw file content as multipart/form-data; metadata is a FileMetadata JSON part."""
+            try:
+                start_ns = time.perf_counter_ns()
+                file_metadata = FileMetadata.model_validate_json(metadata)
                 
-                # Update global metrics
-                self.metrics['total_sync_operations'] += 1
-                self.metrics['total_bandwidth_saved'] += delta.bandwidth_saved
-                self.metrics['average_sync_latency'] = (
-                    (self.metrics['average_sync_latency'] * (self.metrics['total_sync_operations'] - 1) + sync_latency) 
-                    / self.metrics['total_sync_operations']
-                )
+                # Read the spooled upload in one call, straight into a single
+                # buffer (no list of parts joined into a second copy), and
+                # with no JSON or hex decoding of the content
+                file_data = await file.read()
+                if len(file_data) >= HASH_OFFLOAD_MIN:
+                    actual_hash = await asyncio.to_thread(calculate_file_hash_from_data, file_data)
+                else:
+                    actual_hash = calculate_file_hash_from_data(file_data)
                 
-                # Broadcast file change event to all connected nodes
-                sync_event = SyncEvent(
-                    event_id=str(uuid.uuid4()),
-                    event_type=SyncEventType.FILE_MODIFIED,
-                    node_id=request.file_metadata.owner_node,
-                    file_id=request.file_metadata.file_id,
-                    timestamp=datetime.now(),
-                    data={
-                        'file_id': request.file_metadata.file_id,
-                        'file_name': request.file_metadata.name,
-                        'file_size': request.file_metadata.size,
-                        'file_hash': request.file_metadata.hash,
-                        'version_id': version,
-                        'action': 'uploaded',
-                        'delta_sync_used': request.use_delta_sync,
-                        'bandwidth_saved': delta.bandwidth_saved,
-                        'compression_ratio': delta.compression_ratio,
-                        'chunks_total': delta.total_chunks,
-                        'chunks_unchanged': len(delta.chunks_unchanged),
-                        'chunks_transferred': len(delta.chunks_to_add)
-                    },
-                    vector_clock=current_clock
+                return await self._store_upload(
+                    file_metadata, file_data, actual_hash, use_delta_sync, start_ns
                 )
                 
-                await self.broadcast_event(sync_event)
-                
-                # Propagate to other online nodes
-                await self._propagate_file_to_nodes(request.file_metadata, file_data, version)
-                
-                return {
-                    "status": "success",
-                    "version_id": version,
-                    "sync_latency": sync_latency,
-                    "delta_metrics": delta_metrics.model_dump(),
-                    "vector_clock": current_clock.model_dump()
-                }
-                
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Upload error: {str(e)}")
         
@@ -612,13 +975,42 @@ class CoordinatorServer:
                 return {
                     "success": True,
                     "file_metadata": file_metadata.model_dump(),
-                    "content": file_content.hex(),  # Send as hex string
+                    "content": memoryview(file_content).hex(),  # Send as hex string
                     "version_id": current_version['version_id']
                 }
                 
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Error getting file content: {str(e)}")
         
+        @self.app.get("/api/files/{file_id}/raw")
+        async def get_file_content_raw(file_id: str):
+            """Get file content as raw bytes; metadata comes from /api/files/{file_id}."""
+            try:
+                # Get current file version
+                current_version = self.file_manager.get_current_version(file_id)
+                if not current_version:
+                    raise HTTPException(status_code=404, detail="File not found")
+                
+                # Get file content; sent straight from the version file
+                content_path = self.file_manager.get_version_path(current_version['version_id'])
+                if content_path is None or not content_path.exists():
+                    raise HTTPException(status_code=404, detail="File content not found")
+                
+                # Half the size of the hex form served by /content
+                return FileResponse(
+                    content_path,
+                    media_type="application/octet-stream",
+                    headers={
+                        "X-File-ID": file_id,
+                        "X-Version-ID": current_version['version_id']
+                    }
+                )
+                
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error getting file content: {str(e)}")
+        
         @self.app.get("/api/files/{file_id}/download")
         async def download_file(file_id: str, node_id: str = None):
             """Download a file from the coordinator."""
@@ -628,9 +1020,9 @@ class CoordinatorServer:
                 if not current_version:
                     raise HTTPException(status_code=404, detail="File not found")
                 
-                # Get content
-                content = self.file_manager.get_version_content(current_version['version_id'])
-                if content is None:
+                # Get content; sent straight from the version file
+                content_path = self.file_manager.get_version_path(current_version['version_id'])
+                if content_path is None or not content_path.exists():
                     raise HTTPException(status_code=404, detail="File content not found")
                 
                 # Get file metadata for name and type
@@ -641,7 +1033,7 @@ class CoordinatorServer:
                 # Log download event
                 if node_id:
                     download_event = SyncEvent(
-                        event_id=str(uuid.uuid4()),
+                        event_id=new_event_id(),
                         event_type=SyncEventType.FILE_ACCESSED,
                         node_id=node_id,
                         file_id=file_id,
@@ -651,7 +1043,7 @@ class CoordinatorServer:
                             'file_name': file_metadata.name,
                             'action': 'downloaded',
                             'downloaded_by': node_id,
-                            'file_size': len(content)
+                            'file_size': current_version['content_size']
                         },
                         vector_clock=VectorClockModel(clocks={node_id: 1})
                     )
@@ -660,13 +1052,11 @@ class CoordinatorServer:
                 # Return file content as binary response
                 content_type = getattr(file_metadata, 'content_type', 'application/octet-stream')
                 
-                from fastapi.responses import Response
-                return Response(
-                    content=content,
+                return FileResponse(
+                    content_path,
                     media_type=content_type,
                     headers={
                         "Content-Disposition": f"attachment; filename=\"{file_metadata.name}\"",
-                        "Content-Length": str(len(content)),
                         "X-File-ID": file_id,
                         "X-File-Hash": file_metadata.hash
                     }
@@ -700,12 +1090,12 @@ class CoordinatorServer:
                 await self.db.store_file(file_metadata)
                 
                 # Remove from file manager
-                if file_id in self.file_manager.file_versions:
-                    del self.file_manager.file_versions[file_id]
+                self.file_manager.delete_file_versions(file_id)
+                self.delta_sync.forget_file(file_id)
                 
                 # Broadcast deletion event
                 await self.broadcast_event(SyncEvent(
-                    event_id=str(uuid.uuid4()),
+                    event_id=new_event_id(),
                     event_type=SyncEventType.FILE_DELETED,
                     node_id=node_id,
                     file_id=file_id,
@@ -751,20 +1141,14 @@ class CoordinatorServer:
                     raise HTTPException(status_code=404, detail="Node not found")
                 
                 # Get all files owned by this node
-                all_files = await self.db.get_all_files()
-                node_files = [
-                    file for file in all_files 
-                    if file.owner_node == node_id and not file.is_deleted
-                ]
+                node_files = await self.db.get_files_by_node(node_id)
                 
-                # Mark all node's files as deleted
+                # Mark all node's files as deleted in one transaction
+                await self.db.bulk_mark_deleted([file.file_id for file in node_files])
                 for file in node_files:
-                    file.is_deleted = True
-                    await self.db.store_file(file)
-                    
                     # Remove from file manager
-                    if file.file_id in self.file_manager.file_versions:
-                        del self.file_manager.file_versions[file.file_id]
+                    self.file_manager.delete_file_versions(file.file_id)
+                    self.delta_sync.forget_file(file.file_id)
                 
                 # Remove node from database
                 await self.db.remove_node(node_id)
@@ -780,7 +1164,7 @@ class CoordinatorServer:
                 
                 # Broadcast node removal event
                 await self.broadcast_event(SyncEvent(
-                    event_id=str(uuid.uuid4()),
+                    event_id=new_event_id(),
                     event_type=SyncEventType.NODE_LEFT,
                     node_id=node_id,
                     timestamp=datetime.now(),
@@ -806,7 +1190,7 @@ class CoordinatorServer:
         async def sync_delta(file_id: str, request: DeltaSyncRequest):
             """Handle delta synchronization request."""
             try:
-                start_time = datetime.now()
+                start_ns = time.perf_counter_ns()
                 
                 # Get current file version
                 current_version = self.file_manager.get_current_version(file_id)
@@ -817,26 +1201,68 @@ class CoordinatorServer:
                 if current_data is None:
                     raise HTTPException(status_code=404, detail="File data not found")
                 
-                # Convert request chunks to content
-                new_content = b''.join(chunk.data for chunk in request.current_chunks if chunk.data)
+                # Update vector clock
+                receiving_node = next(iter(request.vector_clock.clocks), 'unknown')
+                
+                if request.current_chunks and all(chunk.data is None for chunk in request.current_chunks):
+                    # Fingerprints only: answer with the set differences
+                    # instead of rebuilding and rechunking the content
+                    reconciliation = await asyncio.to_thread(
+                        self.delta_sync.reconcile_fingerprints,
+                        file_id, current_version['version_id'], current_data, request.current_chunks
+                    )
+                    self.metrics['total_bandwidth_saved'] += reconciliation['bandwidth_saved']
+                    updated_clock = self.vector_clock_manager.update_on_receive(receiving_node, request.vector_clock)
+                    
+                    await self.broadcast_event(SyncEvent(
+                        event_id=new_event_id(),
+                        event_type=SyncEventType.FILE_SYNC_PROGRESS,
+                        node_id=receiving_node,
+                        file_id=file_id,
+                        timestamp=datetime.now(),
+                        data={
+                            'file_id': file_id,
+                            'action': 'delta_sync_completed',
+                            'bandwidth_saved': reconciliation['bandwidth_saved'],
+                            'compression_ratio': reconciliation['compression_ratio'],
+                            'chunks_reused': len(reconciliation['chunks_unchanged']),
+                            'chunks_transferred': len(reconciliation['chunks_needed'])
+                        },
+                        vector_clock=updated_clock
+                    ))
+                    
+                    return {
+                        "success": True,
+                        "reconciliation": reconciliation,
+                        "sync_time": (time.perf_counter_ns() - start_ns) / 1e9,
+                        "vector_clock": updated_clock.model_dump()
+                    }
+                
+                # Chunks are fed to the delta as they are, not joined into
+                # a second copy of the content first
+                new_pieces = (chunk.data for chunk in request.current_chunks if chunk.data)
                 
-                # Generate delta
-                delta = self.delta_sync.create_content_delta(current_data, new_content, file_id)
+                # Generate delta off the event loop
+                delta = await asyncio.to_thread(
+                    self.delta_sync.create_content_delta,
+                    current_data, new_pieces, file_id, current_version['version_id']
+                )
                 
                 # Calculate metrics
-                sync_time = (datetime.now() - start_time).total_seconds()
+                sync_time = (time.perf_counter_ns() - start_ns) / 1e9
                 delta_metrics = self.delta_sync.get_delta_metrics(delta, sync_time)
+                # Dumped once for both the event and the response
+                metrics_dump = delta_metrics.model_dump()
                 
                 # Update global metrics
                 self.metrics['total_bandwidth_saved'] += delta.bandwidth_saved
                 
                 # Update vector clock
-                receiving_node = list(request.vector_clock.clocks.keys())[0] if request.vector_clock.clocks else 'unknown'
                 updated_clock = self.vector_clock_manager.update_on_receive(receiving_node, request.vector_clock)
                 
                 # Broadcast sync progress
                 await self.broadcast_event(SyncEvent(
-                    event_id=str(uuid.uuid4()),
+                    event_id=new_event_id(),
                     event_type=SyncEventType.FILE_SYNC_PROGRESS,
                     node_id=receiving_node,
                     file_id=file_id,
@@ -844,7 +1270,7 @@ class CoordinatorServer:
                     data={
                         'file_id': file_id,
                         'action': 'delta_sync_completed',
-                        'delta_metrics': delta_metrics.model_dump(),
+                        'delta_metrics': metrics_dump,
                         'bandwidth_saved': delta.bandwidth_saved,
                         'compression_ratio': delta.compression_ratio,
                         'chunks_reused': len(delta.chunks_unchanged),
@@ -856,7 +1282,7 @@ class CoordinatorServer:
                 return {
                     "success": True,
                     "delta": delta.model_dump(),
-                    "metrics": delta_metrics.model_dump(),
+                    "metrics": metrics_dump,
                     "vector_clock": updated_clock.model_dump()
                 }
                     
@@ -881,7 +1307,7 @@ class CoordinatorServer:
                 if success:
                     # Broadcast restore event
                     await self.broadcast_event(SyncEvent(
-                        event_id=str(uuid.uuid4()),
+                        event_id=new_event_id(),
                         event_type=SyncEventType.FILE_MODIFIED,
                         node_id=request.node_id,
                         timestamp=datetime.now(),
@@ -946,39 +1372,43 @@ class CoordinatorServer:
             }
         
         @self.app.get("/api/causal-order")
-        async def get_causal_order(limit: int = 50):
-            """Get events in causal order."""
-            events = await self.db.get_recent_events(limit)
+        async def get_causal_order(limit: int = Query(50, ge=1, le=CAUSAL_ORDER_MAX_EVENTS),
+                                   file_id: Optional[str] = None):
+            """Get events in causal order, optionally only those of one file."""
+            if file_id:
+                events = await self.db.get_recent_events_for_file(file_id, limit)
+            else:
+                events = await self.db.get_recent_events(limit)
             ordered_events = self.vector_clock_manager.get_causal_order(events)
             return [event.model_dump() for event in ordered_events]
         
         @self.app.get("/api/conflicts/detect/{file_id}")
         async def detect_file_conflicts(file_id: str):
             """Detect conflicts for a specific file."""
-            events = await self.db.get_recent_events(100)
+            events = await self.db.get_recent_events_for_file(file_id, 100)
             conflicts = self.vector_clock_manager.detect_conflicts(file_id, events)
             return conflicts
         
         @self.app.get("/api/delta-metrics")
-        async def get_delta_metrics():
+        async def get_delta_metrics(limit: int = 100):
             """Get delta synchronization performance metrics."""
             # Calculate metrics from recent sync operations
-            recent_events = await self.db.get_recent_events(100)
-            sync_events = [e for e in recent_events if e.event_type == SyncEventType.SYNC_COMPLETED]
+            sync_events = await self.db.get_recent_events_by_type(SyncEventType.SYNC_COMPLETED, limit)
             
             total_bandwidth_saved = 0
-            total_files_synced = len(sync_events)
+            total_files_synced = 0
             avg_compression_ratio = 0
             
             for event in sync_events:
                 data = event.data
-                if 'bandwidth_saved' in data:
-                    total_bandwidth_saved += data.get('bandwidth_saved', 0)
-                if 'compression_ratio' in data:
-                    avg_compression_ratio += data.get('compression_ratio', 0)
+                # One event reports every replica of a propagation; events
+                # recorded before that carry a single target_node
+                total_files_synced += len(data['replicas']) if 'replicas' in data else 1
+                total_bandwidth_saved += data.get('bandwidth_saved', 0)
+                avg_compression_ratio += data.get('compression_ratio', 0)
             
-            if total_files_synced > 0:
-                avg_compression_ratio /= total_files_synced
+            if sync_events:
+                avg_compression_ratio /= len(sync_events)
             
             return {
                 'total_bandwidth_saved': total_bandwidth_saved,
@@ -994,10 +1424,13 @@ class CoordinatorServer:
             nodes = await self.db.get_all_nodes()
             files = await self.db.get_all_files()
             
-            # Calculate node positions in a circle
-            import math
+            # Calculate node positions in a circle; the same node count
+            # always gives the same layout
             center_x, center_y = 300, 300
-            radius = 200
+            positions = circle_layout(len(nodes), center_x, center_y)
+            
+            # One pass over the files instead of one per node
+            file_counts = Counter(f.owner_node for f in files if not f.is_deleted)
             
             topology = {
                 'coordinator': {'x': center_x, 'y': center_y, 'type': 'coordinator'},
@@ -1008,11 +1441,7 @@ class CoordinatorServer:
             
             for i, node in enumerate(nodes):
                 if node.status == NodeStatus.ONLINE:
-                    angle = (i * 2 * math.pi) / len(nodes)
-                    x = center_x + radius * math.cos(angle)
-                    y = center_y + radius * math.sin(angle)
-                    
-                    node_files = [f for f in files if f.owner_node == node.node_id and not f.is_deleted]
+                    x, y = positions[i]
                     
                     topology['nodes'].append({
                         'id': node.node_id,
@@ -1020,7 +1449,7 @@ class CoordinatorServer:
                         'x': x,
                         'y': y,
                         'status': node.status.value,
-                        'file_count': len(node_files),
+                        'file_count': file_counts[node.node_id],
                         'last_seen': node.last_seen.isoformat(),
                         'vector_clock': node.vector_clock.to_display_string()
                     })
@@ -1063,15 +1492,7 @@ class CoordinatorServer:
         
         try:
             # Send initial data
-            initial_data = {
-                "type": "initial_data",
-                "data": {
-                    "nodes": [node.model_dump() for node in await self.db.get_all_nodes()],
-                    "files": [file.model_dump() for file in await self.db.get_all_files()],
-                    "metrics": await self.get_current_metrics()
-                }
-            }
-            await websocket.send_text(json.dumps(initial_data, default=json_serializer))
+            await websocket.send_text(await self._initial_snapshot())
             
             # Keep connection alive
             while True:
@@ -1087,6 +1508,45 @@ class CoordinatorServer:
             pass
         finally:
             self.active_connections.discard(websocket)
+            self._unsubscribe(websocket)
+    
+    async def _initial_snapshot(self) -> str:
+        """Get the serialized initial_data message, rebuilding it when stale.
+        
+        Dashboards reconnecting together wait on a single build, so the
+        nodes and files are queried and serialized once for all of them.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - snapshot[0] < SNAPSHOT_TTL:
+            return snapshot[1]
+        
+        if self._snapshot_task is None:
+            self._snapshot_task = asyncio.ensure_future(self._build_snapshot())
+        # Shielded so one dashboard disconnecting doesn't cancel the others' build
+        return await asyncio.shield(self._snapshot_task)
+    
+    async def _build_snapshot(self) -> str:
+        """Query and serialize the initial_data message."""
+        generation = self._snapshot_generation
+        built_at = time.monotonic()
+        try:
+            initial_data = {
+                "type": "initial_data",
+                "data": {
+                    "nodes": [node.model_dump() for node in await self.db.get_all_nodes()],
+                    "files": [file.model_dump() for file in await self.db.get_all_files()],
+                    "metrics": await self.get_current_metrics()
+                }
+            }
+            message = serialize_message(initial_data)
+            
+            # An event broadcast mid-build may have changed what we read
+            if generation == self._snapshot_generation:
+                self._snapshot = (built_at, message)
+            return message
+        
+        finally:
+            self._snapshot_task = None
     
     async def handle_node_websocket_connection(self, websocket: WebSocket, node_id: str):
         """Handle client node WebSocket connections."""
@@ -1122,14 +1582,52 @@ class CoordinatorServer:
                 "type": "metrics_update",
                 "data": metrics
             }
-            await websocket.send_text(json.dumps(response, default=json_serializer))
+            await websocket.send_text(serialize_message(response))
         elif message_type == "request_nodes":
             nodes = await self.db.get_all_nodes()
             response = {
                 "type": "nodes_update",
                 "data": [node.model_dump() for node in nodes]
             }
-            await websocket.send_text(json.dumps(response, default=json_serializer))
+            await websocket.send_text(serialize_message(response))
+        elif message_type == "subscribe":
+            # Replaces any earlier subscription; no channels means all events
+            channels = set(message.get("channels") or [])
+            self._unsubscribe(websocket)
+            if channels:
+                self.dashboard_channels[websocket] = channels
+                for channel in channels:
+                    self.channel_subs[channel].add(websocket)
+            response = {
+                "type": "subscribed",
+                "channels": sorted(channels)
+            }
+            await websocket.send_text(serialize_message(response))
+    
+    def _unsubscribe(self, websocket: WebSocket):
+        """Drop a dashboard's channel subscriptions."""
+        for channel in self.dashboard_channels.pop(websocket, ()):
+            subscribers = self.channel_subs.get(channel)
+            if subscribers is not None:
+                subscribers.discard(websocket)
+                if not subscribers:
+                    del self.channel_subs[channel]
+    
+    def _event_dashboards(self, event: SyncEvent) -> List[WebSocket]:
+        """Dashboards that should receive an event."""
+        if not self.dashboard_channels:
+            return list(self.active_connections)
+        
+        # Sync progress only matters to dashboards watching that file
+        if event.event_type == SyncEventType.FILE_SYNC_PROGRESS:
+            channels = [f"file:{event.file_id}"]
+        else:
+            channels = ["events", f"file:{event.file_id}"] if event.file_id else ["events"]
+        
+        dashboards = self.active_connections.difference(self.dashboard_channels)
+        for channel in channels:
+            dashboards.update(self.channel_subs.get(channel, ()))
+        return list(dashboards)
     
     async def handle_node_message(self, node_id: str, message: dict):
         """Handle messages from client nodes."""
@@ -1141,7 +1639,7 @@ class CoordinatorServer:
         elif message_type == "file_change":
             # Handle file change notification
             await self.broadcast_event(SyncEvent(
-                event_id=str(uuid.uuid4()),
+                event_id=new_event_id(),
                 event_type=SyncEventType.FILE_MODIFIED,
                 node_id=node_id,
                 timestamp=datetime.now(),
@@ -1149,167 +1647,276 @@ class CoordinatorServer:
                 vector_clock=VectorClockModel()
             ))
     
+    async def _store_upload(self, file_metadata: FileMetadata, file_data: bytes, actual_hash: str,
+                            use_delta_sync: bool, start_ns: int) -> Dict[str, Any]:
+        """Version, record and broadcast an uploaded file; shared by the upload routes.
+        
+        start_ns is the route's time.perf_counter_ns() reading, for the sync latency.
+        """
+        # Get current vector clock and update it
+        current_clock = self.vector_clock_manager.increment_clock(file_metadata.owner_node)
+        
+        # Verify file hash
+        if actual_hash != file_metadata.hash:
+            # Allow empty hash for now, calculate it
+            file_metadata.hash = actual_hash
+        
+        # Check if this is a delta sync operation
+        old_content = b''
+        old_version_id = None
+        if use_delta_sync:
+            # Get previous version for delta sync
+            current_version = self.file_manager.get_current_version(file_metadata.file_id)
+            if current_version:
+                old_version_id = current_version['version_id']
+                old_content = self.file_manager.get_version_content(old_version_id) or b''
+        
+        # Create delta for analysis off the event loop; chunking and
+        # chunk hashing mostly release the GIL, so concurrent uploads
+        # can use more than one core
+        delta = await asyncio.to_thread(
+            self.delta_sync.create_content_delta,
+            old_content, 
+            file_data, 
+            file_metadata.file_id,
+            old_version_id
+        )
+        
+        # Update file metadata with current vector clock
+        file_metadata.vector_clock = current_clock
+        
+        # Create version
+        version = self.file_manager.create_version(
+            file_metadata.file_id,
+            file_data,
+            file_metadata.owner_node,
+            current_clock,
+            {
+                "uploaded_via": "api",
+                "delta_sync_used": use_delta_sync,
+                "bandwidth_saved": delta.bandwidth_saved,
+                "compression_ratio": delta.compression_ratio
+            },
+            content_hash=actual_hash
+        )
+        
+        # Store file metadata
+        await self.db.store_file(file_metadata)
+        
+        # Calculate metrics
+        sync_latency = (time.perf_counter_ns() - start_ns) / 1e9
+        delta_metrics = self.delta_sync.get_delta_metrics(delta, sync_latency)
+        
+        # Update global metrics
+        self.metrics['total_sync_operations'] += 1
+        self.metrics['total_bandwidth_saved'] += delta.bandwidth_saved
+        self.metrics['average_sync_latency'] = (
+            (self.metrics['average_sync_latency'] * (self.metrics['total_sync_operations'] - 1) + sync_latency) 
+            / self.metrics['total_sync_operations']
+        )
+        
+        # Broadcast file change event to all connected nodes
+        sync_event = SyncEvent(
+            event_id=new_event_id(),
+            event_type=SyncEventType.FILE_MODIFIED,
+            node_id=file_metadata.owner_node,
+            file_id=file_metadata.file_id,
+            timestamp=datetime.now(),
+            data={
+                'file_id': file_metadata.file_id,
+                'file_name': file_metadata.name,
+                'file_size': file_metadata.size,
+                'file_hash': file_metadata.hash,
+                'version_id': version,
+                'action': 'uploaded',
+                'delta_sync_used': use_delta_sync,
+                'bandwidth_saved': delta.bandwidth_saved,
+                'compression_ratio': delta.compression_ratio,
+                'chunks_total': delta.total_chunks,
+                'chunks_unchanged': len(delta.chunks_unchanged),
+                'chunks_transferred': len(delta.chunks_to_add)
+            },
+            vector_clock=current_clock
+        )
+        
+        await self.broadcast_event(sync_event)
+        
+        # Propagate to other online nodes
+        await self._propagate_file_to_nodes(file_metadata, file_data, version, delta)
+        
+        return {
+            "status": "success",
+            "version_id": version,
+            "sync_latency": sync_latency,
+            "delta_metrics": delta_metrics.model_dump(),
+            "vector_clock": current_clock.model_dump()
+        }
+    
     async def broadcast_event(self, event: SyncEvent):
         """Broadcast event to all connected clients."""
         # Store event in database
         await self.db.record_event(event)
         
+        # The event may change nodes, files or metrics
+        self._snapshot = None
+        self._snapshot_generation += 1
+        
         # Prepare message
         message = {
             "type": "event",
             "data": event.model_dump()
         }
-        message_json = json.dumps(message, default=json_serializer)
-        
-        # Send to all dashboard connections
-        disconnected = set()
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message_json)
-            except:
-                disconnected.add(connection)
-        
-        # Remove disconnected connections
-        self.active_connections -= disconnected
+        payload = serialize_message_bytes(message)
+        
+        dashboards = self._event_dashboards(event)
+        nodes = [
+            (node_id, connection) for node_id, connection in self.node_connections.items()
+            if node_id != event.node_id  # Don't echo back to sender
+        ]
+        
+        # Sync nodes inflate binary frames, so large payloads are compressed
+        # once here and the same bytes go to every node; dashboards get text,
+        # decoded only when someone will receive it
+        compressed = None
+        if len(payload) >= BROADCAST_COMPRESS_MIN:
+            compressed = zlib.compress(payload, 1)
+        message_json = payload.decode() if dashboards or compressed is None else None
+        
+        # Send to all dashboard connections and relevant node connections
+        # concurrently, so one slow client doesn't hold up the rest
+        results = await asyncio.gather(
+            *(connection.send_text(message_json) for connection in dashboards),
+            *(
+                connection.send_text(message_json) if compressed is None
+                else connection.send_bytes(compressed)
+                for _, connection in nodes
+            ),
+            return_exceptions=True
+        )
         
-        # Send to relevant node connections
-        for node_id, connection in self.node_connections.items():
-            if node_id != event.node_id:  # Don't echo back to sender
-                try:
-                    await connection.send_text(message_json)
-                except:
-                    # Connection is dead, will be cleaned up later
-                    pass
+        # Drop every connection whose send failed in one pass. A node may
+        # have reconnected while we were sending, so only its failed socket
+        # is removed, never a newer one; its handler still marks it offline
+        for connection, result in zip(dashboards, results):
+            if isinstance(result, BaseException):
+                self.active_connections.discard(connection)
+                self._unsubscribe(connection)
+        for (node_id, connection), result in zip(nodes, results[len(dashboards):]):
+            if isinstance(result, BaseException) and self.node_connections.get(node_id) is connection:
+                del self.node_connections[node_id]
     
-    async def _propagate_file_to_nodes(self, file_metadata: FileMetadata, file_data: bytes, version: str):
-        """Propagate file to other online nodes."""
+    async def _propagate_file_to_nodes(self, file_metadata: FileMetadata, file_data: bytes, version: str,
+                                       delta: Optional[FileDelta] = None):
+        """Propagate file to other online nodes.
+        
+        Replicas are stored concurrently, and each phase (started, completed,
+        failed) is reported to all targets in one event, so K target nodes
+        cost a few broadcasts rather than 5·K. The upload's delta, when
+        given, is reported with the completion for /api/delta-metrics.
+        """
         try:
             nodes = await self.db.get_online_nodes()
-            propagated_count = 0
+            targets = [node.node_id for node in nodes if node.node_id != file_metadata.owner_node]
+            if not targets:
+                return
             
-            for node in nodes:
-                if node.node_id != file_metadata.owner_node:
-                    try:
-                        # Create sync progress event - sync started
-                        await self.broadcast_event(SyncEvent(
-                            event_id=str(uuid.uuid4()),
-                            event_type=SyncEventType.FILE_SYNC_PROGRESS,
-                            node_id=node.node_id,
-                            file_id=file_metadata.file_id,
-                            timestamp=datetime.now(),
-                            data={
-                                'file_id': file_metadata.file_id,
-                                'file_name': file_metadata.name,
-                                'target_node': node.node_id,
-                                'source_node': file_metadata.owner_node,
-                                'action': 'sync_started',
-                                'progress': 0
-                            },
-                            vector_clock=VectorClockModel(clocks={node.node_id: 1})
-                        ))
-                        
-                        # Create a replica of the file metadata for this node
-                        replica_metadata = FileMetadata(
-                            file_id=f"{file_metadata.file_id}_replica_{node.node_id}",  # Unique ID for replica
-                            name=file_metadata.name,
-                            path=f"/{node.node_id}/replicas/{file_metadata.name}",
-                            size=file_metadata.size,
-                            hash=file_metadata.hash,
-                            created_at=file_metadata.created_at,
-                            modified_at=datetime.now(),
-                            owner_node=node.node_id,  # Set replica owner to the target node
-                            version=file_metadata.version,
-                            vector_clock=file_metadata.vector_clock,
-                            is_deleted=False,
-                            content_type=file_metadata.content_type
-                        )
-                        
-                        # Simulate file sync progress with actual storage
-                        for progress in [25, 50, 75]:
-                            await asyncio.sleep(0.3)  # Realistic delay
-                            await self.broadcast_event(SyncEvent(
-                                event_id=str(uuid.uuid4()),
-                                event_type=SyncEventType.FILE_SYNC_PROGRESS,
-                                node_id=node.node_id,
-                                file_id=file_metadata.file_id,
-                                timestamp=datetime.now(),
-                                data={
-                                    'file_id': file_metadata.file_id,
-                                    'file_name': file_metadata.name,
-                                    'target_node': node.node_id,
-                                    'source_node': file_metadata.owner_node,
-                                    'action': 'syncing',
-                                    'progress': progress
-                                },
-                                vector_clock=VectorClockModel(clocks={node.node_id: 1})
-                            ))
-                        
-                        # ACTUALLY STORE THE REPLICA METADATA IN DATABASE
-                        await self.db.store_file(replica_metadata)
-                        
-                        # Store the file content for this node in file manager
-                        file_version = self.file_manager.create_version(
-                            replica_metadata.file_id,  # Use replica file_id
-                            file_data,
-                            node.node_id,
-                            replica_metadata.vector_clock,
-                            {
-                                'replicated_from': file_metadata.owner_node, 
-                                'is_replica': True,
-                                'original_file_id': file_metadata.file_id
-                            }
-                        )
-                        
-                        # Final progress - complete
-                        await asyncio.sleep(0.3)
-                        await self.broadcast_event(SyncEvent(
-                            event_id=str(uuid.uuid4()),
-                            event_type=SyncEventType.SYNC_COMPLETED,
-                            node_id=node.node_id,
-                            file_id=file_metadata.file_id,
-                            timestamp=datetime.now(),
-                            data={
-                                'file_id': file_metadata.file_id,
-                                'file_name': file_metadata.name,
-                                'target_node': node.node_id,
-                                'source_node': file_metadata.owner_node,
-                                'action': 'sync_completed',
-                                'bytes_transferred': len(file_data),
-                                'version_id': file_version,
-                                'replica_file_id': replica_metadata.file_id
-                            },
-                            vector_clock=VectorClockModel(clocks={node.node_id: 1})
-                        ))
-                        
-                        propagated_count += 1
-                        print(f"Successfully replicated file {file_metadata.name} to node {node.node_id} (replica_id: {replica_metadata.file_id})")
-                        
-                    except Exception as e:
-                        print(f"Error propagating file to node {node.node_id}: {str(e)}")
-                        # Send error event
-                        await self.broadcast_event(SyncEvent(
-                            event_id=str(uuid.uuid4()),
-                            event_type=SyncEventType.SYNC_ERROR,
-                            node_id=node.node_id,
-                            file_id=file_metadata.file_id,
-                            timestamp=datetime.now(),
-                            data={
-                                'file_id': file_metadata.file_id,
-                                'file_name': file_metadata.name,
-                                'target_node': node.node_id,
-                                'source_node': file_metadata.owner_node,
-                                'error': str(e)
-                            },
-                            vector_clock=VectorClockModel(clocks={node.node_id: 1})
-                        ))
+            # Dashboards animate progress between the started and completed
+            # events from this estimate rather than from per-percent ticks
+            total_bytes = len(file_data) * len(targets)
+            estimated_duration = (
+                total_bytes / self.replication_throughput if self.replication_throughput else None
+            )
+            start_ns = time.perf_counter_ns()
             
-            print(f"Successfully propagated file {file_metadata.name} to {propagated_count} nodes with database storage")
+            # Create sync progress event - sync started on every target
+            await self.broadcast_event(SyncEvent(
+                event_id=new_event_id(),
+                event_type=SyncEventType.FILE_SYNC_PROGRESS,
+                node_id=file_metadata.owner_node,
+                file_id=file_metadata.file_id,
+                timestamp=datetime.now(),
+                data={
+                    'file_id': file_metadata.file_id,
+                    'file_name': file_metadata.name,
+                    'target_nodes': targets,
+                    'source_node': file_metadata.owner_node,
+                    'action': 'sync_started',
+                    'progress': 0,
+                    'estimated_duration': estimated_duration
+                },
+                vector_clock=VectorClockModel(clocks={node_id: 1 for node_id in targets})
+            ))
+            
+            results = await asyncio.gather(
+                *(self._store_replica(file_metadata, file_data, node_id) for node_id in targets),
+                return_exceptions=True
+            )
+            duration = (time.perf_counter_ns() - start_ns) / 1e9
+            if duration > 0 and total_bytes:
+                self.replication_throughput = total_bytes / duration
+            
+            completed = []
+            failed = []
+            for node_id, result in zip(targets, results):
+                if isinstance(result, BaseException):
+                    logger.error("Error propagating file to node %s: %s", node_id, result)
+                    failed.append({'target_node': node_id, 'error': str(result)})
+                else:
+                    replica_file_id, file_version = result
+                    completed.append({
+                        'target_node': node_id,
+                        'version_id': file_version,
+                        'replica_file_id': replica_file_id
+                    })
+            
+            # Final progress - complete
+            if completed:
+                await self.broadcast_event(SyncEvent(
+                    event_id=new_event_id(),
+                    event_type=SyncEventType.SYNC_COMPLETED,
+                    node_id=file_metadata.owner_node,
+                    file_id=file_metadata.file_id,
+                    timestamp=datetime.now(),
+                    data={
+                        'file_id': file_metadata.file_id,
+                        'file_name': file_metadata.name,
+                        'source_node': file_metadata.owner_node,
+                        'action': 'sync_completed',
+                        'progress': 100,
+                        'bytes_transferred': len(file_data) * len(completed),
+                        'duration': duration,
+                        'replicas': completed,
+                        'bandwidth_saved': delta.bandwidth_saved if delta else 0,
+                        'compression_ratio': delta.compression_ratio if delta else 0
+                    },
+                    vector_clock=VectorClockModel(clocks={entry['target_node']: 1 for entry in completed})
+                ))
+            
+            # Send error event
+            if failed:
+                await self.broadcast_event(SyncEvent(
+                    event_id=new_event_id(),
+                    event_type=SyncEventType.SYNC_ERROR,
+                    node_id=file_metadata.owner_node,
+                    file_id=file_metadata.file_id,
+                    timestamp=datetime.now(),
+                    data={
+                        'file_id': file_metadata.file_id,
+                        'file_name': file_metadata.name,
+                        'source_node': file_metadata.owner_node,
+                        'error': f"Propagation failed on {len(failed)} node(s)",
+                        'failures': failed
+                    },
+                    vector_clock=VectorClockModel(clocks={entry['target_node']: 1 for entry in failed})
+                ))
+            
+            logger.debug("Propagated file %s to %d nodes", file_metadata.name, len(completed))
             
         except Exception as e:
-            print(f"Error in file propagation: {str(e)}")
+            logger.error("Error in file propagation: %s", e)
             # Broadcast general error
             await self.broadcast_event(SyncEvent(
-                event_id=str(uuid.uuid4()),
+                event_id=new_event_id(),
                 event_type=SyncEventType.SYNC_ERROR,
                 node_id=file_metadata.owner_node,
                 file_id=file_metadata.file_id,
@@ -1322,6 +1929,49 @@ class CoordinatorServer:
                 vector_clock=VectorClockModel()
             ))
     
+    async def _store_replica(self, file_metadata: FileMetadata, file_data: bytes, node_id: str):
+        """Store one node's replica of a file; returns (replica_file_id, version_id)."""
+        # Bounded so a large cluster can't queue every replica at once
+        async with self._replica_semaphore:
+            # Create a replica of the file metadata for this node
+            replica_metadata = FileMetadata(
+                file_id=f"{file_metadata.file_id}_replica_{node_id}",  # Unique ID for replica
+                name=file_metadata.name,
+                path=f"/{node_id}/replicas/{file_metadata.name}",
+                size=file_metadata.size,
+                hash=file_metadata.hash,
+                created_at=file_metadata.created_at,
+                modified_at=datetime.now(),
+                owner_node=node_id,  # Set replica owner to the target node
+                version=file_metadata.version,
+                vector_clock=file_metadata.vector_clock,
+                is_deleted=False,
+                content_type=file_metadata.content_type
+            )
+            
+            # Store the replica metadata in the database
+            await self.db.store_file(replica_metadata)
+            
+            # Store the file content for this node in file manager
+            file_version = self.file_manager.create_version(
+                replica_metadata.file_id,  # Use replica file_id
+                file_data,
+                node_id,
+                replica_metadata.vector_clock,
+                {
+                    'replicated_from': file_metadata.owner_node, 
+                    'is_replica': True,
+                    'original_file_id': file_metadata.file_id
+                },
+                # Already verified against the upload; every replica shares
+                # the uploaded blob
+                content_hash=file_metadata.hash
+            )
+            
+            logger.debug("Replicated file %s to node %s (replica_id: %s)",
+                         file_metadata.name, node_id, replica_metadata.file_id)
+            return replica_metadata.file_id, file_version
+    
     async def get_current_metrics(self) -> dict:
         """Get current system metrics."""
         stats = await self.db.get_statistics()
@@ -1335,16 +1985,40 @@ class CoordinatorServer:
         }
 
 
-def calculate_file_hash_from_data(data: bytes) -> str:
-    """Calculate SHA-256 hash from file data."""
-    import hashlib
-    return hashlib.sha256(data).hexdigest()
+def start_log_listener() -> logging.handlers.QueueListener:
+    """Hand the root logger's output to a background thread.
+    
+    Records are only queued on the calling thread (the event loop), and
+    the listener thread does the formatting and writes.
+    """
+    root = logging.getLogger()
+    handlers = root.handlers[:] or [logging.StreamHandler()]
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener.start()
+    return listener
 
 
 def run_coordinator(host: str = "localhost", port: int = 8000):
     """Run the coordinator server."""
     coordinator = CoordinatorServer()
-    uvicorn.run(coordinator.app, host=host, port=port)
+    listener = start_log_listener()
+    try:
+        # Broadcasts are compressed once in broadcast_event; permessage-deflate
+        # would recompress every frame separately for each connection
+        # A deep accept backlog keeps every node's reconnect after a
+        # coordinator restart from being dropped at once
+        uvicorn.run(
+            coordinator.app, host=host, port=port,
+            loop="uvloop" if uvloop else "asyncio",
+            http="httptools" if httptools else "h11",
+            ws="websockets",
+            ws_per_message_deflate=False,
+            backlog=2048
+        )
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__":
@@ -49,7 +49,7 @@ class VectorClock:
             Self for method chaining
         """
         self.clocks[self.node_id] += 1
-        logging.debug(f"Node {self.node_id} incremented clock to {self.clocks[self.node_id]}")
+        logging.debug("Node %s incremented clock to %s", self.node_id, self.clocks[self.node_id])
         return self
     
     def update(self, other: 'VectorClock') -> 'VectorClock':
@@ -66,19 +66,20 @@ class VectorClock:
         if not isinstance(other, VectorClock):
             raise ValueError("Can only update with another VectorClock")
         
-        # Get all known nodes
-        all_nodes = set(self.clocks.keys()) | set(other.clocks.keys())
-        
-        # Update each component to max value
-        for node in all_nodes:
-            self_val = self.clocks.get(node, 0)
-            other_val = other.clocks.get(node, 0)
-            self.clocks[node] = max(self_val, other_val)
+        # Update each component to max value; only the other clock's nodes
+        # can change, and nodes it lacks count as 0
+        clocks = self.clocks
+        for node, other_val in other.clocks.items():
+            if other_val > clocks.get(node, 0):
+                clocks[node] = other_val
+            else:
+                clocks.setdefault(node, 0)
         
         # Increment our own clock
-        self.clocks[self.node_id] += 1
+        clocks[self.node_id] += 1
         
-        logging.debug(f"Node {self.node_id} updated clock after receiving message: {self.clocks}")
+        # Lazy formatting: the dict is only rendered when debug logging is on
+        logging.debug("Node %s updated clock after receiving message: %s", self.node_id, clocks)
         return self
     
     def compare(self, other: 'VectorClock') -> ClockComparison:
@@ -94,20 +95,27 @@ class VectorClock:
         if not isinstance(other, VectorClock):
             raise ValueError("Can only compare with another VectorClock")
         
-        all_nodes = set(self.clocks.keys()) | set(other.clocks.keys())
+        self_clocks = self.clocks
+        other_clocks = other.clocks
         
         self_greater = False
         other_greater = False
         
-        for node in all_nodes:
-            self_val = self.clocks.get(node, 0)
-            other_val = other.clocks.get(node, 0)
+        # One lookup per node instead of building the union of both key
+        # sets; a node missing from one side counts as 0 there
+        for node, self_val in self_clocks.items():
+            other_val = other_clocks.get(node, 0)
             
             if self_val > other_val:
                 self_greater = True
             elif other_val > self_val:
                 other_greater = True
         
+        for node, other_val in other_clocks.items():
+            if other_val > 0 and node not in self_clocks:
+                other_greater = True
+                break
+        
         # Determine relationship
         if self_greater and not other_greater:
             return ClockComparison.AFTER
@@ -319,21 +327,14 @@ class VectorClockManager:
         Returns:
             Events sorted in causal order
         """
-        def compare_events(event1, event2):
-            clock1 = VectorClock.from_dict(event1["vector_clock"])
-            clock2 = VectorClock.from_dict(event2["vector_clock"])
-            
-            comparison = clock1.compare(clock2)
-            if comparison == ClockComparison.BEFORE:
-                return -1
-            elif comparison == ClockComparison.AFTER:
-                return 1
-            else:
-                # For concurrent events, use timestamp as tiebreaker
-                return -1 if event1["timestamp"] < event2["timestamp"] else 1
-        
-        from functools import cmp_to_key
-        return sorted(events, key=cmp_to_key(compare_events))
+        # If event a happened before b, every component of a is <= b's and
+        # at least one is smaller, so a's clock sum is strictly smaller.
+        # Sorting on the sum therefore respects causality in O(n log n)
+        # without comparing clocks pairwise; timestamps order the rest
+        return sorted(
+            events,
+            key=lambda event: (sum(event["vector_clock"]["clocks"].values()), event["timestamp"])
+        )
     
     def get_system_state(self) -> Dict:
         """Get the current state of all vector clocks in the system."""
@@ -5,7 +5,7 @@ Shared data models for the distributed file synchronization system.
 from datetime import datetime
 from enum import Enum
 from typing import Dict, List, Optional, Any, Union
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, PrivateAttr, validator
 import hashlib
 import json
 
@@ -31,23 +31,62 @@ class SyncEventType(str, Enum):
     NODE_LEFT = "node_left"
     SYNC_STARTED = "sync_started"
     SYNC_COMPLETED = "sync_completed"
+    SYNC_ERROR = "sync_error"
     NODE_STATUS_CHANGE = "node_status_change"
     VECTOR_CLOCK_UPDATE = "vector_clock_update"
     FILE_SYNC_PROGRESS = "file_sync_progress"
 
 
 class VectorClockModel(BaseModel):
-    """Vector clock for maintaining causal ordering."""
+    """Vector clock for maintaining causal ordering.
+    
+    Mutate ``clocks`` through the methods below (``set_time`` for direct
+    assignment) so the cached display string and max time stay valid.
+    """
     clocks: Dict[str, int] = Field(default_factory=dict)
     
+    # Derived values, recomputed only after the clock changes
+    _display: Optional[str] = PrivateAttr(default=None)
+    _max_time: Optional[int] = PrivateAttr(default=None)
+    
+    def __eq__(self, other: object) -> bool:
+        # Compare the clocks only, not whether their caches are warm
+        if isinstance(other, VectorClockModel):
+            return self.clocks == other.clocks
+        return NotImplemented
+    
+    def _advanced(self, value: int) -> None:
+        """Note that a component moved forward to ``value``."""
+        self._display = None
+        if self._max_time is not None and value > self._max_time:
+            self._max_time = value
+    
+    def set_time(self, node_id: str, value: int) -> None:
+        """Set the clock for a specific node."""
+        previous = self.clocks.get(node_id)
+        self.clocks[node_id] = value
+        if previous is not None and value < previous:
+            self._display = None
+            self._max_time = None
+        else:
+            self._advanced(value)
+    
     def increment(self, node_id: str) -> None:
         """Increment the clock for a specific node."""
-        self.clocks[node_id] = self.clocks.get(node_id, 0) + 1
+        value = self.clocks.get(node_id, 0) + 1
+        self.clocks[node_id] = value
+        self._advanced(value)
     
     def update(self, other: 'VectorClockModel') -> None:
         """Update this clock with another clock (take max of each component)."""
         for node_id, clock_value in other.clocks.items():
-            self.clocks[node_id] = max(self.clocks.get(node_id, 0), clock_value)
+            if clock_value > self.clocks.get(node_id, 0):
+                self.clocks[node_id] = clock_value
+                self._advanced(clock_value)
+            elif node_id not in self.clocks:
+                # A new zero component still shows up in the display string
+                self.clocks[node_id] = 0
+                self._display = None
     
     def update_on_receive(self, other: 'VectorClockModel', receiving_node: str) -> None:
         """Update clock when receiving a message from another node."""
@@ -95,19 +134,27 @@ class VectorClockModel(BaseModel):
     
     def get_max_time(self) -> int:
         """Get the maximum logical time across all nodes."""
-        return max(self.clocks.values()) if self.clocks else 0
+        if self._max_time is None:
+            self._max_time = max(self.clocks.values()) if self.clocks else 0
+        return self._max_time
     
     def copy(self) -> 'VectorClockModel':
         """Create a copy of this vector clock."""
-        return VectorClockModel(clocks=self.clocks.copy())
+        clock = VectorClockModel(clocks=self.clocks.copy())
+        clock._display = self._display
+        clock._max_time = self._max_time
+        return clock
     
     def to_display_string(self) -> str:
         """Convert to human-readable string for UI display."""
-        if not self.clocks:
-            return "[]"
-        sorted_items = sorted(self.clocks.items())
-        clock_values = [str(value) for _, value in sorted_items]
-        return f"[{', '.join(clock_values)}]"
+        if self._display is None:
+            if not self.clocks:
+                self._display = "[]"
+            else:
+                sorted_items = sorted(self.clocks.items())
+                clock_values = [str(value) for _, value in sorted_items]
+                self._display = f"[{', '.join(clock_values)}]"
+        return self._display
 
 
 class FileChunk(BaseModel):
@@ -152,7 +199,7 @@ class ChunkSignature(BaseModel):
     offset: int
     size: int
     weak_hash: int  # Rolling hash (32-bit)
-    strong_hash: str  # SHA-256 hash
+    strong_hash: str  # Hex of the 16-byte truncated SHA-256 digest
     
     def matches(self, other: 'ChunkSignature') -> bool:
         """Check if this signature matches another."""
@@ -417,7 +464,11 @@ class HealthCheckResponse(BaseModel):
 
 
 class DeltaSyncRequest(BaseModel):
-    """Request for delta synchronization."""
+    """Request for delta synchronization.
+    
+    When no chunk carries data, the chunks are fingerprints (hash is the hex
+    chunk digest) and the coordinator only reports the set differences.
+    """
     file_id: str
     current_version: int
     current_chunks: List[FileChunk] = Field(default_factory=list)
@@ -1,23 +1,42 @@
 import os
 import hashlib
-from typing import Optional, Dict, Any
+import uuid
+import zlib
+from typing import Optional, Dict, Any, Iterator, List, Iterable, Tuple
 import aiofiles
 import asyncio
 from datetime import datetime
 
+try:
+    import numpy as np
+    from numba import njit, prange
+except ImportError:  # Chunking falls back to the pure-Python loops below
+    np = None
+    njit = None
+    prange = None
+
 def generate_file_id(file_path: str) -> str:
     """Generate a unique file ID based on the file path."""
     # Use a combination of path and timestamp to ensure uniqueness
     timestamp = datetime.now().timestamp()
     return hashlib.sha256(f"{file_path}:{timestamp}".encode()).hexdigest()
 
+def generate_unique_id(prefix: str = "") -> str:
+    """Generate a random unique ID, optionally prefixed (``<prefix>_<hex>``)."""
+    unique = uuid.uuid4().hex
+    return f"{prefix}_{unique}" if prefix else unique
+
 def calculate_file_hash(file_path: str) -> str:
     """Calculate SHA-256 hash of a file."""
-    sha256_hash = hashlib.sha256()
-    
     with open(file_path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            # Reads into one reusable buffer with the GIL released; no
+            # bytes object per block
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        
+        sha256_hash = hashlib.sha256()
         # Read the file in chunks to handle large files
-        for byte_block in iter(lambda: f.read(4096), b""):
+        for byte_block in iter(lambda: f.read(1024 * 1024), b""):
             sha256_hash.update(byte_block)
     
     return sha256_hash.hexdigest()
@@ -94,4 +113,244 @@ def format_file_size(size_bytes: int) -> str:
         size_bytes /= 1024
         i += 1
     
-    return f"{size_bytes:.2f} {size_names[i]}" 
\ No newline at end of file
+    return f"{size_bytes:.2f} {size_names[i]}" 
+
+def format_bytes(size_bytes: int) -> str:
+    """Format a byte count in human-readable format."""
+    return format_file_size(size_bytes)
+
+def calculate_content_hash(content: bytes) -> str:
+    """Calculate SHA-256 hash of in-memory content."""
+    return hashlib.sha256(content).hexdigest()
+
+def get_content_chunks(content: bytes, chunk_size: int = 4096) -> Iterator[bytes]:
+    """Yield fixed-size chunks of content."""
+    for offset in range(0, len(content), chunk_size):
+        yield content[offset:offset + chunk_size]
+
+# Rabin-Karp base for the weak chunk hash, kept to 32 bits
+ROLLING_HASH_BASE = 257
+ROLLING_HASH_MASK = 0xFFFFFFFF
+# Compiled weak-hash scans prefilter candidates through a bitmap of this many
+# entries indexed by the low bits of the hash
+_WEAK_FILTER_SIZE = 1 << 20
+
+# Gear table for content-defined chunking: one pseudo-random 64-bit value per
+# byte, derived deterministically so every node cuts at the same offsets
+_GEAR = [
+    int.from_bytes(hashlib.sha256(bytes([i])).digest()[:8], "little")
+    for i in range(256)
+]
+_U64_MASK = 0xFFFFFFFFFFFFFFFF
+# Each byte's gear value is shifted out of the 64-bit hash after 64 more
+# bytes, so a cut candidate only depends on the 64 bytes before it. Hashing
+# can therefore start 64 bytes before the minimum chunk size instead of at
+# the previous cut, with identical results.
+_GEAR_WINDOW = 64
+# Adler-32 modulus, and the most bytes summed before reducing without the
+# 32-bit sums overflowing (zlib's NMAX)
+_ADLER_MOD = 65521
+_ADLER_NMAX = 5552
+# Below this, per-chunk zlib.adler32 calls beat the parallel kernel's launch
+_ADLER_CHUNKS_MIN = 1 << 20
+
+def _chunking_params(target_chunk_size: int):
+    """Boundary mask and min/max chunk sizes for a target average size."""
+    bits = max(1, target_chunk_size.bit_length() - 1)
+    mask = (1 << bits) - 1
+    return mask, max(1, target_chunk_size // 4), target_chunk_size * 4
+
+def _rolling_hash_py(data: bytes, window_size: int) -> int:
+    h = 0
+    for byte in data[-window_size:]:
+        h = (h * ROLLING_HASH_BASE + byte) & ROLLING_HASH_MASK
+    return h
+
+def _roll_to_candidate_py(content, pos: int, end: int, h: int, window_size: int,
+                          weak_set) -> Tuple[int, int]:
+    high = pow(ROLLING_HASH_BASE, window_size - 1, ROLLING_HASH_MASK + 1)
+    while pos < end:
+        h = ((h - content[pos - window_size] * high) * ROLLING_HASH_BASE + content[pos]) & ROLLING_HASH_MASK
+        pos += 1
+        if h in weak_set:
+            break
+    return pos, h
+
+def _find_boundaries_py(content: bytes, mask: int, min_size: int, max_size: int) -> List[int]:
+    boundaries = []
+    gear = _GEAR
+    n = len(content)
+    start = 0
+    while start < n:
+        end = min(n, start + max_size)
+        cut = end
+        # Warm the hash up to the first allowed cut, then test every byte
+        first = min(end, start + min_size - 1)
+        h = 0
+        for byte in content[max(start, first - _GEAR_WINDOW):first]:
+            h = ((h << 1) + gear[byte]) & _U64_MASK
+        i = first
+        for byte in content[first:end]:
+            h = ((h << 1) + gear[byte]) & _U64_MASK
+            i += 1
+            if (h & mask) == 0:
+                cut = i
+                break
+        boundaries.append(cut)
+        start = cut
+    return boundaries
+
+if njit is not None:
+    _GEAR_NP = np.array(_GEAR, dtype=np.uint64)
+
+    @njit(cache=True, boundscheck=False, nogil=True)
+    def _rolling_hash_nb(buf, window_size):
+        h = np.uint64(0)
+        for i in range(max(0, buf.shape[0] - window_size), buf.shape[0]):
+            h = (h * np.uint64(ROLLING_HASH_BASE) + np.uint64(buf[i])) & np.uint64(ROLLING_HASH_MASK)
+        return h
+
+    @njit(cache=True, boundscheck=False, nogil=True)
+    def _find_boundaries_nb(buf, gear, mask, min_size, max_size):
+        n = buf.shape[0]
+        # At most one boundary per min_size bytes, plus the tail
+        out = np.empty(n // min_size + 1, dtype=np.int64)
+        count = 0
+        start = 0
+        while start < n:
+            end = min(n, start + max_size)
+            cut = end
+            # Warm the hash up to the first allowed cut with no tests, so
+            # the scanning loop carries only the mask check
+            first = min(end, start + min_size - 1)
+            h = np.uint64(0)
+            for i in range(max(start, first - _GEAR_WINDOW), first):
+                h = (h << np.uint64(1)) + gear[buf[i]]
+            for i in range(first, end):
+                h = (h << np.uint64(1)) + gear[buf[i]]
+                if (h & mask) == 0:
+                    cut = i + 1
+                    break
+            out[count] = cut
+            count += 1
+            start = cut
+        return out[:count]
+
+    @njit(cache=True, boundscheck=False, nogil=True)
+    def _roll_to_candidate_nb(buf, pos, end, h, window_size, high, bitmap):
+        base = np.uint64(ROLLING_HASH_BASE)
+        mask = np.uint64(ROLLING_HASH_MASK)
+        filter_mask = np.uint64(bitmap.shape[0] - 1)
+        while pos < end:
+            # uint64 wraparound keeps the subtraction exact modulo 2**32
+            h = ((h - np.uint64(buf[pos - window_size]) * high) * base + np.uint64(buf[pos])) & mask
+            pos += 1
+            if bitmap[h & filter_mask]:
+                break
+        return pos, h
+
+    @njit(cache=True, boundscheck=False, nogil=True, parallel=True)
+    def _adler32_chunks_nb(buf, ends):
+        count = ends.shape[0]
+        out = np.empty(count, dtype=np.uint32)
+        for k in prange(count):
+            i = ends[k - 1] if k > 0 else 0
+            end = ends[k]
+            a = np.uint32(1)
+            b = np.uint32(0)
+            while i < end:
+                stop = min(i + _ADLER_NMAX, end)
+                while i < stop:
+                    a += buf[i]
+                    b += a
+                    i += 1
+                a %= np.uint32(_ADLER_MOD)
+                b %= np.uint32(_ADLER_MOD)
+            out[k] = (b << np.uint32(16)) | a
+        return out
+
+    # Compile (or load from the on-disk cache) at import rather than on the
+    # first sync request; frombuffer views of bytes are read-only, which
+    # numba treats as a distinct signature
+    _warm = np.frombuffer(bytes(64), dtype=np.uint8)
+    _rolling_hash_nb(_warm, 16)
+    _adler32_chunks_nb(_warm, np.array([16, 64], dtype=np.int64))
+    _find_boundaries_nb(_warm, _GEAR_NP, np.uint64(15), 4, 64)
+    _roll_to_candidate_nb(_warm, 16, 64, np.uint64(0), 16, np.uint64(1),
+                          np.zeros(2, dtype=np.bool_))
+    del _warm
+
+def rolling_hash(data: bytes, window_size: int = 64) -> int:
+    """Rabin-Karp weak hash over the last window_size bytes of data."""
+    if njit is not None:
+        return int(_rolling_hash_nb(np.frombuffer(data, dtype=np.uint8), window_size))
+    return _rolling_hash_py(data, window_size)
+
+def adler32_chunks(content: bytes, boundaries: List[int]) -> List[int]:
+    """
+    Adler-32 of each chunk of content, as split by find_chunk_boundaries.
+    
+    Matches zlib.adler32 per chunk. Large inputs are hashed by a compiled
+    kernel that spreads chunks over cores.
+    """
+    if njit is not None and len(content) >= _ADLER_CHUNKS_MIN:
+        ends = np.array(boundaries, dtype=np.int64)
+        return _adler32_chunks_nb(np.frombuffer(content, dtype=np.uint8), ends).tolist()
+    view = memoryview(content)
+    hashes = []
+    start = 0
+    for end in boundaries:
+        hashes.append(zlib.adler32(view[start:end]))
+        start = end
+    return hashes
+
+def build_weak_filter(weak_hashes: Iterable[int]):
+    """
+    Build the candidate filter used by roll_to_weak_candidate.
+    
+    The compiled scan uses a bitmap over the low hash bits (false positives
+    are possible); the pure-Python scan uses an exact set.
+    """
+    if njit is not None:
+        bitmap = np.zeros(_WEAK_FILTER_SIZE, dtype=np.bool_)
+        hashes = np.fromiter(weak_hashes, dtype=np.uint64)
+        bitmap[hashes & np.uint64(_WEAK_FILTER_SIZE - 1)] = True
+        return bitmap
+    return set(weak_hashes)
+
+def roll_to_weak_candidate(content, pos: int, end: int, h: int, window_size: int,
+                           weak_filter) -> Tuple[int, int]:
+    """
+    Roll a window hash forward until it may match a weak hash.
+    
+    h is the rolling_hash of the window_size bytes ending at pos. The window
+    slides one byte at a time until the hash hits weak_filter or pos reaches
+    end, and the new (pos, h) is returned. Callers must still confirm hits.
+    """
+    if njit is not None:
+        buf = np.frombuffer(content, dtype=np.uint8)
+        high = pow(ROLLING_HASH_BASE, window_size - 1, ROLLING_HASH_MASK + 1)
+        pos, h = _roll_to_candidate_nb(buf, pos, end, np.uint64(h), window_size,
+                                       np.uint64(high), weak_filter)
+        return int(pos), int(h)
+    return _roll_to_candidate_py(content, pos, end, h, window_size, weak_filter)
+
+def find_chunk_boundaries(content: bytes, target_chunk_size: int = 4096,
+                          content_defined: bool = True) -> List[int]:
+    """
+    Find chunk boundaries, content-defined via a Gear rolling hash by default.
+    
+    Returns the end offset of each chunk; the last entry is len(content).
+    With content_defined=False chunks are fixed-size and nothing is scanned.
+    """
+    if not content:
+        return []
+    if not content_defined:
+        boundaries = list(range(target_chunk_size, len(content), target_chunk_size))
+        boundaries.append(len(content))
+        return boundaries
+    mask, min_size, max_size = _chunking_params(target_chunk_size)
+    if njit is not None:
+        buf = np.frombuffer(content, dtype=np.uint8)
+        return _find_boundaries_nb(buf, _GEAR_NP, np.uint64(mask), min_size, max_size).tolist()
+    return _find_boundaries_py(content, mask, min_size, max_size)
\ No newline at end of file
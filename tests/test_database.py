@@ -0,0 +1,130 @@
+"""
+Tests for the coordinator database layer.
+"""
+
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from coordinator.database import DatabaseManager
+from shared.models import NodeInfo, NodeStatus, SyncEvent, SyncEventType, VectorClockModel
+
+
+def _event(event_id: str, timestamp: datetime = None) -> SyncEvent:
+    return SyncEvent(
+        event_id=event_id,
+        event_type=SyncEventType.FILE_MODIFIED,
+        node_id="n1",
+        file_id="f1",
+        timestamp=timestamp or datetime.now(),
+        vector_clock=VectorClockModel(clocks={"n1": 1}),
+        data={"k": event_id}
+    )
+
+
+def _create_pre_epoch_database(path):
+    """Tables as written before timestamps became epoch microseconds."""
+    db = sqlite3.connect(path)
+    db.execute("""
+        CREATE TABLE nodes (
+            node_id TEXT PRIMARY KEY,
+            address TEXT NOT NULL,
+            port INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'offline',
+            last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            version TEXT DEFAULT '1.0.0',
+            capabilities TEXT DEFAULT '[]',
+            watch_directories TEXT DEFAULT '[]',
+            file_count INTEGER DEFAULT 0,
+            total_size INTEGER DEFAULT 0,
+            vector_clock TEXT DEFAULT '{}',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    db.execute("""
+        CREATE TABLE events (
+            event_id TEXT PRIMARY KEY,
+            event_type TEXT NOT NULL,
+            node_id TEXT NOT NULL,
+            file_id TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            vector_clock TEXT NOT NULL,
+            data TEXT DEFAULT '{}',
+            processed BOOLEAN DEFAULT FALSE
+        )
+    """)
+    db.execute(
+        "INSERT INTO nodes (node_id, address, port, last_seen, updated_at) VALUES (?, ?, ?, ?, ?)",
+        ("old", "127.0.0.1", 8001, "2024-01-02T03:04:05", "2024-01-02T03:04:05")
+    )
+    db.execute(
+        "INSERT INTO events (event_id, event_type, node_id, timestamp, vector_clock) VALUES (?, ?, ?, ?, ?)",
+        ("e-old", "file_modified", "old", "2024-01-02T03:04:05.250000", '{"clocks": {}}')
+    )
+    db.commit()
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_upgraded_database_stores_epoch_timestamps(tmp_path):
+    path = tmp_path / "coordinator.db"
+    _create_pre_epoch_database(path)
+    
+    db = DatabaseManager(str(path))
+    await db.initialize()
+    assert await db.register_node(NodeInfo(
+        node_id="new", address="127.0.0.1", port=8002, status=NodeStatus.ONLINE
+    ))
+    
+    old = await db.get_node("old")
+    events = await db.get_recent_events(10)
+    await db.close()
+    
+    assert old.last_seen == datetime(2024, 1, 2, 3, 4, 5)
+    assert [e.timestamp for e in events] == [datetime(2024, 1, 2, 3, 4, 5, 250000)]
+    
+    raw = sqlite3.connect(path)
+    types = raw.execute(
+        "SELECT DISTINCT typeof(created_at), typeof(last_seen), typeof(updated_at) FROM nodes"
+    ).fetchall()
+    raw.close()
+    # Including the node registered after the upgrade, whose created_at
+    # would otherwise come from the old CURRENT_TIMESTAMP default
+    assert types == [("integer", "integer", "integer")]
+
+
+@pytest.mark.asyncio
+async def test_queued_events_land_in_order_and_flush_on_close(tmp_path):
+    path = str(tmp_path / "coordinator.db")
+    db = DatabaseManager(path)
+    await db.initialize()
+    base = datetime(2024, 1, 1)
+    for i in range(50):
+        assert await db.record_event(_event(f"e{i:02d}", base.replace(second=i)))
+    await db.close()
+    
+    reopened = DatabaseManager(path)
+    events = await reopened.get_recent_events(100)
+    await reopened.close()
+    
+    assert [e.event_id for e in events] == [f"e{i:02d}" for i in reversed(range(50))]
+    assert events[0].data == {"k": "e49"}
+
+
+@pytest.mark.asyncio
+async def test_failed_queued_write_does_not_drop_its_batch(tmp_path):
+    db = DatabaseManager(str(tmp_path / "coordinator.db"))
+    await db.initialize()
+    assert await db.record_event_sync(_event("dup"))
+    
+    # The duplicate fails the batched insert; the rest are retried one by one
+    for event_id in ("a", "dup", "b"):
+        await db.record_event(_event(event_id))
+    await db.close()
+    
+    reopened = DatabaseManager(str(tmp_path / "coordinator.db"))
+    events = await reopened.get_recent_events(10)
+    await reopened.close()
+    assert sorted(e.event_id for e in events) == ["a", "b", "dup"]
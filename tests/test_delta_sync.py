@@ -0,0 +1,93 @@
+"""
+Tests for the coordinator delta sync engine and chunk store.
+"""
+
+import base64
+import json
+import os
+
+from coordinator.delta_sync import ChunkStore, DeltaSync
+
+
+def _fill(store, count=10, size=1000):
+    chunks = {f"h{i}": os.urandom(size) for i in range(count)}
+    for chunk_hash, data in chunks.items():
+        assert store.store_chunk(chunk_hash, data)
+    return chunks
+
+
+def test_chunk_store_round_trip_and_reopen(tmp_path):
+    store = ChunkStore(str(tmp_path))
+    chunks = _fill(store)
+    store.close()
+    
+    reopened = ChunkStore(str(tmp_path))
+    assert all(reopened.retrieve_chunk(h) == data for h, data in chunks.items())
+    reopened.close()
+
+
+def test_cleanup_compacts_into_a_new_pack_generation(tmp_path):
+    store = ChunkStore(str(tmp_path))
+    chunks = _fill(store)
+    for chunk_hash in ("h0", "h3", "h7"):
+        store.delete_chunk(chunk_hash)
+        del chunks[chunk_hash]
+    
+    assert store.cleanup_unreferenced() == 3
+    assert [p.name for p in tmp_path.glob("pack*.bin")] == ["pack-1.bin"]
+    assert store.get_store_stats()["reclaimable_size"] == 0
+    assert all(store.retrieve_chunk(h) == data for h, data in chunks.items())
+    store.close()
+    
+    reopened = ChunkStore(str(tmp_path))
+    assert all(reopened.retrieve_chunk(h) == data for h, data in chunks.items())
+    assert reopened.retrieve_chunk("h0") is None
+    reopened.close()
+
+
+def test_interrupted_cleanup_keeps_index_and_pack_consistent(tmp_path, monkeypatch):
+    store = ChunkStore(str(tmp_path))
+    chunks = _fill(store)
+    store.save_index()
+    store.delete_chunk("h0")
+    del chunks["h0"]
+    
+    # Crash between writing the new pack and switching the index to it
+    monkeypatch.setattr(store, "save_index", lambda: False)
+    assert store.cleanup_unreferenced() == 0
+    assert all(store.retrieve_chunk(h) == data for h, data in chunks.items())
+    
+    # Simulate the leftover of a hard crash at the same point
+    (tmp_path / "pack-1.bin").write_bytes(b"partial")
+    reopened = ChunkStore(str(tmp_path))
+    assert all(reopened.retrieve_chunk(h) == data for h, data in chunks.items())
+    assert [p.name for p in tmp_path.glob("pack*.bin")] == ["pack-0.bin"]
+    reopened.close()
+
+
+def test_index_without_pack_name_uses_the_original_pack(tmp_path):
+    data = os.urandom(100)
+    (tmp_path / "pack.bin").write_bytes(data)
+    (tmp_path / "index.json").write_text(json.dumps({
+        "chunks": {"h": {"offset": 0, "size": len(data), "metadata": {}, "ref_count": 1}},
+        "dead_chunks": 0
+    }))
+    
+    store = ChunkStore(str(tmp_path))
+    assert store.retrieve_chunk("h") == data
+    store.close()
+
+
+def test_frame_round_trip_reconstructs_new_content():
+    sync = DeltaSync()
+    old = os.urandom(64 * 1024)
+    new = old[:20000] + b"inserted" + old[20000:50000] + os.urandom(3000) + old[52000:]
+    
+    for raw_frame in (False, True):
+        delta = sync.create_content_delta(old, new, raw_frame=raw_frame)
+        assert delta["success"]
+        assert isinstance(delta["frame"], bytes if raw_frame else str)
+        assert len(sync._parse_frame(
+            delta["frame"] if raw_frame else base64.b64decode(delta["frame"])
+        )) == delta["operation_count"]
+        assert sync.reconstruct_from_delta(old, delta) == new
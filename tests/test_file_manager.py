@@ -0,0 +1,138 @@
+"""
+Tests for the FileVersionManager version store.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+from datetime import datetime
+
+from coordinator.file_manager import FileVersionManager
+from shared.models import VectorClockModel
+
+
+def _clock(value: int = 1) -> VectorClockModel:
+    return VectorClockModel(clocks={"n1": value})
+
+
+def test_create_version_numbers_and_current(tmp_path):
+    manager = FileVersionManager(str(tmp_path))
+    v1 = manager.create_version("f1", b"one", "n1", _clock(1))
+    v2 = manager.create_version("f1", b"two", "n1", _clock(2), {"k": "v"})
+    
+    assert (v1.version_number, v2.version_number) == (1, 2)
+    assert v2.hash == hashlib.sha256(b"two").hexdigest()
+    assert manager.get_current_version("f1").version_id == v2.version_id
+    assert not manager.get_version(v1.version_id).is_current
+    assert manager.get_version_content(v1.version_id) == b"one"
+    assert manager.get_version(v2.version_id).metadata == {"k": "v"}
+    manager.close()
+
+
+def test_create_version_from_stream_matches_bytes(tmp_path):
+    manager = FileVersionManager(str(tmp_path))
+    content = bytes(range(256)) * 10_000
+    from_bytes = manager.create_version("f1", content, "n1", _clock(1))
+    from_stream = manager.create_version_from_stream("f2", io.BytesIO(content), "n1", _clock(1))
+    
+    assert from_stream.hash == from_bytes.hash
+    assert from_stream.size == len(content)
+    assert manager.get_version_content(from_stream.version_id) == content
+    # Identical content is stored once
+    assert manager.get_storage_statistics()["stored_size"] == len(content)
+    manager.close()
+
+
+def test_versions_survive_reopen(tmp_path):
+    manager = FileVersionManager(str(tmp_path))
+    created = [manager.create_version("f1", b"c%d" % i, "n1", _clock(i)) for i in range(3)]
+    manager.close()
+    
+    reopened = FileVersionManager(str(tmp_path))
+    versions = reopened.get_file_versions("f1")
+    assert [v.version_id for v in versions] == [v.version_id for v in created]
+    assert [v.is_current for v in versions] == [False, False, True]
+    assert reopened.get_version_content(versions[1].version_id) == b"c1"
+    reopened.close()
+
+
+def test_legacy_json_metadata_is_imported(tmp_path):
+    (tmp_path / "data").mkdir()
+    (tmp_path / "metadata").mkdir()
+    for number, content in enumerate([b"old", b"new"], start=1):
+        version_id = f"v_f1_{number}"
+        (tmp_path / "data" / f"{version_id}.data").write_bytes(content)
+        (tmp_path / "metadata" / f"{version_id}.json").write_text(json.dumps({
+            "version_id": version_id,
+            "file_id": "f1",
+            "version_number": number,
+            "hash": hashlib.sha256(content).hexdigest(),
+            "size": len(content),
+            "created_at": datetime(2024, 1, number, 12, 0).isoformat(),
+            "created_by": "n1",
+            "vector_clock": {"clocks": {"n1": number}},
+            "metadata": {"number": number},
+            "is_current": number == 2
+        }))
+    
+    manager = FileVersionManager(str(tmp_path))
+    versions = manager.get_file_versions("f1")
+    
+    assert [v.version_number for v in versions] == [1, 2]
+    assert versions[0].created_at == datetime(2024, 1, 1, 12, 0)
+    assert versions[1].vector_clock.clocks == {"n1": 2}
+    assert versions[1].metadata == {"number": 2}
+    assert manager.get_current_version("f1").version_id == "v_f1_2"
+    assert manager.get_version_content("v_f1_1") == b"old"
+    manager.close()
+
+
+def test_delete_current_promotes_latest_remaining(tmp_path):
+    manager = FileVersionManager(str(tmp_path))
+    v1 = manager.create_version("f1", b"one", "n1", _clock(1))
+    v2 = manager.create_version("f1", b"two", "n1", _clock(2))
+    
+    assert manager.delete_version(v2.version_id)
+    assert manager.get_version(v2.version_id) is None
+    assert manager.get_current_version("f1").version_id == v1.version_id
+    # The only remaining version can't be deleted
+    assert not manager.delete_version(v1.version_id)
+    manager.close()
+    
+    reopened = FileVersionManager(str(tmp_path))
+    assert reopened.get_current_version("f1").version_id == v1.version_id
+    reopened.close()
+
+
+def test_cleanup_keeps_latest_and_releases_blobs(tmp_path):
+    manager = FileVersionManager(str(tmp_path))
+    created = [manager.create_version("f1", b"c%d" % i, "n1", _clock(i)) for i in range(5)]
+    
+    assert manager.cleanup_old_versions("f1", keep_versions=2) == 3
+    remaining = manager.get_file_versions("f1")
+    assert [v.version_id for v in remaining] == [v.version_id for v in created[3:]]
+    assert manager.get_version_content(created[0].version_id) is None
+    stats = manager.get_storage_statistics()
+    assert stats["total_versions"] == 2
+    assert stats["stored_size"] == sum(v.size for v in created[3:])
+    manager.close()
+
+
+def test_concurrent_acreate_version_numbers_are_unique(tmp_path):
+    manager = FileVersionManager(str(tmp_path))
+    
+    async def create_all():
+        return await asyncio.gather(*(
+            manager.acreate_version("f1", b"content %d" % i, "n1", _clock(i))
+            for i in range(20)
+        ))
+    
+    created = asyncio.run(create_all())
+    
+    assert sorted(v.version_number for v in created) == list(range(1, 21))
+    versions = manager.get_file_versions("f1")
+    assert [v.version_number for v in versions] == list(range(1, 21))
+    assert sum(v.is_current for v in versions) == 1
+    assert versions[-1].is_current
+    manager.close()
@@ -0,0 +1,257 @@
+"""
+Tests for the coordinator server's in-process components.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from coordinator.server import (
+    AdvancedDeltaSync, CoordinatorServer, EnhancedVectorClockManager, SimpleFileManager
+)
+from coordinator.vector_clock import VectorClockManager
+from shared.models import FileMetadata, SyncEvent, SyncEventType, VectorClockModel
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    # The database lives in the working directory
+    monkeypatch.chdir(tmp_path)
+    return CoordinatorServer()
+
+
+@pytest.fixture
+def client(server):
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+
+def _flush_events(server, client):
+    """Wait for queued event inserts to land."""
+    client.portal.call(server.db._wqueue.join)
+
+
+def _register(client, node_id):
+    response = client.post("/api/register", json={
+        "node_id": node_id, "name": node_id, "address": "127.0.0.1", "port": 8001
+    })
+    assert response.status_code == 200
+
+
+def _upload(client, file_id, content, owner_node="n1"):
+    metadata = FileMetadata(
+        file_id=file_id, name=f"{file_id}.bin", path=f"/{file_id}.bin", size=len(content), hash="",
+        created_at=datetime.now(), modified_at=datetime.now(), owner_node=owner_node,
+        vector_clock=VectorClockModel()
+    )
+    response = client.post(
+        "/api/files/upload_stream",
+        files={"file": (metadata.name, content)},
+        data={"metadata": metadata.model_dump_json(), "use_delta_sync": "true"}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_simple_file_managers_do_not_share_storage():
+    first = SimpleFileManager()
+    version_id = first.create_version("f1", b"content", "n1", VectorClockModel(), {})
+    
+    # A second coordinator starting up must leave the first one's blobs alone
+    second = SimpleFileManager()
+    assert second.storage_path != first.storage_path
+    assert bytes(first.get_version_content(version_id)) == b"content"
+    
+    first.close()
+    second.close()
+    assert not first.storage_path.exists()
+    assert not second.storage_path.exists()
+
+
+def test_explicit_storage_path_is_never_wiped(tmp_path):
+    manager = SimpleFileManager(str(tmp_path))
+    version_id = manager.create_version("f1", b"content", "n1", VectorClockModel(), {})
+    path = manager.get_version_path(version_id)
+    
+    SimpleFileManager(str(tmp_path)).close()
+    manager.close()
+    assert path.read_bytes() == b"content"
+
+
+def test_blob_write_leaves_no_partial_file(tmp_path, monkeypatch):
+    manager = SimpleFileManager(str(tmp_path))
+    
+    def crash(*args):
+        raise OSError("disk full")
+    
+    monkeypatch.setattr("coordinator.server.os.replace", crash)
+    with pytest.raises(OSError):
+        manager.create_version("f1", b"content", "n1", VectorClockModel(), {})
+    
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_delta_metrics_report_upload_savings(server, client):
+    for node_id in ("n1", "n2", "n3"):
+        _register(client, node_id)
+    
+    content = os.urandom(100_000)
+    uploads = [
+        _upload(client, "f1", content),
+        _upload(client, "f1", content[:1000] + b"x" + content[1000:])
+    ]
+    _flush_events(server, client)
+    
+    metrics = client.get("/api/delta-metrics").json()
+    assert uploads[1]["delta_metrics"]["bandwidth_saved"] > 0
+    assert metrics["total_bandwidth_saved"] == sum(
+        upload["delta_metrics"]["bandwidth_saved"] for upload in uploads
+    )
+    assert metrics["average_compression_ratio"] > 0
+    # Two uploads, each replicated to two peers
+    assert metrics["total_files_synced"] == 4
+
+
+def test_causal_order_respects_happens_before_and_matches_vector_clock_module():
+    rng = random.Random(7)
+    clocks = {node_id: {} for node_id in ("a", "b", "c")}
+    events = []
+    base = datetime(2024, 1, 1)
+    for i in range(120):
+        node_id = rng.choice("abc")
+        if rng.random() < 0.3:
+            # Receive another node's clock before the local event
+            for peer, value in clocks[rng.choice("abc")].items():
+                clocks[node_id][peer] = max(clocks[node_id].get(peer, 0), value)
+        clocks[node_id][node_id] = clocks[node_id].get(node_id, 0) + 1
+        events.append(SyncEvent(
+            event_id=f"e{i}", event_type=SyncEventType.FILE_MODIFIED, node_id=node_id,
+            timestamp=base + timedelta(seconds=rng.randint(0, 60)),
+            vector_clock=VectorClockModel(clocks=dict(clocks[node_id]))
+        ))
+    rng.shuffle(events)
+    
+    ordered = EnhancedVectorClockManager().get_causal_order(events)
+    position = {event.event_id: i for i, event in enumerate(ordered)}
+    assert len(position) == len(events)
+    for first in events:
+        for second in events:
+            if first.vector_clock.is_causally_before(second.vector_clock):
+                assert position[first.event_id] < position[second.event_id]
+    
+    as_dicts = [
+        {"event_id": e.event_id, "timestamp": e.timestamp.isoformat(),
+         "vector_clock": {"node_id": e.node_id, "clocks": e.vector_clock.clocks}}
+        for e in events
+    ]
+    assert [e["event_id"] for e in VectorClockManager().get_causal_order(as_dicts)] == \
+        [e.event_id for e in ordered]
+
+
+def test_causal_order_limit_is_capped(client):
+    assert client.get("/api/causal-order", params={"limit": 10}).status_code == 200
+    assert client.get("/api/causal-order", params={"limit": 10_000_000}).status_code == 422
+
+
+def test_upload_stream_stores_exact_content(client):
+    content = os.urandom(3 * 1024 * 1024 + 17)
+    _upload(client, "f1", content)
+    
+    assert client.get("/api/files/f1/raw").content == content
+    assert client.get("/api/files/f1").json()["hash"] == hashlib.sha256(content).hexdigest()
+
+
+def test_streamed_delta_matches_buffered_delta():
+    old = os.urandom(256 * 1024)
+    new = old[:70000] + os.urandom(5000) + old[70000:200000] + old[210000:]
+    pieces = [new[i:i + 7919] for i in range(0, len(new), 7919)]
+    
+    buffered = AdvancedDeltaSync().create_content_delta(old, new, "f1")
+    streamed = AdvancedDeltaSync().create_content_delta(old, iter(pieces), "f1")
+    
+    assert buffered.chunks_to_add  # the edit must actually change chunks
+    assert streamed.new_hash == buffered.new_hash
+    assert streamed.new_size == buffered.new_size == len(new)
+    assert streamed.chunks_to_add == buffered.chunks_to_add
+    assert streamed.chunks_unchanged == buffered.chunks_unchanged
+    assert streamed.total_chunks == buffered.total_chunks
+    assert streamed.bandwidth_saved == buffered.bandwidth_saved
+
+
+class _FakeWebSocket:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.sent = []
+    
+    async def send_text(self, text):
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("connection lost")
+        self.sent.append(json.loads(text))
+    
+    async def send_bytes(self, data):
+        self.sent.append(data)
+
+
+def _event(event_type=SyncEventType.FILE_MODIFIED, file_id="f1", node_id="n1"):
+    return SyncEvent(
+        event_id="e1",
+        event_type=event_type,
+        node_id=node_id,
+        file_id=file_id,
+        timestamp=datetime.now(),
+        vector_clock=VectorClockModel()
+    )
+
+
+@pytest.mark.asyncio
+async def test_broadcast_prunes_failed_connections(server, monkeypatch):
+    async def record_event(event):
+        return True
+    monkeypatch.setattr(server.db, "record_event", record_event)
+    
+    healthy, broken = _FakeWebSocket(), _FakeWebSocket(fail=True)
+    peer, broken_peer = _FakeWebSocket(), _FakeWebSocket(fail=True)
+    server.active_connections = {healthy, broken}
+    server.node_connections = {"n2": peer, "n3": broken_peer}
+    
+    await server.broadcast_event(_event())
+    
+    assert [m["type"] for m in healthy.sent] == ["event"]
+    assert len(peer.sent) == 1
+    assert server.active_connections == {healthy}
+    assert list(server.node_connections) == ["n2"]
+
+
+@pytest.mark.asyncio
+async def test_dashboard_channel_subscriptions_filter_events(server, monkeypatch):
+    async def record_event(event):
+        return True
+    monkeypatch.setattr(server.db, "record_event", record_event)
+    
+    everything, one_file, events_only = _FakeWebSocket(), _FakeWebSocket(), _FakeWebSocket()
+    server.active_connections = {everything, one_file, events_only}
+    await server.handle_dashboard_message(one_file, {"type": "subscribe", "channels": ["file:f1"]})
+    await server.handle_dashboard_message(events_only, {"type": "subscribe", "channels": ["events"]})
+    
+    for event_type, file_id in [
+        (SyncEventType.FILE_SYNC_PROGRESS, "f1"),
+        (SyncEventType.FILE_SYNC_PROGRESS, "f2"),
+        (SyncEventType.FILE_MODIFIED, "f2"),
+        (SyncEventType.NODE_JOINED, None),
+    ]:
+        await server.broadcast_event(_event(event_type, file_id))
+    
+    received = [len([m for m in ws.sent if m["type"] == "event"])
+                for ws in (everything, one_file, events_only)]
+    assert received == [4, 1, 2]
+    
+    # Subscribing to nothing returns the connection to the full feed
+    await server.handle_dashboard_message(one_file, {"type": "subscribe", "channels": []})
+    assert server.dashboard_channels == {events_only: {"events"}}